@@ -0,0 +1,194 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from approx import Estimate
+from ssg import (_approx_sfd, _average_distance, _bfs_ids, _closeness, _gdi_value,
+                 _profile_sfd, _roots_sfd, _sci_estimate, _sci_value, _source_stats, as_compact,
+                 component_roots, diameter_bounds)
+
+# Analysis Engine
+# Every metric and every shared intermediate is a node: name -> (deps, fn),
+# where fn receives the values of deps in order. A plan walks the
+# dependency graph once, so an intermediate feeding several metrics (root
+# distances for SCI and SFD, the degree array for SCI and GDI, ...) is
+# computed a single time. Inputs ("graph", "root", "sfd_scales",
+# "sfd_roots", "approx") are supplied by Analysis rather than registered.
+_NODES = {}
+
+METRICS = ("beta_0", "beta_1", "euler_char", "sci", "gdi", "sfd")
+# Bump when a metric's definition changes; it keys cached results.
+METRICS_VERSION = 1
+
+
+def node(name, *deps):
+    """Register fn as the node computing name from deps."""
+    def register(fn):
+        _NODES[name] = (deps, fn)
+        return fn
+    return register
+
+
+@node("root_id", "graph", "root")
+def _root_id(graph, root):
+    return graph.index[root]
+
+
+@node("n_vertices", "graph")
+def _n_vertices(graph):
+    return graph.n
+
+
+@node("n_edges", "graph")
+def _n_edges(graph):
+    return len(graph.E)
+
+
+@node("degree", "graph")
+def _degree(graph):
+    return graph.degree
+
+
+@node("components", "graph")
+def _components(graph):
+    return component_roots(graph)
+
+
+@node("root_distances", "graph", "root_id")
+def _root_distances(graph, root_id):
+    return _bfs_ids(graph, root_id)
+
+
+@node("diameter_bounds", "graph", "approx")
+def _diameter_bounds(graph, approx):
+    return diameter_bounds(graph, None if approx is None else approx.bfs_budget)
+
+
+@node("diameter", "diameter_bounds", "approx")
+def _diameter(bounds, approx):
+    # Without a budget the bounds meet, so bounds[0] is diameter(graph)
+    # and the sweeps are not repeated; under approx only the budgeted
+    # bounds are known.
+    lower, upper = bounds
+    return lower if approx is None else Estimate(lower, lower, upper)
+
+
+@node("beta_0", "components")
+def _beta_0(components):
+    return int(np.count_nonzero(components == np.arange(len(components))))
+
+
+@node("beta_1", "n_edges", "n_vertices", "beta_0")
+def _beta_1(n_edges, n_vertices, beta_0):
+    return n_edges - n_vertices + beta_0
+
+
+@node("euler_char", "beta_0", "beta_1")
+def _euler_char(beta_0, beta_1):
+    return beta_0 - beta_1
+
+
+@node("sci", "root_distances", "degree", "diameter_bounds", "approx")
+def _sci(root_distances, degree, bounds, approx):
+    if approx is None:
+        return _sci_value(root_distances, degree, bounds[0])
+    return _sci_estimate(root_distances, degree, bounds)
+
+
+@node("gdi", "degree", "n_edges")
+def _gdi(degree, n_edges):
+    return _gdi_value(degree, n_edges)
+
+
+@node("sfd", "graph", "root_distances", "sfd_scales", "sfd_roots", "approx")
+def _sfd(graph, root_distances, scales, roots, approx):
+    ids = [graph.index[r] for r in roots]
+    if approx is not None:
+        return _approx_sfd(graph, root_distances, ids, scales, approx)
+    estimates = [_profile_sfd(root_distances, scales)]
+    if ids:
+        estimates += _roots_sfd(graph, ids, scales)
+    return estimates[0] if len(estimates) == 1 else sum(estimates) / len(estimates)
+
+
+# All-sources BFS: not in METRICS, since it costs a traversal per vertex
+# (batched 64 to a word); arrays are indexed by vertex id.
+@node("source_stats", "graph")
+def _source_stats_node(graph):
+    return _source_stats(graph, np.arange(graph.n))
+
+
+@node("eccentricities", "source_stats")
+def _eccentricities(source_stats):
+    return source_stats[0]
+
+
+@node("average_distance", "source_stats")
+def _average_distance_node(source_stats):
+    return _average_distance(*source_stats[1:])
+
+
+@node("closeness", "source_stats", "n_vertices")
+def _closeness_node(source_stats, n_vertices):
+    return _closeness(*source_stats[1:], n_vertices)
+
+
+def plan(names, known=()):
+    """Registered nodes needed for names, dependencies first, each once.
+
+    Nodes in known are already computed and are not expanded.
+    """
+    order, done = [], set()
+    stack = [(name, False) for name in reversed(names)]
+    while stack:
+        name, expanded = stack.pop()
+        if name in done or name in known or name not in _NODES:
+            continue
+        if expanded:
+            done.add(name)
+            order.append(name)
+            continue
+        stack.append((name, True))
+        stack.extend((dep, False) for dep in reversed(_NODES[name][0]))
+    return order
+
+
+@lru_cache(maxsize=None)
+def inputs(name):
+    """Analysis inputs name depends on, directly or through other nodes."""
+    found = set()
+    for step in plan([name]):
+        found.update(dep for dep in _NODES[step][0] if dep not in _NODES)
+    return frozenset(found)
+
+
+class Analysis:
+    """Memoized node values for one (graph, root) pair."""
+
+    def __init__(self, ssg, root, sfd_scales=None, sfd_roots=(), approx=None):
+        self.values = {"graph": as_compact(ssg), "root": root, "sfd_scales": sfd_scales,
+                       "sfd_roots": tuple(sfd_roots), "approx": approx}
+
+    def compute(self, names):
+        for name in plan(names, self.values):
+            deps, fn = _NODES[name]
+            self.values[name] = fn(*(self.values[dep] for dep in deps))
+        return {name: self.values[name] for name in names}
+
+    def __getitem__(self, name):
+        return self.compute([name])[name]
+
+
+@dataclass
+class AnalysisResult:
+    metrics: dict
+    # The engine that produced the metrics; asking it for more metrics
+    # reuses every intermediate computed so far.
+    analysis: Analysis = field(repr=False)
+
+
+def analyze(ssg, root, metrics=METRICS, sfd_scales=None, sfd_roots=(), approx=None):
+    """Compute metrics in one pass; SCI and SFD are Estimates under approx."""
+    analysis = Analysis(ssg, root, sfd_scales=sfd_scales, sfd_roots=sfd_roots, approx=approx)
+    return AnalysisResult(analysis.compute(metrics), analysis)
@@ -1,28 +1,79 @@
 import streamlit as st
-import plotly.graph_objects as go
 import os
-from datetime import datetime
-from collections import defaultdict, deque
-import math
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import networkx as nx
-import razorpay
-import requests
+import time
+import uuid
+from ssc import compile_ops
+from ssg import CompactSSG
+from canonical import SHAPE_CACHE
+from approx import Approximation
+from analysis import METRICS_VERSION
+from cache import RESULTS_CACHE
+from store import RESULT_STORE
+from rates import RATES
+from usage import USAGE_STORE, TRIALS
+from entitlements import ENTITLEMENTS
+from payments import ORDERS
+from warmup import warm_imports
+from layout import layout
+from render import RENDER_CACHE, figure_3d, render_2d, render_key
+from fragments import fragment, memo, record, span, trace_enabled, trace_panel
+from graph_view import graph_view, pack
+
+SSC_OPS = ("GCD", "LCM")
+SSC_CHAIN = compile_ops(SSC_OPS)
+# Graphs above this many vertices (ADSG_APPROX_VERTICES) get approximate
+# metrics: SCI is bracketed by the diameter bounds a budget of sweeps
+# reaches instead of settling the diameter. SFD from the root only needs
+# the root BFS SCI already runs, so it stays exact; sampled extra roots
+# would carry a confidence interval at APPROX.z. The GCD/LCM graphs
+# Generate builds have at most 4 vertices, so only longer op chains come
+# near the default.
+APPROX_VERTEX_LIMIT = int(os.environ.get("ADSG_APPROX_VERTICES", 200_000))
+APPROX = Approximation()
+# The 2D view is drawn in the browser; ADSG_CLIENT_RENDER=0 serves
+# matplotlib images instead.
+CLIENT_RENDER = os.environ.get("ADSG_CLIENT_RENDER", "1") != "0"
+
+
+def compute_results(number1, number2):
+    results = SSC_CHAIN.results(number1, number2)
+    if results is not None:
+        ssg = CompactSSG(results["vertices"], results["edges"])
+        approx = APPROX if ssg.n > APPROX_VERTEX_LIMIT else None
+        results.update(SHAPE_CACHE.analyze(ssg, root=results["gcd_result"], approx=approx).metrics)
+    return results
+
+
+def cached_results(number1, number2):
+    # Process LRU first, then the store shared by every replica on the host.
+    key = (number1, number2, SSC_OPS, METRICS_VERSION)
+    return RESULTS_CACHE.get_or_compute(
+        key, lambda: RESULT_STORE.get_or_compute(key, lambda: compute_results(number1, number2)))
+
+
+@st.cache_resource(show_spinner=False)
+def preload_results():
+    """Load the most requested stored results into RESULTS_CACHE, once per process."""
+    RESULT_STORE.warm(RESULTS_CACHE)
+
+
+def format_metric(value, bounds=False):
+    # bounds: the range is a hard bracket (SCI from the diameter bounds),
+    # not a confidence interval.
+    if getattr(value, "approximate", False):
+        if bounds:
+            return f"≈ {value:.3f} (bounds {value.low:.3f}–{value.high:.3f})"
+        return f"≈ {value:.3f} ({APPROX.confidence:.0%} CI {value.low:.3f}–{value.high:.3f})"
+    return f"{value:.3f}"
+
+PAGE_START = time.perf_counter()
 
 # Set page configuration
 st.set_page_config(page_title="ADSG Visualization Tool", layout="wide", initial_sidebar_state="collapsed")
 
 # Currency converter
 def get_inr_amount(usd_amount):
-    try:
-        api_key = os.environ.get("EXCHANGE_RATE_API_KEY", "d959e6b77929ec489dd71252")
-        response = requests.get(f"https://api.exchangerate-api.com/v4/latest/USD?apiKey={api_key}")
-        rate = response.json()["rates"]["INR"]
-        return round(usd_amount * rate)
-    except:
-        return 420
+    return RATES.convert(usd_amount, "INR")
 
 usd_price = 5
 inr_price = get_inr_amount(usd_price)
@@ -89,143 +140,34 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Trial Tracking
-def track_trial():
-    current_month = datetime.now().strftime("%Y-%m")
-    log_file = "usage.log"
-    user_id = st.session_state.get("user_email", st.session_state.get("razorpay_payment_id", "anonymous"))
+try:
+    USAGE_STORE.migrate_log("usage.log")
+except Exception:
+    pass  # an unusable store is reported by trial_count_now below
+
+def trial_user():
+    return st.session_state.get("user_email", st.session_state.get("razorpay_payment_id", "anonymous"))
+
+def trial_count_now():
     try:
-        if os.path.exists(log_file):
-            with open(log_file, "r") as f:
-                logs = f.readlines()
-            user_key = f"{current_month}:{user_id}"
-            logs = [line for line in logs if current_month in line]
-            for i, line in enumerate(logs):
-                if user_key in line:
-                    count = int(line.split(":")[-1].strip()) + 1
-                    logs[i] = f"{user_key}:{count}\n"
-                    with open(log_file, "w") as f:
-                        f.writelines(logs)
-                    return count
-            logs.append(f"{user_key}:1\n")
-            with open(log_file, "w") as f:
-                f.writelines(logs)
-            return 1
-        else:
-            with open(log_file, "w") as f:
-                f.write(f"{user_key}:1\n")
-            return 1
+        return TRIALS.count(trial_user())
     except Exception as e:
         st.error(f"Error tracking trials: {e}")
         return 0
 
-# SSC Generation
-def gcd(a: int, b: int) -> int:
-    return abs(a) if b == 0 else gcd(b, a % b)
-
-def lcm(a: int, b: int) -> int:
-    return abs(a * b) // gcd(a, b)
-
-def generate_ssc(x: int, y: int, ops: list) -> tuple:
-    current = (x, y)
-    gcd_result = None
-    for op in ops:
-        if op == "GCD":
-            gcd_result = gcd(current[0], current[1]) if isinstance(current, tuple) else current
-            current = gcd_result
-        elif op == "LCM":
-            current = lcm(current, 10) if isinstance(current, int) else current
-        else:
-            continue
-        if current is None:
-            return None, None
-    return current, gcd_result
-
-# SSG Class and Metrics
-class SSG:
-    def __init__(self, vertices, edges):
-        self.V = vertices
-        self.E = edges
-        self.adj = defaultdict(list)
-        for u, v in edges:
-            self.adj[u].append(v)
-            self.adj[v].append(u)
-
-def bfs(ssg, start):
-    dist = {v: float('inf') for v in ssg.V}
-    dist[start] = 0
-    queue = deque([start])
-    while queue:
-        u = queue.popleft()
-        for v in ssg.adj[u]:
-            if dist[v] == float('inf'):
-                dist[v] = dist[u] + 1
-                queue.append(v)
-    return dist
-
-def compute_betti_numbers(ssg):
-    def dfs(v, visited, component):
-        visited.add(v)
-        component.append(v)
-        for u in ssg.adj[v]:
-            if u not in visited:
-                dfs(u, visited, component)
-    visited = set()
-    components = []
-    for v in ssg.V:
-        if v not in visited:
-            component = []
-            dfs(v, visited, component)
-            components.append(component)
-    beta_0 = len(components)
-    beta_1 = len(ssg.E) - len(ssg.V) + beta_0
-    return beta_0, beta_1
-
-def compute_euler_characteristic(ssg):
-    beta_0, beta_1 = compute_betti_numbers(ssg)
-    return beta_0 - beta_1
-
-def compute_sci(ssg, root):
-    distances = bfs(ssg, root)
-    leaves = [v for v in ssg.V if len(ssg.adj[v]) == 1]
-    if not leaves:
-        return 0.0
-    avg_dist = sum(distances[l] for l in leaves) / len(leaves)
-    max_dist = 0
-    for v in ssg.V:
-        dist = bfs(ssg, v)
-        max_d = max((d for d in dist.values() if d != float('inf')), default=0)
-        max_dist = max(max_dist, max_d)
-    return avg_dist / max_dist if max_dist > 0 else 0
-
-def compute_gdi(ssg):
-    degrees = [len(ssg.adj[v]) for v in ssg.V]
-    mean_deg = 2 * len(ssg.E) / len(ssg.V) if len(ssg.V) > 0 else 0
-    variance = sum((d - mean_deg) ** 2 for d in degrees) / len(ssg.V) if len(ssg.V) > 0 else 0
-    std_dev = math.sqrt(variance)
-    return std_dev / mean_deg if mean_deg > 0 else 0
-
-def compute_sfd(ssg, root):
-    def bfs_radius(r):
-        dist = {v: float('inf') for v in ssg.V}
-        dist[root] = 0
-        queue = deque([root])
-        nodes = set()
-        while queue:
-            u = queue.popleft()
-            if dist[u] <= r:
-                nodes.add(u)
-            for v in ssg.adj[u]:
-                if dist[v] == float('inf'):
-                    dist[v] = dist[u] + 1
-                    queue.append(v)
-        return len(nodes)
-    max_r = max(bfs(ssg, root).values(), default=0)
-    if max_r == 0:
-        return 0
-    r = max_r
-    vr = bfs_radius(r)
-    vr2 = bfs_radius(r / 2)
-    return math.log(vr / vr2) / math.log(2) if vr2 > 0 else 0
+def new_generate_click():
+    # One id per Generate click, minted by the click itself: the same
+    # click recorded twice counts once, but a click after a failed
+    # Generate (which reruns only its fragment) is a new trial.
+    st.session_state["generate_click"] = uuid.uuid4().hex
+
+def track_trial():
+    # Only Generate is a trial; recording never waits on disk.
+    try:
+        TRIALS.record(trial_user(), st.session_state.get("generate_click") or uuid.uuid4().hex)
+    except Exception as e:
+        st.error(f"Error tracking trials: {e}")
+    return trial_count_now()
 
 # Streamlit Interface
 st.title("ADSG Visualization Tool 📈")
@@ -237,14 +179,43 @@ st.markdown("""
     Try it now with the inputs below!
 """, unsafe_allow_html=True)
 
-# Input fields
-number1 = st.number_input("First Number", value=7, min_value=1, step=1)
-number2 = st.number_input("Second Number", value=20058, min_value=1, step=1)
+# Verify a returning payment once per session, before anything reads
+# premium status. The checkout redirect starts a new session, so the user
+# comes from the order.
+payment_id = st.query_params.get("payment_id")
+paid_user = None
+if payment_id and st.session_state.get("razorpay_payment_id") == payment_id:
+    paid_user = st.session_state.get("premium_user")
+elif payment_id:
+    try:
+        paid_user = ENTITLEMENTS.grant(st.query_params.get("order_id"), payment_id,
+                                       st.query_params.get("signature"))
+        if paid_user:
+            TRIALS.reset(paid_user)
+    except Exception as e:
+        st.error(f"Error verifying payment: {e}")
+    if paid_user:
+        st.session_state["user_email"] = paid_user
+        st.session_state["razorpay_payment_id"] = payment_id
+        # The only identity premium is looked up by: set from a verified
+        # payment, never from the email typed into the form.
+        st.session_state["premium_user"] = paid_user
+
+def is_premium():
+    user = st.session_state.get("premium_user")
+    if user is None:
+        return False
+    try:
+        return ENTITLEMENTS.is_premium(user)
+    except Exception as e:
+        st.error(f"Error checking premium status: {e}")
+        return False
+
+premium = is_premium()
 
 # Trial tracking
-trial_count = track_trial()
+trial_count = trial_count_now()
 st.session_state["trial_count"] = trial_count
-st.write(f"Trials this month: {trial_count}/50")
 
 # Initialize session state
 if "results" not in st.session_state:
@@ -253,168 +224,183 @@ if "results" not in st.session_state:
 # Razorpay Integration
 key_id = os.environ.get("RAZORPAY_KEY_ID")
 key_secret = os.environ.get("RAZORPAY_KEY_SECRET")
-if "razorpay_client" not in st.session_state:
-    if not key_id or not key_secret:
-        st.error("Razorpay configuration is missing. Please contact support.")
-        st.stop()
-    st.session_state["razorpay_client"] = razorpay.Client(auth=(key_id, key_secret))
-
-# Payment form
-with st.form(key="payment_form"):
-    st.markdown(f'<div class="payment-form">Get Premium for unlimited trials and reports ($5/month ≈ ₹{inr_price}/month).</div>', unsafe_allow_html=True)
-    user_email = st.text_input("Enter Your Email for Premium Access", value=st.session_state.get("user_email", ""), key="email_input")
-    submitted = st.form_submit_button(f"Upgrade to Premium ($5/month ≈ ₹{inr_price}/month)", type="secondary")
-
-if submitted:
-    if not user_email:
-        st.error("Please enter a valid email to proceed with payment.")
-    else:
-        try:
-            order = st.session_state["razorpay_client"].order.create({
-                "amount": inr_price * 100,
-                "currency": "INR",
-                "receipt": f"adsg_{trial_count}_{user_email}",
-                "payment_capture": 1
-            })
-            st.session_state["order_id"] = order["id"]
-            st.components.v1.html(f"""
-                <script src="https://checkout.razorpay.com/v1/checkout.js"></script>
-                <script>
-                var options = {{
-                    "key": "{key_id}",
-                    "amount": "{inr_price * 100}",
-                    "currency": "INR",
-                    "name": "Serene Glade",
-                    "description": "Premium Subscription",
-                    "order_id": "{order['id']}",
-                    "handler": function (response) {{
-                        window.location.href = window.location.href + "?payment_id=" + response.razorpay_payment_id;
-                    }},
-                    "prefill": {{"name": "User", "email": "{user_email}", "contact": "9999999999"}},
-                    "theme": {{"color": "#4CAF50"}}
-                }};
-                var rzp = new Razorpay(options);
-                rzp.open();
-                </script>
-                <p>Redirecting after payment...</p>
-            """, height=400)
-            st.session_state["user_email"] = user_email
-        except Exception as e:
-            st.error(f"Payment setup pending Razorpay key activation. Try again later or contact support. Error: {e}")
+if not key_id or not key_secret:
+    st.error("Razorpay configuration is missing. Please contact support.")
+    st.stop()
+
+def render_checkout(order, user_email):
+    st.components.v1.html(f"""
+        <script src="https://checkout.razorpay.com/v1/checkout.js"></script>
+        <script>
+        var options = {{
+            "key": "{key_id}",
+            "amount": "{order['amount']}",
+            "currency": "{order['currency']}",
+            "name": "Serene Glade",
+            "description": "Premium Subscription",
+            "order_id": "{order['id']}",
+            "handler": function (response) {{
+                window.location.href = window.location.href.split("?")[0]
+                    + "?payment_id=" + encodeURIComponent(response.razorpay_payment_id)
+                    + "&order_id=" + encodeURIComponent(response.razorpay_order_id)
+                    + "&signature=" + encodeURIComponent(response.razorpay_signature);
+            }},
+            "prefill": {{"name": "User", "email": "{user_email}", "contact": "9999999999"}},
+            "theme": {{"color": "#4CAF50"}}
+        }};
+        var rzp = new Razorpay(options);
+        rzp.open();
+        </script>
+        <p>Redirecting after payment...</p>
+    """, height=400)
 
-# Check trial limit before generation
-if trial_count > 50 and not st.session_state.get("razorpay_payment_id"):
-    st.error("You've reached your free trial limit of 50 this month. Upgrade to Premium to continue.")
-else:
-    # SSC Generation and Visualization
-    if st.button("Generate", key="generate_button", type="primary"):
-        ops = ["GCD", "LCM"]
-        ssc_result, gcd_result = generate_ssc(number1, number2, ops)
-        if ssc_result is not None and gcd_result is not None:
-            results = {
-                "ssc_result": ssc_result,
-                "gcd_result": gcd_result,
-                "vertices": list(set([number1, number2, gcd_result, ssc_result])),
-                "edges": []
-            }
-            if number1 != gcd_result:
-                results["edges"].append((number1, gcd_result))
-            if number2 != gcd_result:
-                results["edges"].append((number2, gcd_result))
-            if gcd_result != ssc_result:
-                results["edges"].append((gcd_result, ssc_result))
-            ssg = SSG(results["vertices"], results["edges"])
-            beta_0, beta_1 = compute_betti_numbers(ssg)
-            euler_char = compute_euler_characteristic(ssg)
-            sci = compute_sci(ssg, root=gcd_result)
-            gdi = compute_gdi(ssg)
-            sfd = compute_sfd(ssg, root=gcd_result)
-            results.update({
-                "beta_0": beta_0, "beta_1": beta_1, "euler_char": euler_char,
-                "sci": sci, "gdi": gdi, "sfd": sfd
-            })
+@fragment("await order", run_every=1)
+def await_order(order_key):
+    # Polls without rerunning the page; the full rerun shows the checkout.
+    try:
+        ready = ORDERS.order(order_key) is not None
+    except Exception:
+        ready = True
+    if ready:
+        st.rerun()
+    st.info("Preparing your order...")
+
+# Page fragments
+# A widget inside a fragment reruns only that fragment; everything a
+# fragment draws from the results is memoized on the results key.
+@fragment("inputs")
+def generate_panel():
+    number1 = st.number_input("First Number", value=7, min_value=1, step=1)
+    number2 = st.number_input("Second Number", value=20058, min_value=1, step=1)
+    st.write(f"Trials this month: {trial_count}/50")
+    if trial_count >= 50 and not premium:
+        st.error("You've reached your free trial limit of 50 this month. Upgrade to Premium to continue.")
+    elif st.button("Generate", key="generate_button", type="primary", on_click=new_generate_click):
+        with span("compute"):
+            track_trial()
+            results = cached_results(number1, number2)
+        if results is None:
+            st.error("Error generating SSC. Check inputs or operations.")
+        else:
             st.session_state["results"] = results
+            st.session_state["results_key"] = (number1, number2, SSC_OPS, METRICS_VERSION)
+            st.rerun()
+
+@fragment("payment")
+def payment_panel():
+    with st.form(key="payment_form"):
+        st.markdown(f'<div class="payment-form">Get Premium for unlimited trials and reports ($5/month ≈ ₹{inr_price}/month).</div>', unsafe_allow_html=True)
+        user_email = st.text_input("Enter Your Email for Premium Access", value=st.session_state.get("user_email", ""), key="email_input")
+        submitted = st.form_submit_button(f"Upgrade to Premium ($5/month ≈ ₹{inr_price}/month)", type="secondary")
+
+    if submitted:
+        if not user_email:
+            st.error("Please enter a valid email to proceed with payment.")
         else:
-            st.error("Error generating SSC. Check inputs or operations.")
+            st.session_state["user_email"] = user_email
+            st.session_state["order_key"] = ORDERS.submit(user_email, inr_price * 100)
 
-    # Display results if available
-    if st.session_state.get("results"):
-        results = st.session_state["results"]
-        st.markdown(f"**SSC Result**: {results['ssc_result']}")
-        st.markdown(f"**Betti Numbers**: β0 = {results['beta_0']}, β1 = {results['beta_1']}")
-        st.markdown(f"**Euler Characteristic**: {results['euler_char']}")
-        st.markdown(f"**Structural Complexity Index (SCI)**: {results['sci']:.3f}")
-        st.markdown(f"**Graph Dispersion Index (GDI)**: {results['gdi']:.3f}")
-        st.markdown(f"**Symbolic Fractal Dimension (SFD)**: {results['sfd']:.3f}")
-        # 2D Visualization
-        st.markdown("<h3 style='color: #4CAF50;'>2D Visualization</h3>", unsafe_allow_html=True)
-        G = nx.Graph()
-        G.add_nodes_from(results["vertices"])
-        G.add_edges_from(results["edges"])
-        plt.figure(figsize=(8, 6))
-        pos = nx.spring_layout(G)
-        nx.draw(G, pos, with_labels=True, node_color='#90CAF9', node_size=500, font_size=8, edge_color='gray')
-        edge_labels = {(u, v): "GCD" if v == results["gcd_result"] else "LCM" for u, v in results["edges"]}
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=8)
-        st.pyplot(plt)
-        plt.close()
-        # 3D Visualization
-        if trial_count <= 50 or st.session_state.get("razorpay_payment_id"):
-            st.success("Enhanced Access: 3D Visualization and Report available!")
-            st.markdown("<h3 style='color: #4CAF50;'>3D Visualization</h3>", unsafe_allow_html=True)
-            pos_3d = nx.spring_layout(G, dim=3, seed=42)
-            x = [pos_3d[v][0] for v in results["vertices"]]
-            y = [pos_3d[v][1] for v in results["vertices"]]
-            z = [pos_3d[v][2] for v in results["vertices"]]
-            fig = go.Figure(data=[
-                go.Scatter3d(x=x, y=y, z=z, mode='markers+text', text=results["vertices"],
-                             marker=dict(size=12, color='#2196F3', opacity=0.8))
-            ])
-            fig.update_layout(
-                title="GCD Graph Visualization",
-                scene=dict(xaxis_title='X', yaxis_title='Y', zaxis_title='Z'),
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                width=800, height=600
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            if trial_count <= 50 and not st.session_state.get("razorpay_payment_id"):
-                st.info("Love 3D visualizations? Upgrade to Premium for unlimited trials and downloadable reports.")
-            st.markdown("<h3 style='color: #4CAF50;'>Download Report</h3>", unsafe_allow_html=True)
-            report = (f"ADSG Visualization Tool Report\n\nInputs: {number1}, {number2}\n"
-                      f"SSC Result: {results['ssc_result']}\n\nMetrics:\n"
-                      f"- Betti Numbers: β0 = {results['beta_0']}, β1 = {results['beta_1']}\n"
-                      f"- Euler Characteristic: {results['euler_char']}\n"
-                      f"- SCI: {results['sci']:.3f}\n- GDI: {results['gdi']:.3f}\n- SFD: {results['sfd']:.3f}")
-            st.download_button(
-                label="Download Report",
-                data=report,
-                file_name=f"adsg_report_{number1}_{number2}.txt",
-                mime="text/plain",
-                key="download_button"
-            )
+    if st.session_state.get("order_key"):
+        try:
+            order = ORDERS.order(st.session_state["order_key"])
+        except KeyError:
+            # Submitted to a process that has since restarted; submitting
+            # again finds the same order.
+            del st.session_state["order_key"]
+        except Exception as e:
+            del st.session_state["order_key"]
+            st.error(f"Payment setup pending Razorpay key activation. Try again later or contact support. Error: {e}")
         else:
-            st.info("3D visualizations and reports require a Premium subscription after 50 trials.")
+            if order is None:
+                await_order(st.session_state["order_key"])
+            else:
+                st.session_state["order_id"] = order["id"]
+                render_checkout(order, st.session_state["user_email"])
+
+def graph_layout(results, key):
+    # One layout per result, shared by the 2D and 3D views.
+    return memo("layout", key, lambda: layout(results["vertices"], results["edges"], results["gcd_result"]))
+
+def render_2d_key(results):
+    labels = {(u, v): "GCD" if v == results["gcd_result"] else "LCM" for u, v in results["edges"]}
+    return render_key(results["vertices"], results["edges"], labels, results["gcd_result"]), labels
+
+@fragment("2D view")
+def view_2d(results, key):
+    st.markdown("<h3 style='color: #4CAF50;'>2D Visualization</h3>", unsafe_allow_html=True)
+    image_key, labels = memo("render_key_2d", key, lambda: render_2d_key(results))
+
+    def png():
+        return RENDER_CACHE.get_or_render(
+            image_key, lambda: render_2d(results["vertices"], results["edges"], labels, graph_layout(results, key)))
+
+    if not CLIENT_RENDER:
+        st.image(png())
+        return
+    graph_view(memo("graph_view", key, lambda: pack(results["vertices"], results["edges"], labels,
+                                                    graph_layout(results, key))))
+    # The browser draws the view; matplotlib only runs for an export.
+    if st.session_state.get("export_2d") == key:
+        st.download_button("Download PNG", data=png(), file_name=f"adsg_graph_{key[0]}_{key[1]}.png",
+                           mime="image/png", key="download_png")
+    else:
+        st.button("Export PNG", key="export_png", on_click=lambda: st.session_state.update(export_2d=key))
+
+@fragment("3D view")
+def view_3d(results, key):
+    st.markdown("<h3 style='color: #4CAF50;'>3D Visualization</h3>", unsafe_allow_html=True)
+    positions = graph_layout(results, key)
+    st.plotly_chart(memo("figure_3d", key, lambda: figure_3d(results["vertices"], results["edges"], positions,
+                                                             results["gcd_result"])), use_container_width=True)
+
+def build_report(results, number1, number2):
+    return (f"ADSG Visualization Tool Report\n\nInputs: {number1}, {number2}\n"
+            f"SSC Result: {results['ssc_result']}\n\nMetrics:\n"
+            f"- Betti Numbers: β0 = {results['beta_0']}, β1 = {results['beta_1']}\n"
+            f"- Euler Characteristic: {results['euler_char']}\n"
+            f"- SCI: {format_metric(results['sci'], bounds=True)}\n- GDI: {format_metric(results['gdi'])}\n- SFD: {format_metric(results['sfd'])}")
+
+@fragment("report")
+def report_panel(results, key):
+    number1, number2 = key[:2]
+    st.markdown("<h3 style='color: #4CAF50;'>Download Report</h3>", unsafe_allow_html=True)
+    st.download_button(
+        label="Download Report",
+        data=memo("report", key, lambda: build_report(results, number1, number2)),
+        file_name=f"adsg_report_{number1}_{number2}.txt",
+        mime="text/plain",
+        key="download_button"
+    )
+
+generate_panel()
+payment_panel()
+
+# Display results if available. The limit only stops new Generates
+# (above): results a trial has already paid for are always shown.
+if st.session_state.get("results"):
+    results = st.session_state["results"]
+    results_key = st.session_state["results_key"]
+    st.markdown(f"**SSC Result**: {results['ssc_result']}")
+    st.markdown(f"**Betti Numbers**: β0 = {results['beta_0']}, β1 = {results['beta_1']}")
+    st.markdown(f"**Euler Characteristic**: {results['euler_char']}")
+    st.markdown(f"**Structural Complexity Index (SCI)**: {format_metric(results['sci'], bounds=True)}")
+    st.markdown(f"**Graph Dispersion Index (GDI)**: {format_metric(results['gdi'])}")
+    st.markdown(f"**Symbolic Fractal Dimension (SFD)**: {format_metric(results['sfd'])}")
+    view_2d(results, results_key)
+    if trial_count <= 50 or premium:
+        st.success("Enhanced Access: 3D Visualization and Report available!")
+        view_3d(results, results_key)
+        if trial_count <= 50 and not premium:
+            st.info("Love 3D visualizations? Upgrade to Premium for unlimited trials and downloadable reports.")
+        report_panel(results, results_key)
+    else:
+        st.info("3D visualizations and reports require a Premium subscription after 50 trials.")
 
 # Handle payment success
-if st.query_params.get("payment_id"):
-    payment_id = st.query_params["payment_id"][0]
-    st.session_state["razorpay_payment_id"] = payment_id
-    st.session_state["user_email"] = st.session_state.get("user_email", "anonymous")
-    current_month = datetime.now().strftime("%Y-%m")
-    log_file = "usage.log"
-    user_key = f"{current_month}:{st.session_state.get('user_email', payment_id)}"
-    if os.path.exists(log_file):
-        with open(log_file, "r") as f:
-            lines = f.readlines()
-        with open(log_file, "w") as f:
-            for line in lines:
-                if user_key in line:
-                    f.write(f"{user_key}:0\n")
-                else:
-                    f.write(line)
-    st.session_state["trial_count"] = 0
+if paid_user:
     st.success(f"Payment successful! Premium access unlocked with Payment ID: {payment_id}")
+elif payment_id:
+    st.error("We could not verify this payment. If you were charged, contact support with the Payment ID.")
 
 # Footer
 st.markdown("""
@@ -424,4 +410,12 @@ st.markdown("""
         <a href="/refund_policy" target="_self">Refund Policy</a>
         <a href="/contact" target="_self">Contact</a>
     </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+record("page", time.perf_counter() - PAGE_START)
+if trace_enabled():
+    trace_panel()
+
+# The page is out: load the most requested results and the plotting and
+# payment libraries before the first Generate or checkout needs them.
+preload_results()
+warm_imports()
@@ -0,0 +1,44 @@
+import math
+from dataclasses import dataclass
+
+
+# Approximate Metrics
+@dataclass(frozen=True)
+class Approximation:
+    """Accuracy/time knobs for the approximate metric mode.
+
+    bfs_budget caps the extra BFS sweeps per component that the diameter
+    bounds may spend (SCI). For an SFD averaged over many roots,
+    sfd_samples caps how many of them get a BFS; seed picks the sample.
+    z scales the reported intervals (1.96 ~ 95%).
+    """
+    bfs_budget: int = 8
+    sfd_samples: int = 16
+    seed: int = 0
+    z: float = 1.96
+
+    @property
+    def confidence(self):
+        """Two-sided normal coverage of +-z: 0.95 for the default 1.96."""
+        return math.erf(self.z / math.sqrt(2))
+
+
+@dataclass(frozen=True)
+class Estimate:
+    value: float
+    low: float
+    high: float
+
+    @property
+    def approximate(self):
+        return self.low != self.high
+
+    @classmethod
+    def exact(cls, value):
+        return cls(value, value, value)
+
+    def __float__(self):
+        return float(self.value)
+
+    def __format__(self, spec):
+        return format(self.value, spec)
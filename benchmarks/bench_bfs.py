@@ -0,0 +1,80 @@
+"""Single-source BFS: the dict-and-deque BFS it replaced vs ssg._bfs_ids.
+
+Run from the repository root:
+
+    python benchmarks/bench_bfs.py [max_vertices]
+
+Covers wide graphs (random trees, sparse random graphs), where the CSR
+sweep expands whole levels with array operations, and deep ones (paths,
+long cycles), where almost every level is a handful of vertices and the
+sweep falls back to its scalar queue loop. Both BFS are timed from
+vertex 0 and must agree.
+"""
+import os
+import sys
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ssg import UNREACHED, CompactSSG, _bfs_ids  # noqa: E402
+
+
+def random_tree(rng, n):
+    parents = (rng.random(n - 1) * np.arange(1, n)).astype(np.int64)
+    return np.column_stack([np.arange(1, n), parents])
+
+
+def sparse_random(rng, n):
+    return rng.integers(0, n, size=(2 * n, 2))
+
+
+def path(rng, n):
+    return np.column_stack([np.arange(n - 1), np.arange(1, n)])
+
+
+def cycle(rng, n):
+    return np.column_stack([np.arange(n), (np.arange(n) + 1) % n])
+
+
+def dict_bfs(adj, n, start):
+    dist = {v: float('inf') for v in range(n)}
+    dist[start] = 0
+    queue = deque([start])
+    while queue:
+        u = queue.popleft()
+        for v in adj[u]:
+            if dist[v] == float('inf'):
+                dist[v] = dist[u] + 1
+                queue.append(v)
+    return dist
+
+
+def main():
+    max_vertices = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(4)
+    print(f"{'graph':>8} {'vertices':>9} {'dict s':>9} {'csr s':>9} {'speedup':>8}")
+    n = 10_000
+    while n <= max_vertices:
+        for name, build in (("tree", random_tree), ("sparse", sparse_random), ("path", path), ("cycle", cycle)):
+            edges = build(rng, n)
+            adj = defaultdict(list)
+            for u, v in edges.tolist():
+                adj[u].append(v)
+                adj[v].append(u)
+            graph = CompactSSG(np.arange(n), edges)
+            start = time.perf_counter()
+            expected = dict_bfs(adj, n, 0)
+            slow = time.perf_counter() - start
+            start = time.perf_counter()
+            dist = _bfs_ids(graph, 0)
+            fast = time.perf_counter() - start
+            assert [UNREACHED if d == float('inf') else d for d in expected.values()] == dist.tolist()
+            print(f"{name:>8} {n:>9} {slow:>9.3f} {fast:>9.3f} {slow / fast:>7.1f}x")
+        n *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""SCI diameter: all-pairs BFS (previous compute_sci) vs ssg.diameter.
+
+Run from the repository root:
+
+    python benchmarks/bench_diameter.py [max_vertices]
+
+All-pairs time is measured directly up to 2,000 vertices; above that it
+is extrapolated from 20 timed BFS runs (marked "est").
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ssg import CompactSSG, _bfs_ids, diameter  # noqa: E402
+
+EXACT_LIMIT = 2_000
+SAMPLES = 20
+
+
+def random_tree(rng, n):
+    parents = (rng.random(n - 1) * np.arange(1, n)).astype(np.int64)
+    return np.column_stack([np.arange(1, n), parents])
+
+
+def tree_with_cycles(rng, n):
+    extra = rng.integers(0, n, size=(max(n // 100, 1), 2))
+    extra = extra[extra[:, 0] != extra[:, 1]]
+    return np.concatenate([random_tree(rng, n), extra])
+
+
+def path(rng, n):
+    return np.column_stack([np.arange(n - 1), np.arange(1, n)])
+
+
+def all_pairs(graph, sources):
+    return max(int(_bfs_ids(graph, v).max()) for v in sources)
+
+
+def bench(name, graph, rng):
+    start = time.perf_counter()
+    fast = diameter(graph)
+    fast_seconds = time.perf_counter() - start
+    if graph.n <= EXACT_LIMIT:
+        start = time.perf_counter()
+        assert all_pairs(graph, range(graph.n)) == fast
+        slow_seconds, note = time.perf_counter() - start, ""
+    else:
+        sources = rng.choice(graph.n, size=SAMPLES, replace=False)
+        start = time.perf_counter()
+        all_pairs(graph, sources)
+        slow_seconds, note = (time.perf_counter() - start) / SAMPLES * graph.n, "est"
+    print(f"{name:>14} {graph.n:>9} {fast:>6} {slow_seconds:>12.3f}{note:>4} {fast_seconds:>10.4f} "
+          f"{slow_seconds / fast_seconds:>10.0f}x")
+
+
+def main():
+    max_vertices = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(20058)
+    print(f"{'graph':>14} {'vertices':>9} {'diam':>6} {'all-pairs s':>16} {'diameter s':>10} {'speedup':>11}")
+    n = 1_000
+    while n <= max_vertices:
+        for name, build in (("tree", random_tree), ("tree+cycles", tree_with_cycles), ("path", path)):
+            edges = build(rng, n)
+            bench(name, CompactSSG(np.arange(n), edges), rng)
+        n *= 10
+
+
+if __name__ == "__main__":
+    main()
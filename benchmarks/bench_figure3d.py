@@ -0,0 +1,63 @@
+"""3D view: the old markers-and-text figure vs render.figure_3d.
+
+Run from the repository root:
+
+    python benchmarks/bench_figure3d.py [max_vertices]
+
+For random trees laid out by layout.layout, times building each figure
+and serializing it the way st.plotly_chart does, and reports the payload
+size and the number of markers sent. The old figure drew no edges; the
+new one draws them all in one line trace.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout import layout  # noqa: E402
+from render import figure_3d  # noqa: E402
+
+
+def random_tree(rng, n):
+    parents = (rng.random(n - 1) * np.arange(1, n)).astype(np.int64)
+    return [tuple(edge) for edge in np.column_stack([np.arange(1, n), parents]).tolist()]
+
+
+def old_figure(vertices, positions):
+    import plotly.graph_objects as go
+
+    x, y, z = positions.T
+    return go.Figure(data=[go.Scatter3d(x=x, y=y, z=z, mode='markers+text', text=vertices,
+                                        marker=dict(size=12, color='#2196F3', opacity=0.8))])
+
+
+def timed(name, build):
+    import plotly.io
+
+    start = time.perf_counter()
+    fig = build()
+    payload = plotly.io.to_json(fig, validate=False)
+    markers = len(fig.data[-1].x)
+    print(f"    {name:4s} {(time.perf_counter() - start) * 1000:9.1f} ms  {len(payload) / 1024:9.0f} KiB  "
+          f"{markers:>7,} markers")
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(3)
+    for n in (100, 1_000, 10_000, 100_000):
+        if n > limit:
+            break
+        vertices = list(range(n))
+        edges = random_tree(rng, n)
+        positions = layout(vertices, edges, 0)
+        print(f"{n:,} vertices")
+        timed("old", lambda: old_figure(vertices, positions))
+        timed("new", lambda: figure_3d(vertices, edges, positions, 0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""GCD engine benchmark: legacy recursive Euclid vs math.gcd vs ssc.gcd.
+
+Run from the repository root:
+
+    python benchmarks/bench_gcd.py [max_digits]
+
+The "slope" column is the log-log growth exponent between consecutive rows;
+2.0 is quadratic.
+"""
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ssc  # noqa: E402
+
+
+def legacy_gcd(a, b):
+    return abs(a) if b == 0 else legacy_gcd(b, a % b)
+
+
+def hgcd_only(a, b):
+    saved = ssc.HGCD_THRESHOLD_BITS
+    ssc.HGCD_THRESHOLD_BITS = ssc._HGCD_BASE_BITS
+    try:
+        return ssc.gcd(a, b)
+    finally:
+        ssc.HGCD_THRESHOLD_BITS = saved
+
+
+def timed(fn, a, b, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            result = fn(a, b)
+        except RecursionError:
+            return None, None
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def fibonacci_pair(digits):
+    a, b = 1, 1
+    while len(str(b)) < digits:
+        a, b = b, a + b
+    return b, a
+
+
+def main():
+    max_digits = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(20058)
+    engines = [("legacy", legacy_gcd), ("math.gcd", math.gcd), ("ssc.gcd", ssc.gcd), ("hgcd", hgcd_only)]
+    print(f"{'digits':>9} " + " ".join(f"{name:>12} {'slope':>6}" for name, _ in engines))
+    previous = {}
+    digits = 100
+    while digits <= max_digits:
+        bits = int(digits * math.log2(10))
+        common = rng.getrandbits(bits // 8) | 1
+        a = rng.getrandbits(bits) * common
+        b = rng.getrandbits(bits) * common
+        repeat = 5 if digits <= 100_000 else 1
+        expected = math.gcd(a, b)
+        row = [f"{digits:>9}"]
+        for name, fn in engines:
+            if name == "legacy" and digits > 10_000:
+                row.append(f"{'-':>12} {'':>6}")
+                continue
+            seconds, result = timed(fn, a, b, repeat)
+            if seconds is None:
+                row.append(f"{'RecursionErr':>12} {'':>6}")
+                continue
+            assert result == expected, name
+            slope = ""
+            if name in previous:
+                prev_digits, prev_seconds = previous[name]
+                slope = f"{math.log(seconds / prev_seconds) / math.log(digits / prev_digits):.2f}"
+            previous[name] = (digits, seconds)
+            row.append(f"{seconds:>12.6f} {slope:>6}")
+        print(" ".join(row))
+        digits = digits * 10 if digits < 100_000 else digits * 3 + digits // 3
+
+    a, b = fibonacci_pair(2_000)
+    seconds, result = timed(ssc.gcd, a, b, 5)
+    assert result == 1
+    legacy, _ = timed(legacy_gcd, a, b, 1)
+    print(f"\nFibonacci pair, 2000 digits: ssc.gcd {seconds:.6f}s, legacy "
+          f"{'RecursionError' if legacy is None else f'{legacy:.6f}s'}")
+
+
+if __name__ == "__main__":
+    main()
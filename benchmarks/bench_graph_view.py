@@ -0,0 +1,59 @@
+"""2D view server cost: matplotlib PNG vs the browser component's payload.
+
+Run from the repository root:
+
+    python benchmarks/bench_graph_view.py [max_vertices]
+
+For random trees laid out by layout.layout, times render_2d (what the
+server did for every uncached view) against graph_view.pack (all it does
+now), and compares the PNG with the packed payload. render_2d is only run
+up to 10,000 vertices.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_view import pack  # noqa: E402
+from layout import layout  # noqa: E402
+from render import render_2d  # noqa: E402
+
+RENDER_LIMIT = 10_000
+
+
+def random_tree(rng, n):
+    parents = (rng.random(n - 1) * np.arange(1, n)).astype(np.int64)
+    return [tuple(edge) for edge in np.column_stack([np.arange(1, n), parents]).tolist()]
+
+
+def size(packed):
+    return sum(len(value) for value in packed.values() if isinstance(value, (bytes, str)))
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(5)
+    for n in (10, 100, 1_000, 10_000, 100_000):
+        if n > limit:
+            break
+        vertices = list(range(n))
+        edges = random_tree(rng, n)
+        labels = {(u, v): "GCD" if v == 0 else "LCM" for u, v in edges}
+        positions = layout(vertices, edges, 0)
+        if n <= RENDER_LIMIT:
+            start = time.perf_counter()
+            png = render_2d(vertices, edges, labels, positions)
+            server = f"{(time.perf_counter() - start) * 1000:9.1f} ms {len(png) / 1024:8.0f} KiB"
+        else:
+            server = "        -            -    "
+        start = time.perf_counter()
+        packed = pack(vertices, edges, labels, positions)
+        client = f"{(time.perf_counter() - start) * 1000:7.1f} ms {size(packed) / 1024:7.0f} KiB"
+        print(f"{n:>8,} vertices  matplotlib {server}   pack {client}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Cold start: time to the first page and where the import time goes.
+
+Run from the repository root:
+
+    python benchmarks/bench_imports.py [top_n]
+
+Each mode runs app.py once in a fresh interpreter (Streamlit bare mode)
+under `python -X importtime`: "eager" imports the heavy modules up front,
+as app.py used to, "lazy" is app.py as it is. The end-of-run preload is
+switched off in both so only the first page is measured. The report lists
+the first-page time, the whole process time, the heavy modules the page
+loaded, and the top-level imports by cumulative time.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, os, runpy, sys, time
+start = time.perf_counter()
+sys.path.insert(0, os.getcwd())
+import warmup
+warmup.warm_imports = lambda *args: None
+if {eager}:
+    for name in warmup.HEAVY_MODULES:
+        warmup.load_pyplot() if name == "matplotlib.pyplot" else __import__(name)
+runpy.run_path("app.py", run_name="__main__")
+page = time.perf_counter() - start
+loaded = [name for name in warmup.HEAVY_MODULES if name in sys.modules]
+print(json.dumps({{"page": page, "loaded": loaded}}), flush=True)
+os._exit(0)
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def run(eager, tmp):
+    env = dict(os.environ, RAZORPAY_KEY_ID="rzp_test", RAZORPAY_KEY_SECRET="secret",
+               ADSG_RESULT_STORE=os.path.join(tmp, "results.db"), ADSG_USAGE_STORE=os.path.join(tmp, "usage.db"),
+               ADSG_USAGE_JOURNAL=os.path.join(tmp, "journal"), ADSG_ENTITLEMENTS=os.path.join(tmp, "e.db"),
+               ADSG_RATES_CACHE=os.path.join(tmp, "rates.json"))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD.format(eager=eager)],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    total = time.perf_counter() - start
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    top = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and not match.group(3):
+            top[match.group(4)] = top.get(match.group(4), 0) + int(match.group(2))
+    return report, total, top
+
+
+def main():
+    top_n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for mode in ("eager", "lazy"):
+        with tempfile.TemporaryDirectory() as tmp:
+            report, total, top = run(mode == "eager", tmp)
+        print(f"{mode}: first page {report['page'] * 1000:7.0f} ms, process {total * 1000:7.0f} ms, "
+              f"heavy modules loaded: {', '.join(report['loaded']) or 'none'}")
+        for name, us in sorted(top.items(), key=lambda item: -item[1])[:top_n]:
+            print(f"    {us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
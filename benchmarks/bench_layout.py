@@ -0,0 +1,83 @@
+"""Graph layout: networkx spring_layout vs layout.layout.
+
+Run from the repository root:
+
+    python benchmarks/bench_layout.py [max_vertices]
+
+Times both on random trees (the shape of an SSG: radial layout only) and
+on trees with 1% extra edges (radial start, then the grid force layout),
+checks that layout() gives identical positions on a second run, and
+reports the shortest distance between two vertices relative to the
+drawing's size. spring_layout is O(n^2) per iteration and is only run up
+to 5,000 vertices; from 500 it needs scipy, which we do not ship, so
+there its dense Fruchterman-Reingold is called directly.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout import layout  # noqa: E402
+
+SPRING_LIMIT = 5_000
+
+
+def random_tree(rng, n):
+    parents = (rng.random(n - 1) * np.arange(1, n)).astype(np.int64)
+    return np.column_stack([np.arange(1, n), parents])
+
+
+def tree_with_cycles(rng, n):
+    extra = rng.integers(0, n, size=(max(n // 100, 1), 2))
+    extra = extra[extra[:, 0] != extra[:, 1]]
+    return np.concatenate([random_tree(rng, n), extra])
+
+
+def spread(positions, sample=2_000):
+    # Nearest-neighbour distance over a sample of vertices, per unit of extent.
+    xy = positions[:, :2]
+    picks = xy[:sample]
+    nearest = min(np.sort(np.sqrt(((xy - p) ** 2).sum(axis=1)))[1] for p in picks)
+    return nearest / max(np.ptp(xy, axis=0).max(), 1e-12)
+
+
+def spring(n, edges):
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(edges.tolist())
+    start = time.perf_counter()
+    if n < 500:
+        nx.spring_layout(G, seed=42)
+    else:
+        nx.drawing.layout._fruchterman_reingold(nx.to_numpy_array(G), seed=np.random.RandomState(42))
+    return time.perf_counter() - start
+
+
+def bench(name, n, edges):
+    vertices = list(range(n))
+    start = time.perf_counter()
+    positions = layout(vertices, edges, 0)
+    elapsed = time.perf_counter() - start
+    same = np.array_equal(positions, layout(vertices, edges, 0))
+    baseline = f"{spring(n, edges):8.3f} s" if n <= SPRING_LIMIT else "       -  "
+    print(f"{name:7s} {n:>9,}  spring {baseline}  layout {elapsed:7.3f} s  "
+          f"repeatable {same}  min gap {spread(positions):.1e}")
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(7)
+    for n in (300, 3_000, 30_000, 100_000, 300_000):
+        if n > limit:
+            break
+        bench("tree", n, random_tree(rng, n))
+        bench("cycles", n, tree_with_cycles(rng, n))
+
+
+if __name__ == "__main__":
+    main()
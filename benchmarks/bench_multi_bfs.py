@@ -0,0 +1,60 @@
+"""All-sources BFS: one scalar BFS per vertex vs the bit-parallel kernel.
+
+Run from the repository root:
+
+    python benchmarks/bench_multi_bfs.py [max_vertices]
+
+Scalar time is extrapolated from 50 timed BFS runs; the bit-parallel
+eccentricities and distance sums are checked against those runs.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ssg import CompactSSG, UNREACHED, _bfs_ids, _source_stats  # noqa: E402
+
+SAMPLES = 50
+
+
+def sparse_random(rng, n):
+    return rng.integers(0, n, size=(2 * n, 2))
+
+
+def tree_with_cycles(rng, n):
+    parents = (rng.random(n - 1) * np.arange(1, n)).astype(np.int64)
+    tree = np.column_stack([np.arange(1, n), parents])
+    return np.concatenate([tree, rng.integers(0, n, size=(n // 20, 2))])
+
+
+def bench(name, graph, rng):
+    start = time.perf_counter()
+    ecc, total, _ = _source_stats(graph, np.arange(graph.n))
+    fast_seconds = time.perf_counter() - start
+    sources = rng.choice(graph.n, size=min(SAMPLES, graph.n), replace=False)
+    start = time.perf_counter()
+    for v in sources:
+        dist = _bfs_ids(graph, v)
+        dist = dist[dist != UNREACHED]
+        assert dist.max() == ecc[v] and dist.sum() == total[v]
+    slow_seconds = (time.perf_counter() - start) / len(sources) * graph.n
+    print(f"{name:>14} {graph.n:>9} {int(ecc.max()):>6} {slow_seconds:>12.2f} {fast_seconds:>12.2f} "
+          f"{slow_seconds / fast_seconds:>8.1f}x")
+
+
+def main():
+    max_vertices = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rng = np.random.default_rng(20011)
+    print(f"{'graph':>14} {'vertices':>9} {'diam':>6} {'scalar s':>12} {'bit-par. s':>12} {'speedup':>9}")
+    for n in (1_000, 5_000, 10_000, 50_000, 100_000):
+        if n > max_vertices:
+            break
+        for name, build in (("sparse random", sparse_random), ("tree+cycles", tree_with_cycles)):
+            bench(name, CompactSSG(np.arange(n), build(rng, n)), rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Order creation: per-session client, synchronous (previous app) vs pooled OrderService.
+
+Run from the repository root:
+
+    python benchmarks/bench_orders.py [sessions] [upstream_delay_seconds]
+
+Each session submits an order for its own email against the local orders
+stub (default 20 sessions, 0.3 s upstream latency). The rerun time is what
+the form-submit rerun waits for; connections are the distinct TCP
+connections the stub saw. The idempotency runs repeat one user's submit
+and make the upstream fail or drop responses, counting orders created.
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import razorpay
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.razorpay_stub import StubOrders, serve  # noqa: E402
+from entitlements import EntitlementService, EntitlementStore  # noqa: E402
+from payments import OrderService  # noqa: E402
+
+
+def per_session_order(url, email):
+    client = razorpay.Client(auth=("rzp_test", "secret"), base_url=url)
+    start = time.perf_counter()
+    order = client.order.create({"amount": 42000, "currency": "INR", "receipt": f"adsg_1_{email}",
+                                 "payment_capture": 1})
+    return time.perf_counter() - start, order
+
+
+def wait(service, key):
+    while service.order(key) is None:
+        time.sleep(0.005)
+    return service.order(key)
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    server, url = serve(delay=delay)
+    emails = [f"user{i}@example.com" for i in range(sessions)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(sessions) as pool:
+        reruns = [seconds for seconds, _ in pool.map(lambda e: per_session_order(url, e), emails)]
+    print(f"per-session client, sync:  rerun {max(reruns) * 1000:8.1f} ms max, "
+          f"all orders {time.perf_counter() - start:6.2f} s, {len(StubOrders.connections)} connections")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        entitlements = EntitlementService(EntitlementStore(os.path.join(tmp, "e.db")), "secret")
+        service = OrderService("rzp_test", "secret", base_url=url, entitlements=entitlements)
+        StubOrders.reset(delay)
+        start = time.perf_counter()
+        keys, reruns = [], []
+        for email in emails:
+            t = time.perf_counter()
+            keys.append(service.submit(email, 42000))
+            reruns.append(time.perf_counter() - t)
+        for key in keys:
+            wait(service, key)
+        print(f"pooled OrderService:       rerun {max(reruns) * 1000:8.3f} ms max, "
+              f"all orders {time.perf_counter() - start:6.2f} s, {len(StubOrders.connections)} connections")
+
+        for label, setup in (("20 repeated submits", lambda: None),
+                             ("2 failed creates", lambda: setattr(StubOrders, "fail_creates", 2)),
+                             ("1 lost create response", lambda: setattr(StubOrders, "lose_responses", 1))):
+            StubOrders.reset(0.0)
+            setup()
+            service = OrderService("rzp_test", "secret", base_url=url, entitlements=entitlements,
+                                   timeout=(1.0, 1.0))
+            keys = {service.submit("same@example.com", 42000) for _ in range(20)}
+            order = wait(service, keys.pop())
+            again = OrderService("rzp_test", "secret", base_url=url, entitlements=entitlements)
+            other = wait(again, again.submit("same@example.com", 42000))
+            print(f"{label:24s} + another replica: {len(StubOrders.orders)} order(s) created, "
+                  f"same order {order['id'] == other['id']}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Exchange rates: blocking per-rerun fetch (previous get_inr_amount) vs RateService.
+
+Run from the repository root:
+
+    python benchmarks/bench_rates.py [upstream_delay_seconds]
+
+Both sides talk to a local stub of the exchange-rate API that answers
+after the given delay (default 1.5 s). The stub can also fail or hang to
+show the service keeps serving the last good rate.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rates import RateService  # noqa: E402
+
+RERUNS = 20
+
+
+class StubRates(BaseHTTPRequestHandler):
+    delay = 0.0
+    status = 200
+    requests_served = 0
+
+    def do_GET(self):
+        type(self).requests_served += 1
+        time.sleep(self.delay)
+        body = json.dumps({"base": "USD", "rates": {"USD": 1, "INR": 83.5, "EUR": 0.92}}).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def blocking_rate(url):
+    try:
+        return round(5 * requests.get(url).json()["rates"]["INR"])
+    except Exception:
+        return 420
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        value = fn()
+    return (time.perf_counter() - start) / RERUNS, value
+
+
+def main():
+    StubRates.delay = float(sys.argv[1]) if len(sys.argv) > 1 else 1.5
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubRates)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v4/latest/USD"
+
+    seconds, value = timed(lambda: blocking_rate(url))
+    print(f"blocking fetch per rerun:  {seconds * 1000:9.2f} ms  ₹{value}  "
+          f"({StubRates.requests_served} upstream requests)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rates.json")
+        StubRates.requests_served = 0
+        service = RateService(url=url, cache_path=path, ttl=3600)
+        seconds, value = timed(lambda: service.convert(5, "INR"))
+        print(f"cold start, no file:       {seconds * 1000:9.2f} ms  ₹{value}  (fallback while fetching)")
+        time.sleep(StubRates.delay + 0.5)
+        seconds, value = timed(lambda: service.convert(5, "INR"))
+        print(f"after background refresh:  {seconds * 1000:9.2f} ms  ₹{value}  "
+              f"({StubRates.requests_served} upstream requests)")
+
+        StubRates.status = 503
+        restarted = RateService(url=url, cache_path=path, ttl=0)
+        seconds, value = timed(lambda: restarted.convert(5, "INR"))
+        print(f"restart, upstream failing: {seconds * 1000:9.2f} ms  ₹{value}  (rate from disk)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
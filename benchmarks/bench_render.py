@@ -0,0 +1,52 @@
+"""2D render: layout + matplotlib every time vs RenderCache (memory, then disk).
+
+Run from the repository root:
+
+    python benchmarks/bench_render.py [graphs]
+
+Renders the SSGs of a few input pairs into a cache whose memory tier is
+too small to hold them, so every image spills to disk; then views them
+again through a fresh cache on the same directory (a restarted process)
+and once more from its memory.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout import layout  # noqa: E402
+from render import RenderCache, render_2d, render_key  # noqa: E402
+from ssc import compile_ops  # noqa: E402
+
+PAIRS = [(7, 20058), (12, 18), (360, 7560), (97, 1001), (1024, 3), (2310, 30030)]
+
+
+def graphs(count):
+    chain = compile_ops(("GCD", "LCM"))
+    for number1, number2 in PAIRS[:count]:
+        results = chain.results(number1, number2)
+        labels = {(u, v): "GCD" if v == results["gcd_result"] else "LCM" for u, v in results["edges"]}
+        yield results["vertices"], results["edges"], labels, results["gcd_result"]
+
+
+def timed(label, cache, items):
+    start = time.perf_counter()
+    for vertices, edges, labels, root in items:
+        cache.get_or_render(render_key(vertices, edges, labels, root),
+                            lambda: render_2d(vertices, edges, labels, layout(vertices, edges, root)))
+    print(f"{label:22s} {(time.perf_counter() - start) / len(items) * 1000:8.2f} ms per view  {cache.stats()}")
+
+
+def main():
+    items = list(graphs(int(sys.argv[1]) if len(sys.argv) > 1 else len(PAIRS)))
+    with tempfile.TemporaryDirectory() as tmp:
+        timed("first view (render)", RenderCache(max_bytes=1, spill_dir=tmp), items)
+        restarted = RenderCache(spill_dir=tmp)
+        timed("after restart, disk", restarted, items)
+        timed("repeat, memory", restarted, items)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Pairs per second: looping generate_ssc vs generate_ssc_batch.
+
+Run from the repository root:
+
+    python benchmarks/bench_ssc_batch.py [max_pairs]
+
+Inputs are drawn up to 10**6 (the range the app's number inputs see) and
+up to 10**12, where np.gcd itself needs more Euclid steps per pair.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ssc import generate_ssc, generate_ssc_batch  # noqa: E402
+
+OPS = ["GCD", "LCM"]
+
+
+def scalar_loop(xs, ys):
+    return [generate_ssc(x, y, OPS) for x, y in zip(xs.tolist(), ys.tolist())]
+
+
+def main():
+    max_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(20058)
+    print(f"{'max input':>9} {'pairs':>9} {'loop pairs/s':>14} {'batch pairs/s':>14} {'speedup':>8}")
+    for high in (10**6, 10**12):
+        n = 10_000
+        while n <= max_pairs:
+            bench(rng, high, n)
+            n *= 10
+
+
+def bench(rng, high, n):
+    xs = rng.integers(1, high, size=n, dtype=np.int64)
+    ys = rng.integers(1, high, size=n, dtype=np.int64)
+    start = time.perf_counter()
+    expected = scalar_loop(xs, ys)
+    loop_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    ssc_result, gcd_result = generate_ssc_batch(xs, ys, OPS)
+    batch_seconds = time.perf_counter() - start
+    assert list(zip(ssc_result.tolist(), gcd_result.tolist())) == expected
+    print(f"{high:>9.0e} {n:>9} {n / loop_seconds:>14,.0f} {n / batch_seconds:>14,.0f} "
+          f"{loop_seconds / batch_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
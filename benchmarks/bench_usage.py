@@ -0,0 +1,151 @@
+"""Trial counting under concurrency: usage.log rewrite (previous track_trial) vs UsageStore vs TrialRecorder.
+
+Run from the repository root:
+
+    python benchmarks/bench_usage.py [processes] [threads] [increments] [users]
+
+Every worker thread increments one shared user the given number of times
+while the log or database already holds the given number of other users.
+Lost updates are the increments missing from the final count. The
+per-call times are what a request waits for to record a trial and to
+check the count.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from multiprocessing import Process
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from usage import TrialRecorder, UsageStore  # noqa: E402
+
+MONTH = "2025-06"
+
+
+def log_increment(log_file, user_id):
+    # The read-scan-rewrite the app used to do on every rerun.
+    with open(log_file) as f:
+        logs = f.readlines()
+    user_key = f"{MONTH}:{user_id}"
+    logs = [line for line in logs if MONTH in line]
+    for i, line in enumerate(logs):
+        if user_key in line:
+            count = int(line.split(":")[-1].strip()) + 1
+            logs[i] = f"{user_key}:{count}\n"
+            break
+    else:
+        logs.append(f"{user_key}:1\n")
+    with open(log_file, "w") as f:
+        f.writelines(logs)
+
+
+def log_count(log_file, user_id):
+    with open(log_file) as f:
+        for line in f:
+            if line.startswith(f"{MONTH}:{user_id}:"):
+                return int(line.rsplit(":", 1)[1])
+    return 0
+
+
+def log_worker(path, threads, increments):
+    def run():
+        for _ in range(increments):
+            try:
+                log_increment(path, "shared")
+            except (OSError, ValueError):
+                pass  # a reader caught the file half-written
+    _threads(run, threads)
+
+
+def store_worker(path, threads, increments):
+    store = UsageStore(path)
+
+    def run():
+        for _ in range(increments):
+            store.increment("shared", MONTH)
+    _threads(run, threads)
+
+
+def recorder_worker(path, threads, increments):
+    recorder = TrialRecorder(UsageStore(path), path + ".trials")
+
+    def run():
+        for _ in range(increments):
+            recorder.record("shared", uuid.uuid4().hex, MONTH)
+    _threads(run, threads)
+    recorder.close()
+
+
+def _threads(target, count):
+    workers = [threading.Thread(target=target) for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def stress(worker, path, processes, threads, increments):
+    start = time.perf_counter()
+    workers = [Process(target=worker, args=(path, threads, increments)) for _ in range(processes)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+    return time.perf_counter() - start
+
+
+def main():
+    defaults = [4, 4, 200, 5000]
+    processes, threads, increments, users = [int(arg) for arg in sys.argv[1:]] + defaults[len(sys.argv) - 1:]
+    expected = processes * threads * increments
+    print(f"{processes} processes x {threads} threads x {increments} increments, {users} other users")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "usage.log")
+        with open(path, "w") as f:
+            f.writelines(f"{MONTH}:user{i}@example.com:{i % 50}\n" for i in range(users))
+        seconds = stress(log_worker, path, processes, threads, increments)
+        counted = log_count(path, "shared")
+        print(f"usage.log rewrite: {expected / seconds:9.0f} increments/s  "
+              f"count {counted}/{expected}  lost {expected - counted}")
+
+        # keep_months wide enough that MONTH is imported however old it is.
+        store = UsageStore(os.path.join(tmp, "usage.db"), keep_months=1200)
+        with open(path, "w") as f:
+            f.writelines(f"{MONTH}:user{i}@example.com:{i % 50}\n" for i in range(users))
+        start = time.perf_counter()
+        store.migrate_log(path)
+        print(f"migrate {users} log lines: {(time.perf_counter() - start) * 1000:9.1f} ms")
+        # Closed across the forks, then reopened.
+        store.close()
+        seconds = stress(store_worker, store.path, processes, threads, increments)
+        store = UsageStore(store.path, keep_months=1200)
+        counted = store.count("shared", MONTH)
+        print(f"UsageStore:        {expected / seconds:9.0f} increments/s  "
+              f"count {counted}/{expected}  lost {expected - counted}")
+
+        store.reset("shared", MONTH)
+        store.close()
+        seconds = stress(recorder_worker, store.path, processes, threads, increments)
+        store = UsageStore(store.path, keep_months=1200)
+        counted = store.count("shared", MONTH)
+        print(f"TrialRecorder:     {expected / seconds:9.0f} increments/s  "
+              f"count {counted}/{expected}  lost {expected - counted}")
+
+        recorder = TrialRecorder(store, store.path + ".trials")
+        for label, call in (("UsageStore.increment", lambda i: store.increment("solo", MONTH)),
+                            ("TrialRecorder.record", lambda i: recorder.record("solo", i, MONTH)),
+                            ("UsageStore.count", lambda i: store.count("solo", MONTH)),
+                            ("TrialRecorder.count", lambda i: recorder.count("solo", MONTH))):
+            start = time.perf_counter()
+            for i in range(increments):
+                call(i)
+            print(f"{label}: {(time.perf_counter() - start) / increments * 1e6:8.1f} us per call")
+        recorder.close()
+
+
+if __name__ == "__main__":
+    main()
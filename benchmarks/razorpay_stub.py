@@ -0,0 +1,105 @@
+"""Local stand-in for Razorpay's orders API, for benchmarks and manual testing.
+
+Run from the repository root to point the app at it:
+
+    python benchmarks/razorpay_stub.py [port] [delay_seconds]
+    RAZORPAY_BASE_URL=http://127.0.0.1:<port> streamlit run app.py
+
+It serves POST /v1/orders and GET /v1/orders?receipt=..., keeps orders in
+memory, and can answer slowly, fail, or drop the connection after creating
+an order (a lost response) to exercise retries.
+"""
+import json
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubOrders(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+    # Number of upcoming creates to fail with a 500, or to create and then
+    # drop the connection without answering.
+    fail_creates = 0
+    lose_responses = 0
+    orders = {}
+    connections = set()
+    requests_served = 0
+    lock = threading.Lock()
+
+    @classmethod
+    def reset(cls, delay=0.0):
+        cls.delay, cls.fail_creates, cls.lose_responses = delay, 0, 0
+        cls.orders, cls.connections, cls.requests_served = {}, set(), 0
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _count(self):
+        with self.lock:
+            type(self).requests_served += 1
+            self.connections.add(self.client_address)
+        time.sleep(self.delay)
+
+    def do_POST(self):
+        self._count()
+        data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if urlparse(self.path).path != "/v1/orders":
+            return self._reply(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "not found"}})
+        with self.lock:
+            if self.fail_creates:
+                type(self).fail_creates -= 1
+                fail, lose = True, False
+            else:
+                fail, lose = False, self.lose_responses > 0
+                type(self).lose_responses -= lose
+        if fail:
+            return self._reply(500, {"error": {"code": "SERVER_ERROR", "description": "stub failure"}})
+        order = {"id": "order_" + uuid.uuid4().hex[:14], "entity": "order", "amount": data.get("amount"),
+                 "currency": data.get("currency", "INR"), "receipt": data.get("receipt"),
+                 "status": "created", "notes": data.get("notes", {}), "created_at": int(time.time())}
+        with self.lock:
+            self.orders[order["id"]] = order
+        if lose:
+            self.close_connection = True
+            return
+        self._reply(200, order)
+
+    def do_GET(self):
+        self._count()
+        url = urlparse(self.path)
+        if url.path != "/v1/orders":
+            return self._reply(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "not found"}})
+        receipt = parse_qs(url.query).get("receipt", [None])[0]
+        with self.lock:
+            items = [o for o in self.orders.values() if receipt is None or o["receipt"] == receipt]
+        self._reply(200, {"entity": "collection", "count": len(items), "items": items})
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port=0, delay=0.0):
+    """Start the stub in a daemon thread; (server, base_url)."""
+    StubOrders.reset(delay)
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubOrders)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+if __name__ == "__main__":
+    server, url = serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8765,
+                        float(sys.argv[2]) if len(sys.argv) > 2 else 0.0)
+    print(f"Razorpay orders stub on {url} (set RAZORPAY_BASE_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,115 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def sizeof(value):
+    """Approximate bytes held by value, following containers and arrays."""
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (0 if value.base is None else value.nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sizeof(item) for item in value)
+    return size
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by total bytes, with optional TTL.
+
+    Entries older than ttl seconds count as misses and are dropped on
+    access. Values are shared between callers, so treat them as
+    read-only. on_evict(key, value), if given, is called outside the lock
+    for each entry evicted to make room.
+    """
+
+    def __init__(self, max_bytes, ttl=None, clock=time.monotonic, on_evict=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.on_evict = on_evict
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key):
+        # Caller holds the lock. Returns the entry or None, counting it.
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl is not None and self.clock() - entry[2] > self.ttl:
+            self._drop(key)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._lookup(key)
+        return default if entry is None else entry[0]
+
+    def put(self, key, value):
+        size = sizeof(key) + sizeof(value)
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                evicted.append((key, value))
+            else:
+                self._entries[key] = (value, size, self.clock())
+                self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                evicted.append((oldest, self._entries[oldest][0]))
+                self._drop(oldest)
+                self.evictions += 1
+        if self.on_evict is not None:
+            for item in evicted:
+                self.on_evict(*item)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, calling compute() to fill a miss.
+
+        compute runs outside the lock, so concurrent misses on one key may
+        each compute it; the last result stored wins.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions, "expirations": self.expirations}
+
+
+# Generate results shared by every session in the process, keyed by
+# (number1, number2, ops, METRICS_VERSION).
+RESULTS_CACHE = LRUCache(max_bytes=64 << 20, ttl=24 * 3600)
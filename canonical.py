@@ -0,0 +1,260 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from analysis import METRICS, Analysis, AnalysisResult, inputs
+
+# Canonical Forms
+# Small graphs get an exact certificate: forests (every shape Generate
+# produces) by AHU tree codes, anything else by individualization and
+# colour refinement. Colours are hashes of label-free structure, so
+# isomorphic graphs refine to the same colours. A graph whose search is
+# too large falls back to a WL hash, and a hash match is only trusted
+# after an isomorphism test.
+
+# Leaves the exact search may visit before giving up on a certificate.
+CERTIFICATE_LEAVES = 64
+# Graphs above this size skip the cache: their metrics are near-linear
+# and cost less than telling their isomorphism classes apart.
+SHAPE_CACHE_VERTICES = 256
+
+
+def _adjacency(graph):
+    neighbors, offsets = graph.neighbors.tolist(), graph.offsets.tolist()
+    return [neighbors[offsets[v]:offsets[v + 1]] for v in range(graph.n)]
+
+
+def _components(adj):
+    seen, components = set(), []
+    for start in range(len(adj)):
+        if start in seen:
+            continue
+        seen.add(start)
+        component, stack = [start], [start]
+        while stack:
+            for w in adj[stack.pop()]:
+                if w not in seen:
+                    seen.add(w)
+                    component.append(w)
+                    stack.append(w)
+        components.append(component)
+    return components
+
+
+def _tree_code(adj, root):
+    # AHU code: a vertex is "(" + its children's codes, sorted, + ")".
+    parent, order = {root: None}, [root]
+    for v in order:
+        for w in adj[v]:
+            if w not in parent:
+                parent[w] = v
+                order.append(w)
+    children = {v: [] for v in order}
+    for v in reversed(order):
+        code = "(" + "".join(sorted(children[v])) + ")"
+        if parent[v] is None:
+            return code
+        children[parent[v]].append(code)
+
+
+def _centers(adj, component):
+    degree = {v: len(adj[v]) for v in component}
+    leaves = [v for v in component if degree[v] <= 1]
+    remaining = len(component)
+    while remaining > 2:
+        remaining -= len(leaves)
+        peeled = []
+        for v in leaves:
+            for w in adj[v]:
+                degree[w] -= 1
+                if degree[w] == 1:
+                    peeled.append(w)
+        leaves = peeled
+    return leaves
+
+
+def _forest_certificate(adj, components, root_id):
+    codes = []
+    for component in components:
+        if root_id in component:
+            codes.append("r" + _tree_code(adj, root_id))
+        else:
+            codes.append(min(_tree_code(adj, c) for c in _centers(adj, component)))
+    return ("forest", tuple(sorted(codes)))
+
+
+def _initial_colors(adj, root_id):
+    colors = [len(ws) for ws in adj]
+    if root_id is not None:
+        colors[root_id] = hash((colors[root_id], "root"))
+    return colors
+
+
+def _refine(adj, colors):
+    classes = len(set(colors))
+    while True:
+        colors = [hash((c, tuple(sorted(colors[w] for w in ws)))) for c, ws in zip(colors, adj)]
+        refined = len(set(colors))
+        if refined == classes:
+            return colors
+        classes = refined
+
+
+def _form(adj, colors, root_id):
+    # The graph relabelled by colour rank (all colours distinct here).
+    rank = {c: i for i, c in enumerate(sorted(colors))}
+    position = [rank[c] for c in colors]
+    edges = sorted((min(position[v], position[w]), max(position[v], position[w]))
+                   for v, ws in enumerate(adj) for w in ws if v <= w)
+    return ("graph", len(adj), -1 if root_id is None else position[root_id], tuple(edges))
+
+
+def _search(adj, colors, root_id, budget):
+    cells = {}
+    for v, c in enumerate(colors):
+        cells.setdefault(c, []).append(v)
+    split = [(len(vs), c) for c, vs in cells.items() if len(vs) > 1]
+    if not split:
+        budget[0] -= 1
+        return _form(adj, colors, root_id)
+    # Branch on the smallest non-singleton cell (ties by colour, which is
+    # label-free). Twins - same open or closed neighbourhood - are swapped
+    # by an automorphism, so one of each twin class is enough.
+    seen, best = set(), None
+    for v in cells[min(split)[1]]:
+        twins = (tuple(sorted(adj[v])), tuple(sorted(adj[v] + [v])))
+        if seen.intersection(twins):
+            continue
+        seen.update(twins)
+        if budget[0] <= 0:
+            return None
+        branch = list(colors)
+        branch[v] = hash((branch[v], "individual"))
+        form = _search(adj, _refine(adj, branch), root_id, budget)
+        if form is None:
+            return None
+        if best is None or form < best:
+            best = form
+    return best
+
+
+def certificate(graph, root_id=None):
+    """Exact canonical form of a small graph (rooted at root_id if given).
+
+    Two graphs have equal certificates exactly when they are isomorphic
+    by an isomorphism mapping root to root. Returns None when the search
+    would visit more than CERTIFICATE_LEAVES leaves.
+    """
+    adj = _adjacency(graph)
+    components = _components(adj)
+    simple = all(len(set(ws)) == len(ws) and v not in ws for v, ws in enumerate(adj))
+    if simple and len(graph.E) == graph.n - len(components):
+        return _forest_certificate(adj, components, root_id)
+    colors = _refine(adj, _initial_colors(adj, root_id))
+    return _search(adj, colors, root_id, [CERTIFICATE_LEAVES])
+
+
+def wl_hash(graph, root_id=None):
+    """Weisfeiler-Lehman hash: equal for isomorphic graphs, rarely otherwise."""
+    adj = _adjacency(graph)
+    colors = _refine(adj, _initial_colors(adj, root_id))
+    root_color = None if root_id is None else colors[root_id]
+    return hash((graph.n, len(graph.E), root_color, tuple(sorted(colors))))
+
+
+def _as_networkx(graph, root_id):
+    import networkx as nx
+
+    g = nx.MultiGraph()
+    g.add_nodes_from(range(graph.n), root=False)
+    g.add_edges_from(zip(*(ids.tolist() for ids in graph._interner.ids(graph.E))))
+    if root_id is not None:
+        g.nodes[root_id]["root"] = True
+    return g
+
+
+def _isomorphic(a, b):
+    import networkx as nx
+
+    return nx.vf2pp_is_isomorphic(a, b, node_label="root")
+
+
+# Shape Cache
+class ShapeCache:
+    """Label-independent metrics per isomorphism class, LRU over classes.
+
+    Metrics that do not depend on the root (beta_0, beta_1, euler_char,
+    gdi, ...) are keyed by the unrooted class; SCI and SFD by the class
+    of the graph with its root marked, i.e. by the root's orbit. Only
+    scalar values are kept: per-vertex arrays depend on the labelling.
+    Thread-safe: lookups, inserts and evictions share one lock, while
+    certificates, isomorphism tests and metrics are computed outside it.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._classes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(self, ssg, root, metrics=METRICS, sfd_scales=None, sfd_roots=(), approx=None):
+        """analyze() that reuses the metrics of any isomorphic graph seen before."""
+        analysis = Analysis(ssg, root, sfd_scales=sfd_scales, sfd_roots=sfd_roots, approx=approx)
+        graph = analysis.values["graph"]
+        if graph.n <= SHAPE_CACHE_VERTICES:
+            groups = {False: [], True: []}
+            for name in metrics:
+                needs = inputs(name)
+                if not (sfd_roots and "sfd_roots" in needs):
+                    groups["root" in needs].append(name)
+            for rooted, names in groups.items():
+                if names:
+                    self._fill(analysis, names, graph.index[root] if rooted else None)
+        return AnalysisResult(analysis.compute(metrics), analysis)
+
+    def _fill(self, analysis, names, root_id):
+        # Seed analysis with the cached values of names for this graph's
+        # class, computing and storing whichever are missing.
+        graph = analysis.values["graph"]
+        options = tuple((option, analysis.values[option]) for option in ("sfd_scales", "approx")
+                        if any(option in inputs(name) for name in names))
+        shape = certificate(graph, root_id)
+        exact = shape is not None
+        key = (shape if exact else wl_hash(graph, root_id), options)
+        with self._lock:
+            candidates = list(self._classes.get(key, ()))
+        if exact:
+            probe, entry = None, candidates[0] if candidates else None
+        else:
+            probe = _as_networkx(graph, root_id)
+            entry = next((c for c in candidates if _isomorphic(c[0], probe)), None)
+        with self._lock:
+            if entry is not None:
+                if key in self._classes:
+                    self._classes.move_to_end(key)
+                known = {name: entry[1][name] for name in names if name in entry[1]}
+                analysis.values.update(known)
+                if len(known) == len(names):
+                    self.hits += 1
+                    return
+            self.misses += 1
+        values = {name: value for name, value in analysis.compute(names).items() if np.ndim(value) == 0}
+        with self._lock:
+            if entry is not None:
+                entry[1].update(values)
+                return
+            # Another thread may have stored this class meanwhile.
+            stored = self._classes.setdefault(key, [])
+            if exact and stored:
+                stored[0][1].update(values)
+            else:
+                stored.append((probe, values))
+            self._classes.move_to_end(key)
+            while len(self._classes) > self.maxsize:
+                self._classes.popitem(last=False)
+
+
+# Process-wide cache used by the app: repeat SSG shapes cost one lookup.
+SHAPE_CACHE = ShapeCache()
@@ -0,0 +1,161 @@
+import hashlib
+import hmac
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# How long one payment keeps premium: the plan is billed monthly.
+PREMIUM_PERIOD = 31 * 24 * 3600
+
+
+def verify_signature(order_id, payment_id, signature, secret):
+    """True when signature is Razorpay's HMAC-SHA256 of order_id|payment_id.
+
+    Checked locally with the key secret, as Razorpay's checkout handler
+    documents; no API call is made.
+    """
+    if not (order_id and payment_id and signature and secret):
+        return False
+    expected = hmac.new(secret.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+# Entitlement Store
+class EntitlementStore:
+    """Orders and premium entitlements shared by every process on the host.
+
+    SQLite in WAL mode. Orders are recorded when created so a payment can
+    be tied back to the user who started it: checkout redirects into a
+    fresh session. Entitlements are keyed by user, and a payment id can
+    only ever be redeemed once.
+
+    One connection serves every thread, used under a lock that also spans
+    whole transactions. It is opened on first use, so a store that cannot
+    be opened fails the checks that need it rather than the import.
+    """
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._lock = threading.RLock()
+        self._conn = None
+
+    @property
+    def _db(self):
+        with self._lock:
+            if self._conn is None:
+                db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                     check_same_thread=False)
+                try:
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("PRAGMA synchronous=NORMAL")
+                    db.execute("""CREATE TABLE IF NOT EXISTS orders (
+                        order_id TEXT PRIMARY KEY, user TEXT NOT NULL, created REAL NOT NULL) WITHOUT ROWID""")
+                    db.execute("""CREATE TABLE IF NOT EXISTS entitlements (
+                        user TEXT PRIMARY KEY, expires REAL NOT NULL) WITHOUT ROWID""")
+                    db.execute("""CREATE TABLE IF NOT EXISTS payments (
+                        payment_id TEXT PRIMARY KEY, order_id TEXT NOT NULL, user TEXT NOT NULL,
+                        paid REAL NOT NULL) WITHOUT ROWID""")
+                except BaseException:
+                    db.close()
+                    raise
+                self._conn = db
+            return self._conn
+
+    def _one(self, sql, params):
+        with self._lock:
+            return self._db.execute(sql, params).fetchone()
+
+    def add_order(self, order_id, user):
+        self._one("INSERT OR REPLACE INTO orders (order_id, user, created) VALUES (?, ?, ?)",
+                  (order_id, user, time.time()))
+
+    def order_user(self, order_id):
+        row = self._one("SELECT user FROM orders WHERE order_id = ?", (order_id,))
+        return None if row is None else row[0]
+
+    def redeem(self, payment_id, order_id, user, period=PREMIUM_PERIOD):
+        """Record a verified payment and extend user's premium by period.
+
+        The new expiry time, or None if payment_id was already redeemed:
+        a payment unlocks premium once.
+        """
+        now = time.time()
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                fresh = db.execute("INSERT OR IGNORE INTO payments (payment_id, order_id, user, paid) "
+                                   "VALUES (?, ?, ?, ?)", (payment_id, order_id, user, now)).rowcount
+                if fresh:
+                    db.execute("INSERT INTO entitlements (user, expires) VALUES (?, ?) ON CONFLICT (user) "
+                               "DO UPDATE SET expires = MAX(expires, ?) + ?", (user, now + period, now, period))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return self.expires(user) if fresh else None
+
+    def expires(self, user):
+        row = self._one("SELECT expires FROM entitlements WHERE user = ?", (user,))
+        return 0.0 if row is None else row[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Entitlement Service
+class EntitlementService:
+    """Premium status per user, verified offline and cached for ttl seconds.
+
+    is_premium() answers from an in-process TTL cache; only the first
+    check for a user per ttl reads the store. grant() verifies the
+    checkout signature with the key secret, looks up who placed the
+    order and redeems the payment, updating this process's cache at once
+    (other replicas see it within ttl). A payment is granted once: a
+    replay of the checkout redirect, in any session, is rejected.
+    """
+
+    def __init__(self, store, secret, ttl=60, clock=time.time):
+        self.store = store
+        self.secret = secret
+        self.clock = clock
+        self._cache = LRUCache(max_bytes=4 << 20, ttl=ttl)
+
+    def record_order(self, order_id, user):
+        self.store.add_order(order_id, user)
+
+    def grant(self, order_id, payment_id, signature):
+        """The user a verified payment unlocks premium for, else None."""
+        if not verify_signature(order_id, payment_id, signature, self.secret):
+            logger.warning("rejected payment %s: bad signature", payment_id)
+            return None
+        user = self.store.order_user(order_id)
+        if user is None:
+            logger.warning("rejected payment %s: unknown order %s", payment_id, order_id)
+            return None
+        expires = self.store.redeem(payment_id, order_id, user)
+        if expires is None:
+            logger.warning("rejected payment %s: already redeemed", payment_id)
+            return None
+        self._cache.put(user, expires)
+        return user
+
+    def is_premium(self, user):
+        expires = self._cache.get_or_compute(user, lambda: self.store.expires(user))
+        return expires > self.clock()
+
+
+# Service shared by every session; the key secret comes from the
+# environment and the store path from ADSG_ENTITLEMENTS.
+ENTITLEMENTS = EntitlementService(EntitlementStore(os.environ.get("ADSG_ENTITLEMENTS", "entitlements.db")),
+                                  os.environ.get("RAZORPAY_KEY_SECRET"))
@@ -0,0 +1,76 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# Spans kept per session for the trace panel.
+TRACE_SPANS = 50
+
+
+# Rerun Trace
+# Every fragment run (and every full page run) is a span: its name and
+# wall time, logged and kept in the session. A widget inside a fragment
+# reruns only that fragment, so the trace shows exactly what an
+# interaction cost.
+def _spans():
+    return st.session_state.setdefault("rerun_trace", [])
+
+
+def record(name, seconds):
+    spans = _spans()
+    spans.append((time.time(), name, seconds))
+    del spans[:-TRACE_SPANS]
+    logger.info("rerun %s: %.1f ms", name, seconds * 1000)
+
+
+@contextmanager
+def span(name):
+    """Record the time spent in the with block under name."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def fragment(name, run_every=None):
+    """st.fragment whose runs are recorded in the trace under name."""
+    def decorate(func):
+        @wraps(func)
+        def traced(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return st.fragment(traced, run_every=run_every)
+    return decorate
+
+
+def trace_enabled():
+    return st.query_params.get("trace") == "1" or bool(os.environ.get("ADSG_TRACE"))
+
+
+@st.fragment(run_every=2)
+def trace_panel():
+    with st.expander("Rerun trace", expanded=True):
+        lines = [f"{time.strftime('%H:%M:%S', time.localtime(when))} · {name}: {seconds * 1000:.1f} ms"
+                 for when, name, seconds in reversed(_spans())]
+        st.text("\n".join(lines) or "No reruns yet.")
+
+
+# Memo
+def memo(name, deps, compute):
+    """compute() kept in the session until deps change.
+
+    deps should be small and hashable (e.g. the results cache key), not
+    the data itself: they are compared on every run.
+    """
+    cached = st.session_state.get(f"memo:{name}")
+    if cached is not None and cached[0] == deps:
+        return cached[1]
+    value = compute()
+    st.session_state[f"memo:{name}"] = (deps, value)
+    return value
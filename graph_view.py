@@ -0,0 +1,45 @@
+import json
+import os
+
+import numpy as np
+import streamlit.components.v1 as components
+
+from ssg import CompactSSG
+
+# A plain HTML page that speaks the component protocol itself, so there
+# is nothing to build or serve besides the file.
+FRONTEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "graph_view")
+_component = components.declare_component("graph_view", path=FRONTEND)
+
+# Vertex labels are sent up to this many vertices; the browser draws them
+# (and edge labels) once few enough are on screen.
+LABEL_LIMIT = 5_000
+HEIGHT = 600
+STYLE = {"node_color": "#90CAF9", "edge_color": "#9E9E9E", "font_size": 11}
+
+
+def pack(vertices, edges, edge_labels, positions, label_limit=LABEL_LIMIT):
+    """Component arguments for a graph at layout.layout() positions.
+
+    Coordinates and edges go as little-endian typed arrays (bytes, which
+    Streamlit sends as binary): positions as float32 x, y per vertex,
+    edges as uint32 vertex id pairs, and each edge's label as a uint8
+    index into edge_names. Only the vertex labels, when sent, are JSON.
+    """
+    graph = CompactSSG(vertices, edges)
+    src, dst = graph.ids(edges)
+    names = {}
+    codes = np.fromiter((names.setdefault(edge_labels.get(edge), len(names)) for edge in edges),
+                        dtype=np.uint8, count=len(edges))
+    return {
+        "positions": np.ascontiguousarray(positions[:, :2], dtype="<f4").tobytes(),
+        "edges": np.column_stack([src, dst]).astype("<u4").tobytes(),
+        "edge_codes": codes.tobytes(),
+        "edge_names": [str(name) if name is not None else "" for name in names],
+        "labels": json.dumps([str(v) for v in graph.V]) if graph.n <= label_limit else None,
+    }
+
+
+def graph_view(packed, height=HEIGHT, style=STYLE, key="graph_view"):
+    """Draw a packed graph in the browser: drag to pan, wheel to zoom, double-click to refit."""
+    _component(**packed, height=height, style=style, key=key, default=None)
@@ -0,0 +1,233 @@
+import heapq
+import math
+from collections import Counter, deque
+
+import numpy as np
+
+from analysis import METRICS, Analysis, AnalysisResult
+from ssg import UNREACHED, CompactSSG
+
+INF = float('inf')
+
+
+class IncrementalSSG:
+    """SSG that keeps beta_0/beta_1, GDI and root distances current under edits.
+
+    Connectivity is tracked as explicit component labels: a merge relabels
+    the smaller side, and a split (removing the last copy of an edge that
+    is a bridge) is found by searching from both endpoints in lockstep, so
+    the cost follows the smaller side rather than the graph. GDI keeps a
+    running degree sum and sum of squares. Root distances are repaired
+    only for the vertices whose shortest paths an edit actually changes.
+    """
+
+    def __init__(self, vertices=(), edges=(), root=None):
+        self.root = root
+        self.adj = {}
+        self._deg = {}
+        self._edges = Counter()
+        self._n_edges = 0
+        self._comp = {}
+        self._members = {}
+        self._next_comp = 0
+        self._degree_sum = 0
+        self._degree_sq = 0
+        self.dist = {}
+        for v in vertices:
+            self.add_vertex(v)
+        for u, v in edges:
+            self.add_edge(u, v)
+
+    # Graph view
+    @property
+    def V(self):
+        return list(self.adj)
+
+    @property
+    def E(self):
+        return list(self._edges.elements())
+
+    def degree(self, v):
+        return self._deg[v]
+
+    # Edits
+    def add_vertex(self, v):
+        if v in self.adj:
+            return
+        self.adj[v] = Counter()
+        self._deg[v] = 0
+        self._comp[v] = self._next_comp
+        self._members[self._next_comp] = {v}
+        self._next_comp += 1
+        self.dist[v] = 0 if v == self.root else INF
+
+    def add_edge(self, u, v):
+        self.add_vertex(u)
+        self.add_vertex(v)
+        self._shift_degree(u, 1)
+        self._shift_degree(v, 1)
+        self.adj[u][v] += 1
+        if u != v:
+            self.adj[v][u] += 1
+        self._edges[self._key(u, v)] += 1
+        self._n_edges += 1
+        self._merge(u, v)
+        if self.dist[u] + 1 < self.dist[v]:
+            self._relax_from(v, self.dist[u] + 1)
+        elif self.dist[v] + 1 < self.dist[u]:
+            self._relax_from(u, self.dist[v] + 1)
+
+    def remove_edge(self, u, v):
+        key = self._key(u, v)
+        if not self._edges[key]:
+            raise KeyError((u, v))
+        self._edges[key] -= 1
+        self._n_edges -= 1
+        if not self._edges[key]:
+            del self._edges[key]
+        self._shift_degree(u, -1)
+        self._shift_degree(v, -1)
+        for a, b in ((u, v), (v, u)) if u != v else ((u, v),):
+            self.adj[a][b] -= 1
+            if not self.adj[a][b]:
+                del self.adj[a][b]
+        if u == v or v in self.adj[u]:
+            return
+        self._split(u, v)
+        if self.dist[v] < INF and self.dist[u] + 1 == self.dist[v]:
+            self._repair_from(v)
+        elif self.dist[u] < INF and self.dist[v] + 1 == self.dist[u]:
+            self._repair_from(u)
+
+    # Maintained metrics
+    @property
+    def beta_0(self):
+        return len(self._members)
+
+    @property
+    def beta_1(self):
+        return self._n_edges - len(self.adj) + self.beta_0
+
+    @property
+    def euler_char(self):
+        return self.beta_0 - self.beta_1
+
+    @property
+    def gdi(self):
+        n = len(self.adj)
+        if n == 0 or self._degree_sum == 0:
+            return 0
+        mean_deg = self._degree_sum / n
+        # n^2 * variance = n * sum(d^2) - (sum d)^2, exact in integers.
+        variance = (n * self._degree_sq - self._degree_sum ** 2) / (n * n)
+        return math.sqrt(max(variance, 0)) / mean_deg
+
+    # Snapshots
+    def to_compact(self):
+        return CompactSSG(self.V, self.E)
+
+    def analyze(self, metrics=METRICS, sfd_scales=None, sfd_roots=(), approx=None):
+        """analyze() on a snapshot, seeded with everything kept incrementally."""
+        graph = self.to_compact()
+        analysis = Analysis(graph, self.root, sfd_scales=sfd_scales, sfd_roots=sfd_roots, approx=approx)
+        distances = np.array([UNREACHED if d == INF else d for d in map(self.dist.get, graph.V)],
+                             dtype=graph.dtype)
+        analysis.values.update(beta_0=self.beta_0, beta_1=self.beta_1, euler_char=self.euler_char,
+                               gdi=self.gdi, root_distances=distances)
+        return AnalysisResult(analysis.compute(metrics), analysis)
+
+    # Internals
+    @staticmethod
+    def _key(u, v):
+        try:
+            return (u, v) if u <= v else (v, u)
+        except TypeError:
+            return (u, v) if repr(u) <= repr(v) else (v, u)
+
+    def _shift_degree(self, v, delta):
+        d = self._deg[v]
+        self._deg[v] = d + delta
+        self._degree_sum += delta
+        self._degree_sq += (d + delta) ** 2 - d ** 2
+
+    def _merge(self, u, v):
+        cu, cv = self._comp[u], self._comp[v]
+        if cu == cv:
+            return
+        if len(self._members[cu]) < len(self._members[cv]):
+            cu, cv = cv, cu
+        moved = self._members.pop(cv)
+        for w in moved:
+            self._comp[w] = cu
+        self._members[cu] |= moved
+
+    def _split(self, u, v):
+        # Grow BFS regions from u and v one vertex at a time, alternating.
+        # Meeting means u and v are still connected; a region running dry
+        # is the whole detached side and gets a fresh component label.
+        seen = ({u}, {v})
+        queues = (deque([u]), deque([v]))
+        while queues[0] and queues[1]:
+            for side in (0, 1):
+                x = queues[side].popleft()
+                for y in self.adj[x]:
+                    if y in seen[1 - side]:
+                        return
+                    if y not in seen[side]:
+                        seen[side].add(y)
+                        queues[side].append(y)
+                if not queues[side]:
+                    break
+        side = seen[0] if not queues[0] else seen[1]
+        comp = self._comp[u]
+        self._members[comp] -= side
+        self._members[self._next_comp] = side
+        for w in side:
+            self._comp[w] = self._next_comp
+        self._next_comp += 1
+
+    def _relax_from(self, v, d):
+        self.dist[v] = d
+        queue = deque([v])
+        while queue:
+            x = queue.popleft()
+            nd = self.dist[x] + 1
+            for y in self.adj[x]:
+                if nd < self.dist[y]:
+                    self.dist[y] = nd
+                    queue.append(y)
+
+    def _has_parent(self, x, excluded):
+        want = self.dist[x] - 1
+        return any(self.dist[w] == want and w not in excluded for w in self.adj[x])
+
+    def _repair_from(self, v):
+        # v may have lost its last BFS parent. Collect every vertex left
+        # without a parent outside the affected set, then settle those
+        # distances from the unaffected boundary (unit-weight Dijkstra).
+        if self._has_parent(v, ()):
+            return
+        affected = {v}
+        queue = deque([v])
+        while queue:
+            x = queue.popleft()
+            child = self.dist[x] + 1
+            for y in self.adj[x]:
+                if y not in affected and self.dist[y] == child and not self._has_parent(y, affected):
+                    affected.add(y)
+                    queue.append(y)
+        heap = []
+        for x in affected:
+            best = min((self.dist[w] + 1 for w in self.adj[x] if w not in affected), default=INF)
+            self.dist[x] = best
+            if best < INF:
+                heap.append((best, id(x), x))
+        heapq.heapify(heap)
+        while heap:
+            d, _, x = heapq.heappop(heap)
+            if d > self.dist[x]:
+                continue
+            for y in self.adj[x]:
+                if y in affected and d + 1 < self.dist[y]:
+                    self.dist[y] = d + 1
+                    heapq.heappush(heap, (d + 1, id(y), y))
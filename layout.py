@@ -0,0 +1,202 @@
+import itertools
+
+import numpy as np
+
+from ssg import UNREACHED, CompactSSG, _sweep, component_roots
+
+# Bump when the layout algorithm changes, so cached renders are not reused.
+LAYOUT_VERSION = 1
+# Every random draw in a layout comes from a generator seeded with this.
+LAYOUT_SEED = 42
+
+# Force layout defaults: iterations, and repulsion grid cells per axis.
+FORCE_ITERATIONS = 50
+FORCE_GRID = {2: 128, 3: 32}
+# Vertices sharing a grid cell also repel exactly, each from this many
+# neighbours in the cell.
+NEAR_FIELD = 4
+
+
+# Hierarchy
+def hierarchy(graph, roots):
+    """(level, parent) id arrays of a BFS forest grown from roots.
+
+    level is the hop count from the nearest root. parent is the smallest
+    neighbour one level up, or -1 for the roots, so ties are broken the
+    same way on every run.
+    """
+    level = np.full(graph.n, UNREACHED, dtype=graph.dtype)
+    _sweep(graph, roots, level)
+    heads = np.repeat(np.arange(graph.n, dtype=graph.dtype), graph.degree)
+    up = level[graph.neighbors] == level[heads] - 1
+    parent = np.full(graph.n, graph.n, dtype=np.int64)
+    np.minimum.at(parent, heads[up], graph.neighbors[up])
+    parent[parent == graph.n] = -1
+    return level, parent
+
+
+def component_sources(graph, root=None):
+    """One root id per connected component: root's id for its own, the smallest id elsewhere."""
+    comp = component_roots(graph)
+    roots = np.flatnonzero(comp == np.arange(graph.n))
+    if root is not None and root in graph.index:
+        r = graph.index[root]
+        roots[roots == comp[r]] = r
+    return roots
+
+
+def radial_layout(graph, roots):
+    """(positions, level) of a radial tree drawing of the BFS forest from roots.
+
+    Level L sits on the circle of radius L (L + 1 when there are several
+    roots, which then share the innermost ring). Each vertex gets an angular
+    sector proportional to the number of leaves below it, its children
+    split that sector in id order, and it sits in the middle of it - so
+    subtrees never cross and the GCD -> SSC tree of a result reads outward
+    from the GCD.
+    """
+    level, parent = hierarchy(graph, roots)
+    ids = np.arange(graph.n)
+    order = np.lexsort((ids, parent, level))
+    bounds = np.searchsorted(level[order], np.arange(int(level.max()) + 2))
+    by_level = [order[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+    # Leaves below every vertex, accumulated from the deepest level up.
+    weight = np.zeros(graph.n)
+    for nodes in reversed(by_level):
+        weight[nodes] = np.maximum(weight[nodes], 1)
+        below = nodes[parent[nodes] >= 0]
+        np.add.at(weight, parent[below], weight[below])
+
+    # Sector start of every vertex relative to its parent's: the weight of
+    # its earlier siblings. order groups siblings, so this is a cumulative
+    # sum restarted at each group.
+    w = weight[order]
+    before = np.cumsum(w) - w
+    first = np.r_[True, parent[order][1:] != parent[order][:-1]]
+    before -= before[np.maximum.accumulate(np.where(first, np.arange(graph.n), 0))]
+    offset = np.empty(graph.n)
+    offset[order] = before
+
+    start = offset.copy()
+    for nodes in by_level[1:]:
+        start[nodes] += start[parent[nodes]]
+
+    unit = 2 * np.pi / weight[np.asarray(roots)].sum()
+    angle = (start + weight / 2) * unit
+    radius = level + (1 if len(roots) > 1 else 0)
+    return np.column_stack([radius * np.cos(angle), radius * np.sin(angle)]), level
+
+
+# Force Layout
+def _kernel(grid, dim):
+    # Repulsion field of a unit mass at the origin, in cell units: r / |r|^2
+    # per axis, for every offset in (-grid, grid), wrapped into a 2 * grid
+    # box so the FFT convolution never wraps around.
+    axes = np.meshgrid(*[np.fft.fftfreq(2 * grid, 1 / (2 * grid))] * dim, indexing="ij")
+    r2 = sum(a * a for a in axes)
+    r2[(0,) * dim] = np.inf
+    return [np.fft.rfftn(a / r2) for a in axes]
+
+
+def _corners(cell, frac, shape):
+    # Cloud-in-cell: the flat index of each of the 2^dim grid points around
+    # every vertex, and the vertex's weight on it.
+    for corner in itertools.product((0, 1), repeat=len(cell)):
+        weight = np.ones(cell.shape[1])
+        for axis, bit in enumerate(corner):
+            weight *= frac[axis] if bit else 1 - frac[axis]
+        yield np.ravel_multi_index(tuple(cell + np.array(corner)[:, None]), shape), weight
+
+
+def force_layout(graph, dim=2, iterations=FORCE_ITERATIONS, init=None, grid=None, seed=LAYOUT_SEED):
+    """(n, dim) Fruchterman-Reingold positions in about [0, 1]^dim.
+
+    Attraction runs over the edge arrays; repulsion between all pairs is
+    approximated on a grid (particle-mesh): vertices are spread onto the
+    grid cells, the field is one FFT convolution per axis, and read back
+    at every vertex. An iteration is O(n + E + grid^dim log grid) instead
+    of O(n^2). init (n, dim) seeds the positions, otherwise they are drawn
+    from a generator seeded with seed.
+    """
+    n = graph.n
+    grid = grid or FORCE_GRID[dim]
+    if init is None:
+        pos = np.random.default_rng(seed).random((n, dim))
+    else:
+        pos = np.array(init, dtype=float)
+        span = np.ptp(pos, axis=0).max()
+        pos = (pos - pos.min(axis=0)) / (span or 1)
+    if n < 2:
+        return pos
+    # One contiguous row per axis from here on.
+    pos = np.ascontiguousarray(pos.T)
+    k = n ** (-1 / dim)
+    kernel = _kernel(grid, dim)
+    shape = (2 * grid,) * dim
+    size = (2 * grid) ** dim
+    heads = np.repeat(np.arange(n, dtype=graph.dtype), graph.degree)
+    once = heads < graph.neighbors
+    src, dst = heads[once], graph.neighbors[once]
+    ends = np.concatenate([src, dst])
+    temperature = 0.1
+    for step in range(iterations):
+        lo = pos.min(axis=1, keepdims=True)
+        h = max((pos.max(axis=1, keepdims=True) - lo).max(), 1e-9) / (grid - 1)
+        scaled = (pos - lo) / h
+        cell = np.minimum(scaled.astype(np.int64), grid - 2)
+        corners = list(_corners(cell, scaled - cell, shape))
+        mass = sum(np.bincount(at, weights=weight, minlength=size) for at, weight in corners)
+        spectrum = np.fft.rfftn(mass.reshape(shape))
+        disp = np.empty((dim, n))
+        for axis in range(dim):
+            field = np.fft.irfftn(spectrum * kernel[axis], shape, axes=tuple(range(dim))).ravel()
+            disp[axis] = sum(field[at] * weight for at, weight in corners) * (k * k / h)
+
+        # The grid blurs everything inside a cell, which lets neighbouring
+        # leaves collapse onto one point; push those apart exactly.
+        home = np.ravel_multi_index(tuple(cell), shape)
+        order = np.argsort(home, kind="stable")
+        a = np.concatenate([order[:-gap] for gap in range(1, NEAR_FIELD + 1)])
+        b = np.concatenate([order[gap:] for gap in range(1, NEAR_FIELD + 1)])
+        same = home[a] == home[b]
+        a, b = a[same], b[same]
+        delta = pos.take(a, axis=1) - pos.take(b, axis=1)
+        push = delta * (k * k / np.maximum(np.einsum("ij,ij->j", delta, delta), 1e-18))
+        near = np.concatenate([a, b])
+        for axis in range(dim):
+            disp[axis] += np.bincount(near, weights=np.concatenate([push[axis], -push[axis]]), minlength=n)
+
+        delta = pos.take(src, axis=1) - pos.take(dst, axis=1)
+        pull = delta * (np.sqrt(np.einsum("ij,ij->j", delta, delta)) / k)
+        for axis in range(dim):
+            disp[axis] -= np.bincount(ends, weights=np.concatenate([pull[axis], -pull[axis]]), minlength=n)
+
+        length = np.sqrt(np.einsum("ij,ij->j", disp, disp))
+        pos += disp * (np.minimum(length, temperature) / np.where(length > 0, length, 1))
+        temperature = 0.1 * (1 - (step + 1) / iterations) + 1e-3
+    return pos.T.copy()
+
+
+# Shared Layout
+def layout(vertices, edges, root=None, iterations=FORCE_ITERATIONS):
+    """(n, 3) positions of the graph, one row per distinct vertex in order.
+
+    x, y are the radial layout of the BFS forest from root (the GCD of a
+    result), centred on it, or the force layout started from there when
+    the graph has cycles; either way scaled to the unit disc. z is the
+    level below the root, scaled to [-1, 0]. The 2D view draws x, y and
+    the 3D view all three, so both show the same picture, and the same
+    graph always lays out the same.
+    """
+    graph = CompactSSG(vertices, edges)
+    if graph.n == 0:
+        return np.zeros((0, 3))
+    roots = component_sources(graph, root)
+    xy, level = radial_layout(graph, roots)
+    if int(graph.offsets[-1]) // 2 > graph.n - len(roots):
+        xy = force_layout(graph, 2, iterations, init=xy)
+        xy -= (xy.max(axis=0) + xy.min(axis=0)) / 2
+    reach = np.sqrt((xy * xy).sum(axis=1)).max()
+    z = -level / max(int(level.max()), 1)
+    return np.column_stack([xy / (reach or 1), z])
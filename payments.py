@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from cache import LRUCache
+from entitlements import ENTITLEMENTS
+from usage import current_month
+
+logger = logging.getLogger(__name__)
+
+RAZORPAY_URL = os.environ.get("RAZORPAY_BASE_URL", "https://api.razorpay.com")
+# Orders that can still be paid, and so be handed out again.
+OPEN_ORDER_STATUSES = ("created", "attempted")
+
+
+def idempotency_key(email, month=None):
+    """Receipt for email's order this month: one open order per user and month.
+
+    Razorpay caps receipts at 40 characters, so the email is hashed.
+    """
+    month = month or current_month()
+    return f"adsg-{month}-" + hashlib.sha256(email.strip().lower().encode()).hexdigest()[:24]
+
+
+# Order Service
+class OrderService:
+    """Creates Razorpay orders in the background, once per idempotency key.
+
+    One razorpay.Client per process shares a keep-alive session with a
+    bounded pool. submit() returns at once with the order's key; a worker
+    first asks Razorpay for an open order with that receipt, creating one
+    only if there is none, so retries, repeated clicks and other replicas
+    all converge on one order. Callers poll order() until it is ready.
+
+    A finished future leaves _futures at once; its outcome is kept for
+    done_ttl seconds in a bounded cache for the poll and the checkout
+    rerun to pick up. After that order() raises KeyError, and submitting
+    again finds the same open order.
+    """
+
+    def __init__(self, key_id, key_secret, base_url=RAZORPAY_URL, timeout=(3.0, 10.0), workers=4,
+                 attempts=3, entitlements=ENTITLEMENTS, done_ttl=600):
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.base_url = base_url
+        self.timeout = timeout
+        self.workers = workers
+        self.attempts = attempts
+        self.entitlements = entitlements
+        self._client = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="razorpay-order")
+        self._futures = {}
+        # key -> (order, error) of finished creates.
+        self._done = LRUCache(max_bytes=4 << 20, ttl=done_ttl)
+        self._lock = threading.Lock()
+        # Only for building the client, so submit() and order() never wait
+        # on the razorpay import.
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        # Built on first use, in a worker: razorpay and requests are slow
+        # to import and most sessions never pay.
+        client = self._client
+        if client is not None:
+            return client
+        with self._client_lock:
+            if self._client is None:
+                import razorpay
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers, pool_block=True)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._client = razorpay.Client(session=session, auth=(self.key_id, self.key_secret),
+                                               base_url=self.base_url)
+            return self._client
+
+    def submit(self, email, amount, currency="INR", month=None):
+        """Start (or join) creating email's order; its key for order()."""
+        key = idempotency_key(email, month)
+        with self._lock:
+            if key in self._futures:
+                return key
+            done = self._done.get(key)
+            if done is not None and done[1] is None:
+                return key
+            future = self._futures[key] = self._executor.submit(self._create, key, email, amount, currency)
+        # Outside the lock: a future that is already done runs it here.
+        future.add_done_callback(partial(self._finish, key))
+        return key
+
+    def _finish(self, key, future):
+        error = future.exception()
+        with self._lock:
+            self._done.put(key, (None if error else future.result(), error))
+            if self._futures.get(key) is future:
+                del self._futures[key]
+
+    def order(self, key):
+        """The order for key once created, None while pending; raises if it failed."""
+        with self._lock:
+            future = self._futures.get(key)
+            done = self._done.get(key) if future is None else None
+        if future is not None:
+            return future.result() if future.done() else None
+        if done is None:
+            raise KeyError(key)
+        order, error = done
+        if error is not None:
+            raise error
+        return order
+
+    def _create(self, key, email, amount, currency):
+        import razorpay
+        import requests
+
+        delay = 0.5
+        for attempt in range(1, self.attempts + 1):
+            try:
+                order = self._open_order(key, amount) or self.client.order.create(
+                    {"amount": amount, "currency": currency, "receipt": key, "payment_capture": 1,
+                     "notes": {"email": email}}, timeout=self.timeout)
+                break
+            except (requests.RequestException, razorpay.errors.ServerError) as e:
+                # The create may have landed; the next attempt looks it up first.
+                if attempt == self.attempts:
+                    raise
+                logger.warning("order %s attempt %d failed: %s", key, attempt, e)
+                time.sleep(delay)
+                delay *= 2
+        self.entitlements.record_order(order["id"], email)
+        return order
+
+    def _open_order(self, key, amount):
+        orders = self.client.order.all({"receipt": key}, timeout=self.timeout).get("items", [])
+        return next((o for o in orders if o.get("status") in OPEN_ORDER_STATUSES and o.get("amount") == amount),
+                    None)
+
+
+# Service shared by every session; keys come from the environment.
+ORDERS = OrderService(os.environ.get("RAZORPAY_KEY_ID"), os.environ.get("RAZORPAY_KEY_SECRET"))
@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RATES_URL = os.environ.get("EXCHANGE_RATE_URL", "https://api.exchangerate-api.com/v4/latest/USD")
+# Used until the first successful fetch when there is no file on disk.
+FALLBACK_RATES = {"USD": 1.0, "INR": 84.0}
+
+
+class RateService:
+    """USD exchange rates for every currency, cached for the whole process.
+
+    Readers never touch the network: rates() returns the last good table
+    (from memory, else from cache_path on disk, else FALLBACK_RATES) and,
+    when it is older than ttl, wakes a daemon thread that refetches it.
+    The fetch uses a pooled session with connect/read timeouts and a few
+    retries with backoff, and each good table is written back to disk so
+    a cold start is served without waiting on the upstream.
+    """
+
+    def __init__(self, url=RATES_URL, cache_path="rates.json", ttl=3600, timeout=(2.0, 3.0),
+                 api_key=None, session=None):
+        self.url = url
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.timeout = timeout
+        self.api_key = api_key
+        # Built by the refresh thread: requests is slow to import.
+        self.session = session
+        self._rates, self._fetched = self._load()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _session():
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",))
+        session.mount("https://", HTTPAdapter(pool_maxsize=4, max_retries=retry))
+        session.mount("http://", HTTPAdapter(pool_maxsize=4, max_retries=retry))
+        return session
+
+    def _load(self):
+        try:
+            with open(self.cache_path) as f:
+                saved = json.load(f)
+            return saved["rates"], saved["fetched"]
+        except (OSError, ValueError, KeyError):
+            return dict(FALLBACK_RATES), 0.0
+
+    def _save(self, rates, fetched):
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"fetched": fetched, "rates": rates}, f)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logger.warning("could not save exchange rates to %s: %s", self.cache_path, e)
+
+    def refresh(self):
+        """Fetch the full rate table now; True on success."""
+        import requests
+
+        if self.session is None:
+            self.session = self._session()
+        params = {"apiKey": self.api_key} if self.api_key else None
+        try:
+            response = self.session.get(self.url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            rates = {code: float(rate) for code, rate in response.json()["rates"].items()}
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            logger.warning("exchange rate refresh failed: %s", e)
+            return False
+        fetched = time.time()
+        with self._lock:
+            self._rates, self._fetched = rates, fetched
+        self._save(rates, fetched)
+        return True
+
+    def _run(self):
+        while True:
+            ok = self.refresh()
+            # Wake-ups that arrived during the fetch asked for what it just
+            # got. Retry a failed fetch sooner than a scheduled refresh.
+            self._wake.clear()
+            self._wake.wait(max(1.0, self.ttl if ok else min(self.ttl, 60)))
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rate-refresh", daemon=True)
+                self._thread.start()
+
+    def rates(self):
+        with self._lock:
+            rates, stale = self._rates, time.time() - self._fetched > self.ttl
+        if stale:
+            if self._thread is None:
+                self.start()
+            else:
+                self._wake.set()
+        return rates
+
+    def convert(self, usd_amount, currency):
+        rates = self.rates()
+        return round(usd_amount * rates.get(currency, FALLBACK_RATES.get(currency, 1.0)))
+
+
+# Process-wide service; the upstream and key come from the environment.
+RATES = RateService(cache_path=os.environ.get("ADSG_RATES_CACHE", "rates.json"),
+                    api_key=os.environ.get("EXCHANGE_RATE_API_KEY", "d959e6b77929ec489dd71252"))
@@ -0,0 +1,255 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from cache import LRUCache
+from layout import LAYOUT_VERSION
+from ssg import CompactSSG
+from warmup import load_pyplot
+
+logger = logging.getLogger(__name__)
+
+STYLE_2D = {"node_color": "#90CAF9", "node_size": 500, "font_size": 8, "edge_color": "gray"}
+SIZE_2D = (8, 6)
+
+
+def render_key(vertices, edges, labels, root=None, style=STYLE_2D, size=SIZE_2D):
+    """Content address of a rendering: everything that changes its pixels.
+
+    The layout is deterministic, so its inputs and version stand in for
+    the positions themselves.
+    """
+    payload = json.dumps([list(vertices), [[u, v, labels.get((u, v))] for u, v in edges], root,
+                          sorted(style.items()), list(size), LAYOUT_VERSION], default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_2d(vertices, edges, labels, positions, style=STYLE_2D, size=SIZE_2D):
+    """PNG bytes of the graph drawn with matplotlib.
+
+    positions is layout.layout() of the same graph: row i places the i-th
+    distinct vertex, and only x, y are drawn.
+    """
+    import networkx as nx
+    plt = load_pyplot()
+
+    G = nx.Graph()
+    G.add_nodes_from(vertices)
+    G.add_edges_from(edges)
+    pos = dict(zip(dict.fromkeys(vertices), positions[:, :2]))
+    fig = plt.figure(figsize=size)
+    try:
+        nx.draw(G, pos, with_labels=True, **style)
+        nx.draw_networkx_edge_labels(G, pos, edge_labels=labels, font_size=style["font_size"])
+        png = io.BytesIO()
+        fig.savefig(png, format="png", bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return png.getvalue()
+
+
+# 3D Figure
+# Level of detail: above LABEL_LIMIT_3D vertices the text labels are
+# dropped; above POINT_LIMIT_3D only the half of that nearest the root is
+# drawn vertex by vertex and the rest are merged, one marker per occupied
+# cell of an AGGREGATE_CELLS^3 grid.
+LABEL_LIMIT_3D = 300
+POINT_LIMIT_3D = 20_000
+AGGREGATE_CELLS = 24
+STYLE_3D = {"color": "#2196F3", "opacity": 0.8, "edge_color": "#9E9E9E"}
+
+
+def level_of_detail(positions, root=0, point_limit=POINT_LIMIT_3D, cells=AGGREGATE_CELLS):
+    """(points, counts, member) for drawing positions with at most about point_limit markers.
+
+    points are the marker positions, counts how many vertices each one
+    stands for, and member[i] the marker vertex i is drawn as.
+    """
+    n = len(positions)
+    if n <= point_limit:
+        return positions, np.ones(n, dtype=np.int64), np.arange(n)
+    dist = np.einsum("ij,ij->i", positions - positions[root], positions - positions[root])
+    order = np.argsort(dist, kind="stable")
+    near, far = order[:point_limit // 2], order[point_limit // 2:]
+    lo = positions[far].min(axis=0)
+    extent = np.maximum(positions[far].max(axis=0) - lo, 1e-12)
+    cell = np.minimum(((positions[far] - lo) / extent * cells).astype(np.int64), cells - 1)
+    occupied, cluster = np.unique(np.ravel_multi_index(tuple(cell.T), (cells,) * 3), return_inverse=True)
+    counts = np.bincount(cluster, minlength=len(occupied))
+    centroids = np.column_stack([np.bincount(cluster, weights=positions[far, axis]) for axis in range(3)])
+    member = np.empty(n, dtype=np.int64)
+    member[near] = np.arange(len(near))
+    member[far] = len(near) + cluster
+    points = np.concatenate([positions[near], centroids / counts[:, None]])
+    return points, np.concatenate([np.ones(len(near), dtype=np.int64), counts]), member
+
+
+def edge_segments(graph, member, points):
+    """(3 * E, 3) float32 polyline of every edge between distinct markers, NaN-separated.
+
+    One line trace then draws all edges; edges merged by level_of_detail
+    are drawn once.
+    """
+    heads = np.repeat(np.arange(graph.n), graph.degree)
+    src, dst = member[heads], member[graph.neighbors]
+    once = src < dst
+    pairs = np.unique(np.column_stack([src[once], dst[once]]), axis=0)
+    segments = np.full((len(pairs), 3, 3), np.nan, dtype=np.float32)
+    segments[:, 0] = points[pairs[:, 0]]
+    segments[:, 1] = points[pairs[:, 1]]
+    return segments.reshape(-1, 3)
+
+
+def figure_3d(vertices, edges, positions, root=None, label_limit=LABEL_LIMIT_3D,
+              point_limit=POINT_LIMIT_3D, cells=AGGREGATE_CELLS, style=STYLE_3D):
+    """Plotly figure of the graph at layout.layout() positions.
+
+    Two traces whatever the size: one line trace for all edges and one
+    marker trace, with coordinates as float32 arrays so they travel as
+    binary typed arrays rather than JSON numbers.
+    """
+    import plotly.graph_objects as go
+
+    graph = CompactSSG(vertices, edges)
+    points, counts, member = level_of_detail(positions, graph.index.get(root, 0), point_limit, cells)
+    points = points.astype(np.float32)
+    lines = edge_segments(graph, member, points)
+    labelled = graph.n <= label_limit
+    size = 12 if labelled else 4
+    if len(points) < graph.n:
+        # A merged marker grows with the vertices it stands for.
+        size = np.minimum(size * np.sqrt(counts), 5 * size).astype(np.float32)
+    markers = go.Scatter3d(
+        x=points[:, 0], y=points[:, 1], z=points[:, 2], mode="markers+text" if labelled else "markers",
+        text=graph.V if labelled else None, hoverinfo="text" if labelled else "none",
+        marker=dict(size=size, color=style["color"], opacity=style["opacity"]))
+    fig = go.Figure(data=[
+        go.Scatter3d(x=lines[:, 0], y=lines[:, 1], z=lines[:, 2], mode="lines", hoverinfo="none",
+                     line=dict(color=style["edge_color"], width=2)),
+        markers,
+    ])
+    fig.update_layout(
+        title="GCD Graph Visualization",
+        scene=dict(xaxis_title='X', yaxis_title='Y', zaxis_title='Z'),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        showlegend=False,
+        width=800, height=600
+    )
+    return fig
+
+
+# Render Cache
+class RenderCache:
+    """Encoded images by content address: an LRU in memory, spilling to disk.
+
+    Images evicted from memory are written to spill_dir (if set), named
+    by their key, and read back - and promoted - on the next request, so
+    a repeat view of any graph skips layout and rasterization. The spill
+    directory is trimmed to three quarters of max_spill_bytes, least
+    recently used first, whenever it grows past it.
+    """
+
+    def __init__(self, max_bytes=32 << 20, spill_dir=None, max_spill_bytes=256 << 20):
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.memory = LRUCache(max_bytes, on_evict=self._spill if spill_dir else None)
+        self.renders = 0
+        self.disk_hits = 0
+        self._spill_bytes = None
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.spill_dir, key[:2], key + ".png")
+
+    def _spill(self, key, image):
+        path = self._path(key)
+        try:
+            # Keys are content addresses: an image promoted back from disk
+            # is still there, byte for byte, and already counted.
+            os.utime(path)
+            return
+        except OSError:
+            pass
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(image)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("could not spill render %s: %s", key, e)
+            return
+        with self._lock:
+            if self._spill_bytes is None:
+                self._spill_bytes = sum(size for _, size, _ in self._spilled())
+            else:
+                self._spill_bytes += len(image)
+            trim = self._spill_bytes > self.max_spill_bytes
+        if trim:
+            self.trim()
+
+    def _spilled(self):
+        # (path, size, last used) of every spilled image.
+        for root, _, names in os.walk(self.spill_dir):
+            for name in names:
+                if name.endswith(".png"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _load(self, key):
+        if not self.spill_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                image = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        self.disk_hits += 1
+        return image
+
+    def get_or_render(self, key, render):
+        """Image for key from memory, else disk, else render()."""
+        image = self.memory.get(key)
+        if image is None:
+            image = self._load(key)
+            if image is None:
+                image = render()
+                self.renders += 1
+            self.memory.put(key, image)
+        return image
+
+    def trim(self, target=None):
+        """Delete the least recently used spilled images down to target bytes."""
+        target = self.max_spill_bytes * 3 // 4 if target is None else target
+        files = sorted(self._spilled(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._spill_bytes = total
+
+    def stats(self):
+        return dict(self.memory.stats(), renders=self.renders, disk_hits=self.disk_hits)
+
+
+# Renders shared by every session in the process; the spill directory can
+# be moved with ADSG_RENDER_SPILL, or disabled by setting it empty.
+RENDER_CACHE = RenderCache(spill_dir=os.environ.get("ADSG_RENDER_SPILL", "render-cache") or None)
@@ -0,0 +1,292 @@
+import math
+from functools import lru_cache
+from operator import index
+
+import numpy as np
+
+# GCD Engine
+# Below this size math.gcd (C-level Lehmer) wins; above it the half-GCD
+# reduction below is subquadratic and takes over.
+HGCD_THRESHOLD_BITS = 1 << 20
+# Size at which _hgcd stops recursing and finishes with plain Euclid steps.
+_HGCD_BASE_BITS = 1 << 11
+
+# 2x2 matrices are (p, q, r, s, det) tuples; carrying det (+-1) along
+# saves two full-size multiplications per inversion.
+_IDENTITY = (1, 0, 0, 1, 1)
+
+
+def _mat_mul(m, n):
+    a, b, c, d, e = m
+    w, x, y, z, f = n
+    return a * w + b * y, a * x + b * z, c * w + d * y, c * x + d * z, e * f
+
+
+def _apply_inverse(m, a, b):
+    # (a, b) = M (a', b')  =>  (a', b') = M^-1 (a, b)
+    p, q, r, s, det = m
+    x, y = s * a - q * b, p * b - r * a
+    return (x, y) if det > 0 else (-x, -y)
+
+
+def _euclid_until(a, b, m, s):
+    # Plain Euclid steps, folded into m, until b drops below 2**s.
+    p, q, r, t, det = m
+    while b.bit_length() > s:
+        quo, rem = divmod(a, b)
+        a, b = b, rem
+        p, q, r, t, det = p * quo + q, p, r * quo + t, r, -det
+    return a, b, (p, q, r, t, det)
+
+
+def _reduce_top(a, b, m, k):
+    # Run _hgcd on the top bits of (a, b) and lift the quotients to the full
+    # operands. The last few top-bit quotients can be wrong for the full
+    # pair; step them back until (x, y) is a valid remainder pair again.
+    # M^-1 is linear and the recursive call already reduced the top bits,
+    # so only the low k bits go through the full multiplication.
+    hi_a, hi_b, top = _hgcd(a >> k, b >> k)
+    mask = (1 << k) - 1
+    x, y = _apply_inverse(top, a & mask, b & mask)
+    x += hi_a << k
+    y += hi_b << k
+    while not 0 <= y < x:
+        p, q, r, s, det = top
+        if q == 0:
+            return a, b, m
+        quo = p // q
+        if r < quo * s:
+            quo -= 1
+        top = (q, p - quo * q, s, r - quo * s, -det)
+        x, y = quo * x + y, x
+    return x, y, _mat_mul(m, top)
+
+
+def _hgcd(a, b):
+    """Half-GCD of a >= b >= 0.
+
+    Returns (a', b', M) with (a, b) = M (a', b'), M unimodular with
+    non-negative entries, and b' < 2**s <= a' where s = bits(a) // 2 + 1.
+    Recursion depth is logarithmic in the operand size.
+    """
+    n = a.bit_length()
+    s = (n >> 1) + 1
+    if b.bit_length() <= s:
+        return a, b, _IDENTITY
+    if n <= _HGCD_BASE_BITS:
+        return _euclid_until(a, b, _IDENTITY, s)
+    a, b, m = _reduce_top(a, b, _IDENTITY, s)
+    if b.bit_length() > s:
+        quo, rem = divmod(a, b)
+        a, b = b, rem
+        m = _mat_mul(m, (quo, 1, 1, 0, -1))
+        if b.bit_length() > s:
+            k = 2 * s - a.bit_length()
+            if k > 0:
+                a, b, m = _reduce_top(a, b, m, k)
+    return _euclid_until(a, b, m, s)
+
+
+def gcd(a: int, b: int) -> int:
+    """Iterative GCD; half-GCD reduction for huge operands, then math.gcd."""
+    a, b = abs(index(a)), abs(index(b))
+    if a < b:
+        a, b = b, a
+    while b.bit_length() > HGCD_THRESHOLD_BITS:
+        if a.bit_length() - b.bit_length() > 1:
+            a, b = b, a % b
+            continue
+        a, b, _ = _hgcd(a, b)
+        if b:
+            a, b = b, a % b
+    return math.gcd(a, b)
+
+
+def lcm(a: int, b: int) -> int:
+    a, b = abs(index(a)), abs(index(b))
+    if a == 0 or b == 0:
+        return 0
+    return a // gcd(a, b) * b
+
+
+# Batch Kernels
+_INT64_MAX = np.iinfo(np.int64).max
+_object_gcd = np.frompyfunc(gcd, 2, 1)
+_object_lcm = np.frompyfunc(lcm, 2, 1)
+
+
+def _as_batch(values):
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        return arr
+    if arr.dtype.kind not in "iu":
+        raise TypeError(f"expected integer inputs, got dtype {arr.dtype}")
+    if arr.dtype == np.uint64 and arr.size and arr.max() > _INT64_MAX:
+        return arr.astype(object)
+    return arr.astype(np.int64, copy=False)
+
+
+def _batch_gcd(a, b):
+    if a.dtype == object or b.dtype == object:
+        return _object_gcd(a.astype(object), b.astype(object))
+    return np.gcd(a, b)
+
+
+def _batch_lcm(a, c: int):
+    if a.dtype == object:
+        return _object_lcm(a, c)
+    c = abs(c)
+    if c == 0:
+        return np.zeros_like(a)
+    # lcm(a, c) = |a| / gcd(a, c) * c overflows int64 once that quotient
+    # exceeds INT64_MAX // c; only then fall back to Python ints.
+    quotient = np.abs(a) // np.gcd(a, c)
+    if quotient.size and quotient.max() > _INT64_MAX // c:
+        return _object_lcm(a.astype(object), c)
+    return quotient * c
+
+
+# Op Chains
+# Ops applied once the pair has been reduced to a single value:
+# name -> (scalar fn, batch fn, default constant). Every op here satisfies
+# op(op(a, c1), c2) == op(a, op(c1, c2)), so runs of the same op fold into
+# a single step.
+UNARY_OPS = {
+    "LCM": (lcm, _batch_lcm, 10),
+}
+
+
+@lru_cache(maxsize=65536)
+def _reduce_pair(x: int, y: int) -> int:
+    return gcd(x, y)
+
+
+def _parse_op(op):
+    if isinstance(op, str):
+        name, _, const = op.partition(":")
+        const = int(const) if const else None
+    else:
+        name, const = op
+    if name == "GCD":
+        if const is not None:
+            raise ValueError("GCD takes no constant")
+        return name, None
+    if name not in UNARY_OPS:
+        raise ValueError(f"unknown op {op!r}")
+    return name, UNARY_OPS[name][2] if const is None else index(const)
+
+
+def _fold(steps):
+    folded = []
+    for name, const in steps:
+        if folded and folded[-1][0] == name:
+            folded[-1] = (name, UNARY_OPS[name][0](folded[-1][1], const))
+        else:
+            folded.append((name, const))
+    return tuple(folded)
+
+
+class OpChain:
+    """An op list compiled once into a reusable SSC callable.
+
+    Ops are "GCD", "LCM" (constant 10), "LCM:<c>" or ("LCM", c). The first
+    GCD reduces the input pair; unary ops before it are no-ops, as are
+    GCDs after it apart from recording gcd_result. Calling the chain
+    returns (ssc_result, gcd_result) like generate_ssc.
+    """
+
+    def __init__(self, ops):
+        parsed = [_parse_op(op) for op in ops]
+        names = [name for name, _ in parsed]
+        self.ops = tuple(parsed)
+        self.reduces = "GCD" in names
+        if self.reduces:
+            first = names.index("GCD")
+            last = len(names) - 1 - names[::-1].index("GCD")
+            before = [step for step in parsed[first:last] if step[0] != "GCD"]
+            after = parsed[last + 1:]
+        else:
+            before, after = [], []
+        # Steps up to the last GCD produce gcd_result; the rest build on it.
+        self.before_gcd = _fold(before)
+        self.after_gcd = _fold(after)
+        self._scalar = [UNARY_OPS[name][0] for name, _ in self.before_gcd + self.after_gcd]
+        self._batch = [UNARY_OPS[name][1] for name, _ in self.before_gcd + self.after_gcd]
+        self._consts = [const for _, const in self.before_gcd + self.after_gcd]
+        self._trace = lru_cache(maxsize=4096)(self._evaluate)
+
+    def _evaluate(self, x, y):
+        current = _reduce_pair(x, y)
+        values = [current]
+        for fn, const in zip(self._scalar, self._consts):
+            current = fn(current, const)
+            values.append(current)
+        return tuple(values)
+
+    def trace(self, x: int, y: int) -> tuple:
+        """Values after the pair reduction and after each folded step."""
+        if not self.reduces:
+            raise ValueError("op chain never reduces the input pair")
+        return self._trace(x, y)
+
+    def __call__(self, x: int, y: int) -> tuple:
+        if not self.reduces:
+            return (x, y), None
+        values = self.trace(x, y)
+        return values[-1], values[len(self.before_gcd)]
+
+    def batch(self, xs, ys) -> tuple:
+        if not self.reduces:
+            return None, None
+        current = _batch_gcd(_as_batch(xs), _as_batch(ys))
+        gcd_result = current
+        for i, (fn, const) in enumerate(zip(self._batch, self._consts)):
+            current = fn(current, const)
+            if i + 1 == len(self.before_gcd):
+                gcd_result = current
+        return current, gcd_result
+
+    def results(self, x: int, y: int):
+        """The results dict app.py renders: values plus the SSG vertex/edge list.
+
+        Edges run from each input to the reduced value and then along each
+        step; self-loops from values an op leaves unchanged are skipped.
+        Returns None when the chain never reduces the pair.
+        """
+        if not self.reduces:
+            return None
+        values = self.trace(x, y)
+        gcd_result = values[len(self.before_gcd)]
+        edges = [(v, values[0]) for v in (x, y) if v != values[0]]
+        edges += [(u, v) for u, v in zip(values, values[1:]) if u != v]
+        return {
+            "ssc_result": values[-1],
+            "gcd_result": gcd_result,
+            "vertices": list(set([x, y, *values])),
+            "edges": edges,
+        }
+
+
+@lru_cache(maxsize=128)
+def _compile(ops: tuple) -> OpChain:
+    return OpChain(ops)
+
+
+def compile_ops(ops) -> OpChain:
+    return _compile(tuple(tuple(op) if isinstance(op, list) else op for op in ops))
+
+
+# SSC Generation
+def generate_ssc(x: int, y: int, ops: list) -> tuple:
+    return compile_ops(ops)(x, y)
+
+
+def generate_ssc_batch(xs, ys, ops: list) -> tuple:
+    """Vectorized generate_ssc over arrays of (x, y) pairs.
+
+    Takes int64-compatible arrays (Python ints too large for int64 go
+    through an object-dtype path) and returns (ssc_result, gcd_result)
+    arrays. Returns (None, None) when ops never reduces the pair, which
+    is where the scalar version leaves gcd_result as None.
+    """
+    return compile_ops(ops).batch(xs, ys)
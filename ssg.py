@@ -0,0 +1,635 @@
+import math
+from collections import defaultdict
+from itertools import islice
+
+import numpy as np
+
+from approx import Estimate
+
+# Distance sentinel for vertices a BFS never reaches.
+UNREACHED = -1
+
+
+# SSG Class and Metrics
+class SSG:
+    def __init__(self, vertices, edges):
+        self.V = vertices
+        self.E = edges
+        self.adj = defaultdict(list)
+        for u, v in edges:
+            self.adj[u].append(v)
+            self.adj[v].append(u)
+
+
+class _Interner:
+    # Label -> vertex id for a list of unique labels. Integer labels are
+    # resolved by binary search over a sorted copy instead of a dict walk.
+    def __init__(self, labels):
+        self.labels = labels
+        self._index = None
+        self._order = None
+        keys = np.asarray(labels)
+        if keys.ndim == 1 and keys.dtype.kind in "iu" and keys.size:
+            self._order = np.argsort(keys, kind="stable")
+            self._sorted = keys[self._order]
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {v: i for i, v in enumerate(self.labels)}
+        return self._index
+
+    def ids(self, edges):
+        """(src, dst) id arrays for a sequence of label pairs."""
+        pairs = np.asarray(edges) if len(edges) else np.empty((0, 2), dtype=np.int64)
+        if self._order is not None and pairs.ndim == 2 and pairs.dtype.kind in "iu":
+            flat = pairs.ravel()
+            slots = np.minimum(np.searchsorted(self._sorted, flat), len(self._sorted) - 1)
+            unknown = self._sorted[slots] != flat
+            if unknown.any():
+                raise KeyError(flat[unknown][0].item())
+            ids = self._order[slots].reshape(-1, 2)
+        else:
+            index = self.index
+            ids = np.array([(index[u], index[v]) for u, v in edges], dtype=np.int64).reshape(-1, 2)
+        return ids[:, 0], ids[:, 1]
+
+
+class CompactSSG:
+    """Array-backed SSG: vertices interned to 0..n-1, adjacency in CSR form.
+
+    The neighbours of vertex i are neighbors[offsets[i]:offsets[i + 1]].
+    V keeps the original labels (index i is label V[i]) and E the original
+    label pairs, so code that only reads V and E works unchanged.
+    """
+
+    def __init__(self, vertices, edges):
+        self.V = list(dict.fromkeys(vertices))
+        self.E = edges
+        n = len(self.V)
+        self.dtype = np.int32 if n < 2**31 else np.int64
+        self._interner = _Interner(self.V)
+        src, dst = self._interner.ids(edges)
+        heads = np.concatenate([src, dst])
+        tails = np.concatenate([dst, src])
+        order = np.argsort(heads, kind="stable")
+        self.neighbors = tails[order].astype(self.dtype, copy=False)
+        self.degree = np.bincount(heads, minlength=n).astype(self.dtype, copy=False)
+        self.offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(self.degree, out=self.offsets[1:])
+        self._lists = None
+
+    @classmethod
+    def from_ssg(cls, ssg):
+        return cls(ssg.V, ssg.E)
+
+    @property
+    def index(self):
+        """Label -> vertex id, built on first use."""
+        return self._interner.index
+
+    @property
+    def n(self):
+        return len(self.V)
+
+    def ids(self, edges):
+        """(src, dst) id arrays for a sequence of label pairs."""
+        return self._interner.ids(edges)
+
+    def adjacency_lists(self):
+        """(offsets, neighbors) as Python lists for scalar loops, built on first use."""
+        if self._lists is None:
+            self._lists = (self.offsets.tolist(), self.neighbors.tolist())
+        return self._lists
+
+    def gather(self, frontier):
+        """Concatenated neighbour lists of the vertex ids in frontier."""
+        counts = self.degree[frontier]
+        ends = np.cumsum(counts)
+        total = int(ends[-1]) if len(ends) else 0
+        if total == 0:
+            return self.neighbors[:0]
+        shift = np.repeat(self.offsets[frontier] - (ends - counts), counts)
+        return self.neighbors[np.arange(total) + shift]
+
+    def edge_chunks(self, size):
+        """(src, dst) id arrays covering every edge, at most size per chunk.
+
+        Each undirected edge appears once per direction.
+        """
+        total = int(self.offsets[-1])
+        for start in range(0, total, size):
+            positions = np.arange(start, min(start + size, total))
+            heads = np.searchsorted(self.offsets, positions, side="right") - 1
+            yield heads.astype(self.dtype, copy=False), self.neighbors[positions]
+
+
+def as_compact(ssg):
+    return ssg if isinstance(ssg, CompactSSG) else CompactSSG.from_ssg(ssg)
+
+
+# Frontiers smaller than this are expanded one vertex at a time: below
+# it the fixed cost of the array operations per level outweighs the
+# loop, which on deep, path-like graphs is nearly every level.
+SCALAR_FRONTIER = 64
+
+
+def _scalar_levels(graph, frontier, dist, level):
+    # Queue BFS over the adjacency lists from the ids in frontier (at
+    # level), one level at a time until a level reaches SCALAR_FRONTIER
+    # vertices or the sweep ends. Returns that last level as an array, its
+    # number, and every id reached, each level in id order like np.unique.
+    offsets, neighbors = graph.adjacency_lists()
+    # A memoryview reads and writes single entries far faster than numpy
+    # scalar indexing.
+    marks = memoryview(dist)
+    current = frontier.tolist()
+    found = []
+    while current and len(current) < SCALAR_FRONTIER:
+        level += 1
+        reached = []
+        for v in current:
+            for w in neighbors[offsets[v]:offsets[v + 1]]:
+                if marks[w] == UNREACHED:
+                    marks[w] = level
+                    reached.append(w)
+        reached.sort()
+        found += reached
+        current = reached
+    return np.array(current, dtype=graph.dtype), level, found
+
+
+def _sweep(graph, sources, dist):
+    # Level-synchronous BFS from one source id or an array of them,
+    # writing hop counts into dist (UNREACHED everywhere the sources cannot
+    # reach). Returns the visited ids in BFS order, so the last one is a
+    # farthest vertex and callers can reset just those entries to reuse
+    # the buffer. Wide levels go through the CSR arrays; narrow ones
+    # through _scalar_levels.
+    frontier = np.unique(np.asarray(sources, dtype=graph.dtype).reshape(-1))
+    dist[frontier] = 0
+    visited = [frontier]
+    level = 0
+    while frontier.size:
+        if len(frontier) < SCALAR_FRONTIER:
+            frontier, level, found = _scalar_levels(graph, frontier, dist, level)
+            if found:
+                visited.append(np.array(found, dtype=graph.dtype))
+            continue
+        level += 1
+        reached = graph.gather(frontier)
+        frontier = np.unique(reached[dist[reached] == UNREACHED])
+        dist[frontier] = level
+        visited.append(frontier)
+    return np.concatenate(visited) if len(visited) > 1 else visited[0]
+
+
+def _bfs_ids(graph, source):
+    dist = np.full(graph.n, UNREACHED, dtype=graph.dtype)
+    _sweep(graph, source, dist)
+    return dist
+
+
+def _component_diameter(graph, order, dist, aux, budget=None):
+    # order/dist hold a finished sweep of one component. Trees are settled
+    # exactly by a second sweep from the farthest vertex; anything else goes
+    # through iFUB, which only needs eccentricities of the fringe levels
+    # around a central vertex until the bounds meet. budget caps the fringe
+    # sweeps; the (lower, upper) bounds returned are equal when exact.
+    far = order[-1]
+    dist[order] = UNREACHED
+    if len(order) <= 2:
+        return len(order) - 1, len(order) - 1
+    edges = int(graph.degree[order].sum()) // 2
+    order_a = _sweep(graph, far, dist)
+    lower = int(dist[order_a[-1]])
+    if edges == len(order) - 1:
+        dist[order_a] = UNREACHED
+        return lower, lower
+    # Centre of the a-b diametral path: dist_a == lower // 2 and on the path.
+    aux[order_a] = dist[order_a]
+    dist[order_a] = UNREACHED
+    order_b = _sweep(graph, order_a[-1], dist)
+    from_a = aux[order_b]
+    on_path = np.flatnonzero((from_a + dist[order_b] == lower) & (from_a == lower // 2))
+    centre = order_b[on_path[0]]
+    # From here aux holds ecc upper bounds: ecc(w) <= ecc(x) + d(x, w) for
+    # every swept x. Fringe vertices that cannot beat the lower bound are
+    # skipped without a BFS.
+    aux[order_b] = np.minimum(from_a + lower, dist[order_b] + int(dist[order_b[-1]]))
+    dist[order_b] = UNREACHED
+
+    order_u = _sweep(graph, centre, dist)
+    levels = dist[order_u].copy()
+    i = int(levels[-1])
+    aux[order_u] = np.minimum(aux[order_u], levels + i)
+    dist[order_u] = UNREACHED
+    lower = max(lower, i)
+    upper = 2 * i
+    while upper > lower:
+        fringe = order_u[levels == i]
+        for v in fringe[np.argsort(-aux[fringe], kind="stable")]:
+            if aux[v] <= lower:
+                continue
+            if budget is not None:
+                if budget == 0:
+                    return lower, max(lower, min(upper, int(aux[order_u].max())))
+                budget -= 1
+            visited = _sweep(graph, v, dist)
+            ecc = int(dist[visited[-1]])
+            lower = max(lower, ecc)
+            aux[visited] = np.minimum(aux[visited], dist[visited] + ecc)
+            dist[visited] = UNREACHED
+        if lower > 2 * (i - 1):
+            return lower, lower
+        i -= 1
+        upper = 2 * i
+    return lower, lower
+
+
+def diameter_bounds(ssg, budget=None):
+    """(lower, upper) bounds on the diameter, max over components.
+
+    Each non-tree component may spend at most budget extra BFS sweeps;
+    with budget=None the bounds meet at the exact diameter.
+    """
+    graph = as_compact(ssg)
+    dist = np.full(graph.n, UNREACHED, dtype=graph.dtype)
+    aux = np.empty_like(dist)
+    seen = np.zeros(graph.n, dtype=bool)
+    lower = upper = 0
+    for v in range(graph.n):
+        if seen[v]:
+            continue
+        order = _sweep(graph, v, dist)
+        seen[order] = True
+        low, high = _component_diameter(graph, order, dist, aux, budget)
+        lower, upper = max(lower, low), max(upper, high)
+    return lower, upper
+
+
+def diameter(ssg):
+    """Largest finite BFS distance in the graph (max over components).
+
+    Equal to the maximum eccentricity the all-pairs BFS used to find, at
+    the cost of a couple of sweeps per tree component and usually a small
+    number for the rest.
+    """
+    return diameter_bounds(ssg)[0]
+
+
+def bfs(ssg, start):
+    """Hop distances from start.
+
+    CompactSSG returns an integer array indexed by vertex id with
+    UNREACHED as the sentinel; SSG keeps its label -> distance dict with
+    float('inf') for unreachable vertices.
+    """
+    if isinstance(ssg, CompactSSG):
+        return _bfs_ids(ssg, ssg.index[start])
+    graph = as_compact(ssg)
+    dist = _bfs_ids(graph, graph.index[start])
+    return {v: float('inf') if d == UNREACHED else d for v, d in zip(graph.V, dist.tolist())}
+
+
+# Multi-source BFS
+# Sources advance in batches of 64 per uint64 word: bit j of a vertex's
+# word marks that source j has reached it, so one OR over neighbour lists
+# moves every source in the batch forward a level. Batches are capped at
+# MULTI_BFS_WORDS words and at MULTI_BFS_BYTES for the gathered neighbour
+# words.
+MULTI_BFS_WORDS = 16
+MULTI_BFS_BYTES = 1 << 27
+
+# Row b holds the bits of byte value b, for counting set bits per column.
+_BYTE_BITS = ((np.arange(256)[:, None] >> np.arange(8)) & 1).astype(np.int64)
+
+
+def _bit_counts(words, k):
+    # Number of rows with each of the first k bits set, via a histogram of
+    # byte values per byte column.
+    octets = words.astype("<u8", copy=False).view(np.uint8)
+    columns = octets.shape[1]
+    keys = octets + (np.arange(columns, dtype=np.int64) << 8)
+    hist = np.bincount(keys.ravel(), minlength=columns * 256).reshape(columns, 256)
+    return (hist @ _BYTE_BITS).ravel()[:k]
+
+
+def _multi_bfs(graph, sources):
+    """Per-level reach counts for many sources, one batch at a time.
+
+    Yields (start, counts) where counts[r, j] is the number of vertices at
+    distance r from sources[start + j].
+    """
+    n = graph.n
+    sources = np.asarray(sources, dtype=np.int64)
+    words = max(1, min(MULTI_BFS_WORDS, MULTI_BFS_BYTES // (8 * max(len(graph.neighbors), 1))))
+    rows = np.flatnonzero(graph.degree > 0)
+    row_starts = graph.offsets[rows]
+    mark = np.zeros(n, dtype=bool)
+    for start in range(0, len(sources), 64 * words):
+        batch = sources[start:start + 64 * words]
+        k = len(batch)
+        bits = np.arange(k)
+        visited = np.zeros((n, (k + 63) // 64), dtype=np.uint64)
+        np.bitwise_or.at(visited, (batch, bits >> 6), np.uint64(1) << (bits & 63).astype(np.uint64))
+        frontier = visited.copy()
+        active = np.unique(batch)
+        levels = [np.bincount(bits, minlength=k)]
+        while True:
+            mark[graph.gather(active)] = True
+            targets = np.flatnonzero(mark)
+            mark[targets] = False
+            # Pull each target's new bits from its neighbours' frontier
+            # words; once most vertices are targets, the precomputed
+            # whole-graph segments are cheaper than gathering them.
+            if 4 * len(targets) > n:
+                grown = np.zeros_like(visited)
+                grown[rows] = np.bitwise_or.reduceat(frontier[graph.neighbors], row_starts, axis=0)
+                grown = grown[targets]
+            else:
+                degree = graph.degree[targets]
+                grown = np.bitwise_or.reduceat(frontier[graph.gather(targets)],
+                                               np.cumsum(degree) - degree, axis=0)
+            grown &= ~visited[targets]
+            keep = grown.any(axis=1)
+            frontier[active] = 0
+            active = targets[keep]
+            if not active.size:
+                break
+            grown = grown[keep]
+            frontier[active] = grown
+            visited[active] |= grown
+            levels.append(_bit_counts(grown, k))
+        yield start, np.array(levels)
+
+
+def _source_stats(graph, sources):
+    # Eccentricity, distance sum and reach (including the source itself)
+    # per source id, all within the source's component.
+    ecc = np.empty(len(sources), dtype=np.int64)
+    total = np.empty_like(ecc)
+    reach = np.empty_like(ecc)
+    for start, counts in _multi_bfs(graph, sources):
+        stop = start + counts.shape[1]
+        ecc[start:stop] = len(counts) - 1 - np.argmax(counts[::-1] > 0, axis=0)
+        total[start:stop] = np.arange(len(counts)) @ counts
+        reach[start:stop] = counts.sum(axis=0)
+    return ecc, total, reach
+
+
+def _per_vertex(ssg, graph, values):
+    if isinstance(ssg, CompactSSG):
+        return values
+    return dict(zip(graph.V, values.tolist()))
+
+
+def _average_distance(total, reach):
+    pairs = int((reach - 1).sum())
+    return int(total.sum()) / pairs if pairs else 0.0
+
+
+def _closeness(total, reach, n):
+    # Wasserman-Faust closeness, as networkx computes it: scaled by the
+    # fraction of the graph each vertex reaches.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = (reach - 1) / total * (reach - 1) / max(n - 1, 1)
+    return np.where(total > 0, value, 0.0)
+
+
+def eccentricities(ssg):
+    """Eccentricity of every vertex within its component.
+
+    One bit-parallel BFS batch covers up to 64 * MULTI_BFS_WORDS sources.
+    CompactSSG returns an array indexed by vertex id, SSG a label dict.
+    """
+    graph = as_compact(ssg)
+    return _per_vertex(ssg, graph, _source_stats(graph, np.arange(graph.n))[0])
+
+
+def average_distance(ssg):
+    """Mean hop distance over ordered pairs of distinct connected vertices."""
+    graph = as_compact(ssg)
+    _, total, reach = _source_stats(graph, np.arange(graph.n))
+    return _average_distance(total, reach)
+
+
+def closeness(ssg):
+    """Closeness centrality of every vertex (array or dict, as eccentricities)."""
+    graph = as_compact(ssg)
+    _, total, reach = _source_stats(graph, np.arange(graph.n))
+    return _per_vertex(ssg, graph, _closeness(total, reach, graph.n))
+
+
+# Edges per union-find batch; bounds the temporaries to a few arrays of
+# this length on top of the O(V) parent array.
+UNION_CHUNK = 1 << 20
+
+
+def _edge_chunks(ssg, size):
+    if isinstance(ssg, CompactSSG):
+        yield from ssg.edge_chunks(size)
+        return
+    interner = _Interner(list(dict.fromkeys(ssg.V)))
+    edges = iter(ssg.E)
+    while True:
+        chunk = list(islice(edges, size))
+        if not chunk:
+            return
+        yield interner.ids(chunk)
+
+
+def _compress(parent):
+    # Pointer jumping until every vertex points straight at its root.
+    while True:
+        up = parent[parent]
+        if np.array_equal(up, parent):
+            return parent
+        parent = up
+
+
+def component_roots(ssg):
+    """Union-find over ssg.E without recursion: entry i is i's component root.
+
+    Edges are hooked in batches: each round links the larger root of every
+    crossing edge under the smaller one, then compresses all paths, until
+    no edge in the batch joins two trees.
+    """
+    n = len(ssg.V) if isinstance(ssg, CompactSSG) else len(dict.fromkeys(ssg.V))
+    dtype = np.int32 if n < 2**31 else np.int64
+    parent = np.arange(n, dtype=dtype)
+    for src, dst in _edge_chunks(ssg, UNION_CHUNK):
+        while src.size:
+            ru, rv = parent[src], parent[dst]
+            crossing = ru != rv
+            if not crossing.any():
+                break
+            src, dst, ru, rv = src[crossing], dst[crossing], ru[crossing], rv[crossing]
+            np.minimum.at(parent, np.maximum(ru, rv), np.minimum(ru, rv))
+            parent = _compress(parent)
+    return parent
+
+
+def count_components(ssg):
+    parent = component_roots(ssg)
+    return int(np.count_nonzero(parent == np.arange(len(parent))))
+
+
+def compute_topology(ssg):
+    """(beta_0, beta_1, euler_char) from one component count."""
+    beta_0 = count_components(ssg)
+    beta_1 = len(ssg.E) - len(ssg.V) + beta_0
+    return beta_0, beta_1, beta_0 - beta_1
+
+
+def compute_betti_numbers(ssg):
+    beta_0, beta_1, _ = compute_topology(ssg)
+    return beta_0, beta_1
+
+
+def compute_euler_characteristic(ssg):
+    return compute_topology(ssg)[2]
+
+
+def _sci_value(root_dist, degree, max_dist):
+    leaves = np.flatnonzero(degree == 1)
+    if not leaves.size:
+        return 0.0
+    if max_dist == 0:
+        return 0
+    distances = root_dist[leaves]
+    if (distances == UNREACHED).any():
+        return float('inf')
+    return float(distances.sum()) / len(leaves) / max_dist
+
+
+def _sci_estimate(root_dist, degree, bounds):
+    # SCI falls as the diameter grows, so the diameter bounds invert.
+    lower, upper = bounds
+    value = _sci_value(root_dist, degree, lower)
+    return Estimate(value, _sci_value(root_dist, degree, upper), value)
+
+
+def compute_sci(ssg, root, approx=None):
+    """Structural complexity index; an Estimate when approx is given.
+
+    In approximate mode the diameter is bracketed with at most
+    approx.bfs_budget extra sweeps per component instead of settled.
+    """
+    graph = as_compact(ssg)
+    if approx is None:
+        if not (graph.degree == 1).any():
+            return 0.0
+        return _sci_value(_bfs_ids(graph, graph.index[root]), graph.degree, diameter(graph))
+    bounds = diameter_bounds(graph, approx.bfs_budget)
+    return _sci_estimate(_bfs_ids(graph, graph.index[root]), graph.degree, bounds)
+
+
+def _gdi_value(degree, n_edges):
+    n = len(degree)
+    if n == 0:
+        return 0
+    mean_deg = 2 * n_edges / n
+    variance = float(((degree.astype(np.float64) - mean_deg) ** 2).sum()) / n
+    std_dev = math.sqrt(variance)
+    return std_dev / mean_deg if mean_deg > 0 else 0
+
+
+def compute_gdi(ssg):
+    graph = as_compact(ssg)
+    return _gdi_value(graph.degree, len(graph.E))
+
+
+def ball_profile(ssg, root):
+    """Cumulative ball sizes from one BFS: entry r is |B(root, r)|.
+
+    Runs up to the root's eccentricity within its component.
+    """
+    graph = as_compact(ssg)
+    dist = _bfs_ids(graph, graph.index[root])
+    return np.cumsum(np.bincount(dist[dist != UNREACHED]))
+
+
+def _profile_sfd(dist, scales):
+    if (dist == UNREACHED).any():
+        # An unreachable vertex puts the radius at infinity: every ball
+        # covers the whole component and the ratio is 1.
+        return 0.0
+    return _levels_sfd(np.bincount(dist), scales)
+
+
+def _levels_sfd(counts, scales):
+    profile = np.cumsum(counts)
+    max_r = len(profile) - 1
+    if max_r == 0:
+        return 0
+    # Dyadic radii R, R/2, ... down to half a hop (the ball {root}); a
+    # ball of real radius r holds the vertices within floor(r) hops.
+    count = int(math.log2(max_r)) + 2
+    if scales is not None:
+        count = max(2, min(count, scales))
+    radii = max_r / 2.0 ** np.arange(count)
+    sizes = profile[radii.astype(np.int64)]
+    if count == 2:
+        return math.log(sizes[0] / sizes[1]) / math.log(2)
+    x, y = np.log2(radii), np.log2(sizes)
+    x = x - x.mean()
+    return float((x * (y - y.mean())).sum() / (x * x).sum())
+
+
+def _roots_sfd(graph, root_ids, scales):
+    # _profile_sfd for many roots at once from the multi-source BFS.
+    estimates = []
+    for _, counts in _multi_bfs(graph, root_ids):
+        for column in counts.T:
+            if column.sum() < graph.n:
+                estimates.append(0.0)
+            else:
+                estimates.append(_levels_sfd(column[:np.flatnonzero(column)[-1] + 1], scales))
+    return estimates
+
+
+def _sampled_sfd(graph, root_value, root_ids, scales, approx):
+    # Exact estimates for a uniform sample of the extra roots; the interval
+    # is the sampling error of their mean (finite population corrected).
+    rng = np.random.default_rng(approx.seed)
+    k, s = len(root_ids), approx.sfd_samples
+    sample = _roots_sfd(graph, rng.choice(root_ids, size=s, replace=False), scales)
+    mean = sum(sample) / s
+    spread = 0.0
+    if s > 1:
+        sd = math.sqrt(sum((x - mean) ** 2 for x in sample) / (s - 1))
+        spread = approx.z * sd / math.sqrt(s) * math.sqrt(1 - s / k) * k / (k + 1)
+    value = (root_value + k * mean) / (k + 1)
+    return Estimate(value, value - spread, value + spread)
+
+
+def _approx_sfd(graph, root_dist, root_ids, scales, approx):
+    root_value = _profile_sfd(root_dist, scales)
+    if (root_dist == UNREACHED).any():
+        return Estimate.exact(root_value)
+    if len(root_ids) > approx.sfd_samples:
+        return _sampled_sfd(graph, root_value, root_ids, scales, approx)
+    estimates = [root_value] + _roots_sfd(graph, root_ids, scales)
+    return Estimate.exact(sum(estimates) / len(estimates))
+
+
+def compute_sfd(ssg, root, scales=None, roots=(), approx=None):
+    """Symbolic fractal dimension: slope of log |B(r)| against log r.
+
+    One BFS per root yields the full ball profile, so every dyadic scale
+    comes from the same traversal; scales caps how many are fitted (2 is
+    the original R vs R/2 estimate). Extra roots average the estimate and
+    share bit-parallel BFS batches. With
+    approx, more than approx.sfd_samples extra roots are averaged from a
+    uniform sample of them, returned as an Estimate; the root itself is
+    always one exact BFS.
+    """
+    graph = as_compact(ssg)
+    if approx is not None:
+        return _approx_sfd(graph, _bfs_ids(graph, graph.index[root]),
+                           [graph.index[r] for r in roots], scales, approx)
+    estimates = [_profile_sfd(_bfs_ids(graph, graph.index[root]), scales)]
+    if roots:
+        estimates += _roots_sfd(graph, [graph.index[r] for r in roots], scales)
+    return estimates[0] if len(estimates) == 1 else sum(estimates) / len(estimates)
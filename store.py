@@ -0,0 +1,225 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+
+from approx import Estimate
+
+_MISSING = object()
+
+
+# Serialization
+# Results are stored as zlib-compressed JSON: the file is shared between
+# processes, so nothing in it is ever unpickled. Tuples (edges, keys) and
+# Estimates are tagged so they decode to what was stored.
+def _encode(value):
+    if isinstance(value, Estimate):
+        return {"__estimate__": [value.value, value.low, value.high]}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, dict):
+        if "__estimate__" in value:
+            return Estimate(*value["__estimate__"])
+        if "__tuple__" in value:
+            return tuple(_decode(item) for item in value["__tuple__"])
+        return {key: _decode(item) for key, item in value.items()}
+    return value
+
+
+def dumps(value):
+    return zlib.compress(json.dumps(_encode(value), separators=(",", ":")).encode())
+
+
+def loads(blob):
+    return _decode(json.loads(zlib.decompress(blob)))
+
+
+def _key(key):
+    return json.dumps(_encode(key), separators=(",", ":"))
+
+
+# Result Store
+class ResultStore:
+    """Disk-backed key/value store shared by every process on the host.
+
+    SQLite in WAL mode: readers never block each other or the writer, and
+    writes go through BEGIN IMMEDIATE so one process writes at a time
+    (others wait up to busy_timeout). Keys are JSON-serializable values
+    such as the (number1, number2, ops, version) tuples RESULTS_CACHE
+    uses. Hit counts are batched in memory and flushed with the next
+    write, so reads stay read-only. The byte total of the stored values
+    is summed once at open and kept up to date by this process's writes;
+    when it passes max_bytes the total is recounted (other processes
+    write too) and the least requested, least recently used rows are
+    deleted down to three quarters of it.
+
+    One connection serves every thread (Streamlit runs each rerun on a
+    new one), used under _db_lock, which also spans whole transactions.
+    It is opened on first use, so a store that cannot be opened only
+    costs the lookups in get_or_compute instead of failing the import.
+    """
+
+    def __init__(self, path, max_bytes=256 << 20, busy_timeout=5.0, flush_every=64):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self.flush_every = flush_every
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._db_lock = threading.RLock()
+        self._warmed = False
+        self._bytes = 0
+        self._conn = None
+
+    @property
+    def _db(self):
+        with self._db_lock:
+            if self._conn is None:
+                db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                     check_same_thread=False)
+                try:
+                    db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("PRAGMA synchronous=NORMAL")
+                    db.execute("""CREATE TABLE IF NOT EXISTS results (
+                        key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,
+                        hits INTEGER NOT NULL DEFAULT 0, accessed REAL NOT NULL)""")
+                    db.execute("CREATE INDEX IF NOT EXISTS results_hits ON results (hits DESC)")
+                    total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+                except BaseException:
+                    db.close()
+                    raise
+                with self._lock:
+                    self._bytes = total
+                self._conn = db
+            return self._conn
+
+    def _query(self, sql, params=()):
+        with self._db_lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _write(self, statements):
+        # One write transaction: pending hit counts first, then statements.
+        # The rows each statement returned, in order.
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        db = self._db
+        with self._db_lock:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.executemany("UPDATE results SET hits = hits + ?, accessed = ? WHERE key = ?",
+                               [(count, time.time(), key) for key, count in pending.items()])
+                rows = [db.execute(sql, params).fetchall() for sql, params in statements]
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return rows
+
+    def get(self, key, default=None):
+        key = _key(key)
+        rows = self._query("SELECT value FROM results WHERE key = ?", (key,))
+        if not rows:
+            return default
+        with self._lock:
+            self._pending[key] += 1
+            flush = sum(self._pending.values()) >= self.flush_every
+        if flush:
+            self._write(())
+        return loads(rows[0][0])
+
+    def put(self, key, value):
+        blob, key = dumps(value), _key(key)
+        replaced, _ = self._write([
+            ("SELECT size FROM results WHERE key = ?", (key,)),
+            ("INSERT OR REPLACE INTO results (key, value, size, hits, accessed) "
+             "VALUES (?, ?, ?, COALESCE((SELECT hits FROM results WHERE key = ?), 0), ?)",
+             (key, blob, len(blob), key, time.time()))])
+        with self._lock:
+            self._bytes += len(blob) - (replaced[0][0] if replaced else 0)
+            full = self._bytes > self.max_bytes
+        if full:
+            self.compact()
+
+    def get_or_compute(self, key, compute):
+        """Stored value for key, else compute() stored for next time.
+
+        A store that cannot be read or written only costs the lookup: the
+        value is computed and returned regardless.
+        """
+        try:
+            value = self.get(key, _MISSING)
+        except sqlite3.Error:
+            return compute()
+        if value is _MISSING:
+            value = compute()
+            try:
+                self.put(key, value)
+            except sqlite3.Error:
+                pass
+        return value
+
+    def size(self):
+        """Bytes of stored values, summed over the table."""
+        return self._query("SELECT COALESCE(SUM(size), 0) FROM results")[0][0]
+
+    def compact(self, target=None):
+        """Delete the least requested rows until values fit in target bytes."""
+        target = self.max_bytes * 3 // 4 if target is None else target
+        total = self.size()
+        if total > target:
+            doomed, freed = [], 0
+            rows = self._query("SELECT key, size FROM results ORDER BY hits, accessed")
+            for key, size in rows:
+                if freed >= total - target:
+                    break
+                doomed.append(("DELETE FROM results WHERE key = ? RETURNING size", (key,)))
+                freed += size
+            # Rows another process deleted meanwhile return nothing.
+            total -= sum(rows[0][0] for rows in self._write(doomed) if rows)
+        with self._lock:
+            self._bytes = total
+        self._query("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._query("PRAGMA incremental_vacuum")
+
+    def warm(self, cache, limit=256):
+        """Load the limit most requested entries into cache, once per store."""
+        if self._warmed:
+            return
+        self._warmed = True
+        try:
+            rows = self._query("SELECT key, value FROM results ORDER BY hits DESC LIMIT ?", (limit,))
+        except sqlite3.Error:
+            return
+        for key, blob in rows:
+            cache.put(_decode(json.loads(key)), loads(blob))
+
+    def close(self):
+        with self._lock:
+            pending = bool(self._pending)
+        if pending:
+            self._write(())
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Store shared by every replica on the host; the path can be overridden
+# with ADSG_RESULT_STORE.
+RESULT_STORE = ResultStore(os.environ.get("ADSG_RESULT_STORE", "results.db"))
@@ -0,0 +1,137 @@
+"""The dict-and-deque metrics the array code replaced, as reference.
+
+Copied from archive/app_original.py.py, which cannot be imported (it is
+a Streamlit script), together with the graphs the comparisons run on.
+"""
+import math
+from collections import defaultdict, deque
+
+import networkx as nx
+import numpy as np
+
+
+class SSG:
+    def __init__(self, vertices, edges):
+        self.V = vertices
+        self.E = edges
+        self.adj = defaultdict(list)
+        for u, v in edges:
+            self.adj[u].append(v)
+            self.adj[v].append(u)
+
+
+def gcd(a, b):
+    return abs(a) if b == 0 else gcd(b, a % b)
+
+
+def lcm(a, b):
+    return abs(a * b) // gcd(a, b)
+
+
+def generate_ssc(x, y, ops):
+    current = (x, y)
+    gcd_result = None
+    for op in ops:
+        if op == "GCD":
+            gcd_result = gcd(current[0], current[1]) if isinstance(current, tuple) else current
+            current = gcd_result
+        elif op == "LCM":
+            current = lcm(current, 10) if isinstance(current, int) else current
+        else:
+            current = None
+        if current is None:
+            return None, None
+    return current, gcd_result
+
+
+def bfs(ssg, start):
+    dist = {v: float('inf') for v in ssg.V}
+    dist[start] = 0
+    queue = deque([start])
+    while queue:
+        u = queue.popleft()
+        for v in ssg.adj[u]:
+            if dist[v] == float('inf'):
+                dist[v] = dist[u] + 1
+                queue.append(v)
+    return dist
+
+
+def compute_betti_numbers(ssg):
+    visited, beta_0 = set(), 0
+    for v in ssg.V:
+        if v not in visited:
+            beta_0 += 1
+            visited.update(u for u, d in bfs(ssg, v).items() if d != float('inf'))
+    return beta_0, len(ssg.E) - len(ssg.V) + beta_0
+
+
+def diameter(ssg):
+    max_dist = 0
+    for v in ssg.V:
+        dist = bfs(ssg, v)
+        max_dist = max(max_dist, max((d for d in dist.values() if d != float('inf')), default=0))
+    return max_dist
+
+
+def compute_sci(ssg, root):
+    distances = bfs(ssg, root)
+    leaves = [v for v in ssg.V if len(ssg.adj[v]) == 1]
+    if not leaves:
+        return 0.0
+    avg_dist = sum(distances[leaf] for leaf in leaves) / len(leaves)
+    max_dist = diameter(ssg)
+    return avg_dist / max_dist if max_dist > 0 else 0
+
+
+def compute_gdi(ssg):
+    degrees = [len(ssg.adj[v]) for v in ssg.V]
+    mean_deg = 2 * len(ssg.E) / len(ssg.V) if len(ssg.V) > 0 else 0
+    variance = sum((d - mean_deg) ** 2 for d in degrees) / len(ssg.V) if len(ssg.V) > 0 else 0
+    return math.sqrt(variance) / mean_deg if mean_deg > 0 else 0
+
+
+def compute_sfd(ssg, root):
+    dist = bfs(ssg, root)
+    max_r = max(dist.values(), default=0)
+    if max_r == 0:
+        return 0
+    vr = sum(1 for d in dist.values() if d <= max_r)
+    vr2 = sum(1 for d in dist.values() if d <= max_r / 2)
+    return math.log(vr / vr2) / math.log(2) if vr2 > 0 else 0
+
+
+def to_networkx(vertices, edges):
+    g = nx.MultiGraph()
+    g.add_nodes_from(vertices)
+    g.add_edges_from(edges)
+    return g
+
+
+# Graphs
+def _random(n, m, seed):
+    rng = np.random.default_rng(seed)
+    return list(range(n)), [tuple(e) for e in rng.integers(0, n, size=(m, 2)).tolist()]
+
+
+def _tree(n, seed):
+    rng = np.random.default_rng(seed)
+    return list(range(n)), [(v, int(rng.integers(0, v))) for v in range(1, n)]
+
+
+# name -> (vertices, edges). Labels are not ids everywhere: the cycle and
+# the forest use scattered integers, the star strings.
+GRAPHS = {
+    "empty": ([], []),
+    "single": ([7], []),
+    "pair": ([1, 2], [(1, 2)]),
+    "disconnected": ([0, 1, 2, 3, 4, 5], [(0, 1), (1, 2), (3, 4)]),
+    "path": (list(range(300)), [(v, v + 1) for v in range(299)]),
+    "cycle": ([3 * v + 11 for v in range(101)], [(3 * v + 11, 3 * ((v + 1) % 101) + 11) for v in range(101)]),
+    "star": (["hub"] + [f"leaf{i}" for i in range(150)], [("hub", f"leaf{i}") for i in range(150)]),
+    "tree": _tree(400, 1),
+    "forest": ([v * 1000 for v in range(200)], [(v * 1000, (v // 2) * 1000) for v in range(1, 200) if v % 37]),
+    "sparse": _random(300, 330, 2),
+    "dense": _random(120, 900, 3),
+    "multi": ([0, 1, 2], [(0, 1), (0, 1), (1, 2), (2, 2)]),
+}
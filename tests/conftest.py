@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The app's stores are module-level singletons whose paths come from the
+# environment when first imported, so point them at a scratch directory
+# before any test imports them.
+_SCRATCH = tempfile.mkdtemp(prefix="adsg-tests-")
+for name, path in [("ADSG_RESULT_STORE", "results.db"), ("ADSG_USAGE_STORE", "usage.db"),
+                   ("ADSG_USAGE_JOURNAL", "usage-journal"), ("ADSG_ENTITLEMENTS", "entitlements.db"),
+                   ("ADSG_RATES_CACHE", "rates.json"), ("ADSG_RENDER_SPILL", "render-cache")]:
+    os.environ[name] = os.path.join(_SCRATCH, path)
+os.environ.setdefault("RAZORPAY_KEY_ID", "rzp_test_key")
+os.environ.setdefault("RAZORPAY_KEY_SECRET", "test_secret")
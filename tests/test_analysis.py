@@ -0,0 +1,83 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+import analysis
+from analysis import Analysis, analyze
+from approx import Approximation, Estimate
+from baseline import GRAPHS
+from ssg import CompactSSG, compute_sci, compute_sfd
+
+
+def cycles_graph(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    edges = np.column_stack([np.arange(1, n), rng.integers(0, np.arange(1, n))])
+    return CompactSSG(np.arange(n), np.vstack([edges, rng.integers(0, n, size=(n // 4, 2))]))
+
+
+def nx_diameter(graph):
+    g = nx.Graph()
+    g.add_nodes_from(range(graph.n))
+    g.add_edges_from(graph.E)
+    return max(nx.diameter(g.subgraph(c)) for c in nx.connected_components(g))
+
+
+def test_exact_diameter():
+    graph = cycles_graph()
+    assert Analysis(graph, 0)["diameter"] == nx_diameter(graph)
+
+
+def test_approx_diameter_never_runs_the_exact_routine(monkeypatch):
+    budgets = []
+    bounds = analysis.diameter_bounds
+
+    def budgeted(graph, budget=None):
+        budgets.append(budget)
+        return bounds(graph, budget)
+
+    monkeypatch.setattr(analysis, "diameter_bounds", budgeted)
+    graph = cycles_graph()
+    estimate = Analysis(graph, 0, approx=Approximation(bfs_budget=1))["diameter"]
+    assert budgets == [1]
+    assert isinstance(estimate, Estimate)
+    assert estimate.low <= nx_diameter(graph) <= estimate.high
+
+
+# Approximate vs exact
+@pytest.mark.parametrize("name", [name for name in GRAPHS if GRAPHS[name][0]])
+@pytest.mark.parametrize("budget", [0, 1, 100])
+def test_approximate_sci_brackets_exact(name, budget):
+    vertices, edges = GRAPHS[name]
+    graph = CompactSSG(vertices, edges)
+    exact = compute_sci(graph, vertices[0])
+    estimate = compute_sci(graph, vertices[0], approx=Approximation(bfs_budget=budget))
+    assert estimate.low <= exact <= estimate.high
+    if budget == 100:
+        assert not estimate.approximate and estimate.value == exact
+
+
+def test_approximate_sfd():
+    graph = cycles_graph(n=600)
+    roots = list(range(1, 200))
+    exact = compute_sfd(graph, 0, roots=roots)
+    few = compute_sfd(graph, 0, roots=roots[:10], approx=Approximation())
+    assert few == Estimate.exact(compute_sfd(graph, 0, roots=roots[:10]))
+    sampled = compute_sfd(graph, 0, roots=roots, approx=Approximation(sfd_samples=32))
+    assert sampled.approximate
+    assert sampled.low <= exact <= sampled.high
+
+
+@pytest.mark.parametrize("name", ["tree", "sparse", "cycle", "disconnected"])
+def test_analyze_approx_agrees_with_exact(name):
+    vertices, edges = GRAPHS[name]
+    exact = analyze(CompactSSG(vertices, edges), vertices[0]).metrics
+    approximate = analyze(CompactSSG(vertices, edges), vertices[0], approx=Approximation()).metrics
+    for metric in ("beta_0", "beta_1", "euler_char", "gdi"):
+        assert approximate[metric] == exact[metric]
+    assert approximate["sci"].low <= exact["sci"] <= approximate["sci"].high
+    assert float(approximate["sfd"]) == pytest.approx(exact["sfd"])
+
+
+def test_confidence_follows_z():
+    assert Approximation().confidence == pytest.approx(0.95, abs=1e-3)
+    assert Approximation(z=2.576).confidence == pytest.approx(0.99, abs=1e-3)
@@ -0,0 +1,137 @@
+import hashlib
+import hmac
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from analysis import METRICS_VERSION
+from approx import Estimate
+from cache import RESULTS_CACHE
+from conftest import ROOT
+from entitlements import ENTITLEMENTS
+from usage import TRIALS, USAGE_STORE, current_month
+
+APP = os.path.join(ROOT, "app.py")
+
+
+def run_app(**state):
+    at = AppTest.from_file(APP, default_timeout=60)
+    for key, value in state.items():
+        at.session_state[key] = value
+    at.run()
+    assert not at.exception, at.exception
+    return at
+
+
+def shown(at, prefix):
+    return [m.value for m in at.markdown if m.value.startswith(prefix)]
+
+
+def test_fiftieth_trial_shows_its_results():
+    user = "boundary@example.com"
+    TRIALS.flush()
+    USAGE_STORE.add({(current_month(), user): 49})
+    at = run_app(user_email=user)
+    assert "Trials this month: 49/50" in [m.value for m in at.markdown]
+    assert not at.error
+
+    at.button(key="generate_button").click().run()
+    assert not at.exception, at.exception
+    assert shown(at, "**SSC Result**")
+    assert "Trials this month: 50/50" in [m.value for m in at.markdown]
+    # The limit stops the next Generate, not the one just made.
+    assert not [b for b in at.button if b.key == "generate_button"]
+    assert any("free trial limit" in e.value for e in at.error)
+
+
+def test_limit_blocks_generate():
+    user = "over@example.com"
+    TRIALS.flush()
+    USAGE_STORE.add({(current_month(), user): 50})
+    at = run_app(user_email=user)
+    assert any("free trial limit" in e.value for e in at.error)
+    assert not [b for b in at.button if b.key == "generate_button"]
+    assert not shown(at, "**SSC Result**")
+
+
+def paid(user, order_id, payment_id):
+    ENTITLEMENTS.record_order(order_id, user)
+    signature = hmac.new(ENTITLEMENTS.secret.encode(), f"{order_id}|{payment_id}".encode(),
+                         hashlib.sha256).hexdigest()
+    return {"order_id": order_id, "payment_id": payment_id, "signature": signature}
+
+
+def test_typed_email_of_a_payer_is_not_premium():
+    user = "payer@example.com"
+    params = paid(user, "order_typed", "pay_typed")
+    assert ENTITLEMENTS.grant(params["order_id"], params["payment_id"], params["signature"]) == user
+    USAGE_STORE.add({(current_month(), user): 60})
+    at = run_app(user_email=user)
+    assert any("free trial limit" in e.value for e in at.error)
+
+
+def test_verified_payment_unlocks_premium_for_the_session():
+    user = "buyer@example.com"
+    USAGE_STORE.add({(current_month(), user): 60})
+    at = AppTest.from_file(APP, default_timeout=60)
+    for key, value in paid(user, "order_verified", "pay_verified").items():
+        at.query_params[key] = value
+    at.run()
+    assert not at.exception, at.exception
+    assert at.session_state["premium_user"] == user
+    assert any("Payment successful" in s.value for s in at.success)
+
+
+def test_replayed_payment_is_not_premium_in_another_session():
+    user = "replayed@example.com"
+    params = paid(user, "order_replayed", "pay_replayed")
+    assert ENTITLEMENTS.grant(params["order_id"], params["payment_id"], params["signature"]) == user
+    assert ENTITLEMENTS.grant(params["order_id"], params["payment_id"], params["signature"]) is None
+    # The same redirect URL opened in a new session.
+    at = AppTest.from_file(APP, default_timeout=60)
+    for key, value in params.items():
+        at.query_params[key] = value
+    at.run()
+    assert not at.exception, at.exception
+    assert "premium_user" not in at.session_state
+    assert not any("Payment successful" in s.value for s in at.success)
+    assert [b for b in at.button if b.key == "generate_button"]
+
+
+def test_each_generate_click_is_its_own_trial():
+    user = "retry@example.com"
+    # A cached failure: in the app, Generate then reruns only its fragment,
+    # so the trial id has to come from the click, not the script run.
+    RESULTS_CACHE.put((4, 6, ("GCD", "LCM"), METRICS_VERSION), None)
+    at = run_app(user_email=user)
+    at.number_input[0].set_value(4)
+    at.number_input[1].set_value(6).run()
+    clicks = []
+    for _ in range(2):
+        at.button(key="generate_button").click().run()
+        assert not at.exception, at.exception
+        assert any("Error generating SSC" in e.value for e in at.error)
+        clicks.append(at.session_state["generate_click"])
+        assert TRIALS.count(user) == len(clicks)
+    assert clicks[0] != clicks[1]
+
+
+def test_approximate_metrics_render_as_bounds_and_intervals(monkeypatch):
+    monkeypatch.setenv("ADSG_APPROX_VERTICES", "0")
+    at = run_app(user_email="approx@example.com")
+    at.number_input[0].set_value(3)
+    at.number_input[1].set_value(5).run()
+    at.button(key="generate_button").click().run()
+    assert not at.exception, at.exception
+    # Four vertices: the budgeted diameter bounds meet, so the value is exact.
+    assert isinstance(at.session_state["results"]["sci"], Estimate)
+    assert shown(at, "**Structural Complexity Index") == ["**Structural Complexity Index (SCI)**: 0.500"]
+    # The ranges a large graph would leave open.
+    at.session_state["results"] = dict(at.session_state["results"], sci=Estimate(0.5, 0.25, 0.5),
+                                       sfd=Estimate(2.0, 1.9, 2.1))
+    at.run()
+    assert not at.exception, at.exception
+    assert shown(at, "**Structural Complexity Index") == [
+        "**Structural Complexity Index (SCI)**: ≈ 0.500 (bounds 0.250–0.500)"]
+    assert shown(at, "**Symbolic Fractal Dimension") == [
+        "**Symbolic Fractal Dimension (SFD)**: ≈ 2.000 (95% CI 1.900–2.100)"]
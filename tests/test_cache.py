@@ -0,0 +1,87 @@
+from cache import LRUCache, sizeof
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = LRUCache(max_bytes=1 << 20, ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 10
+    assert cache.get("a") == 1
+    clock.now = 10.5
+    assert cache.get("a", "gone") == "gone"
+    assert len(cache) == 0 and cache.bytes == 0
+    assert cache.stats()["expirations"] == 1
+    # A put restarts the clock for its key.
+    cache.put("a", 2)
+    clock.now = 20
+    assert cache.get_or_compute("a", lambda: 3) == 2
+
+
+def test_byte_cap_holds_and_oversized_values_are_not_kept():
+    evicted = []
+    cache = LRUCache(max_bytes=4096, on_evict=lambda key, value: evicted.append(key))
+    for i in range(100):
+        cache.put(i, list(range(20)))
+        assert cache.bytes <= cache.max_bytes
+    assert cache.bytes == sum(sizeof(i) + sizeof(cache.get(i)) for i in range(100) if i in cache._entries)
+    assert 0 < len(cache) < 100
+    big = list(range(10_000))
+    cache.put("big", big)
+    assert cache.get("big") is None
+    assert evicted[-1] == "big"
+    # Replacing a key swaps its size instead of adding to it.
+    before = cache.bytes
+    cache.put(99, list(range(20)))
+    assert cache.bytes == before
+
+
+def test_least_recently_used_is_evicted_first():
+    size = sizeof(0) + sizeof("x" * 100)
+    evicted = []
+    cache = LRUCache(max_bytes=3 * size, on_evict=lambda key, value: evicted.append((key, value)))
+    for key in range(3):
+        cache.put(key, "x" * 100)
+    cache.get(0)
+    cache.put(3, "x" * 100)
+    assert evicted == [(1, "x" * 100)]
+    cache.get_or_compute(2, lambda: None)
+    cache.put(4, "x" * 100)
+    cache.put(5, "x" * 100)
+    assert [key for key, _ in evicted] == [1, 0, 3]
+    assert list(cache._entries) == [2, 4, 5]
+    assert cache.stats()["evictions"] == 3
+
+
+def test_expired_entries_are_not_passed_to_on_evict():
+    clock = Clock()
+    evicted = []
+    cache = LRUCache(max_bytes=1 << 20, ttl=1, clock=clock, on_evict=lambda *item: evicted.append(item))
+    cache.put("a", 1)
+    clock.now = 2
+    assert cache.get("a") is None
+    cache.clear()
+    assert evicted == []
+
+
+def test_hit_and_miss_counters():
+    cache = LRUCache(max_bytes=1 << 20)
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_compute("a", lambda: calls.append(1) or "value") == "value"
+    assert cache.get("b") is None
+    assert len(calls) == 1
+    assert cache.stats() == {"entries": 1, "bytes": cache.bytes, "hits": 2, "misses": 2,
+                             "evictions": 0, "expirations": 0}
+    assert cache.get_or_compute("none", lambda: None) is None
+    # A cached None is a hit, not a recompute.
+    assert cache.get_or_compute("none", lambda: calls.append(1)) is None
+    assert len(calls) == 1 and cache.hits == 3
+
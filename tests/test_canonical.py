@@ -0,0 +1,103 @@
+import random
+import threading
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from analysis import METRICS, analyze
+from baseline import GRAPHS
+from canonical import ShapeCache, certificate, wl_hash
+from ssg import CompactSSG
+
+
+def relabelled(vertices, edges, seed):
+    # The same graph under shuffled labels and edge order.
+    rng = random.Random(seed)
+    names = rng.sample(range(10_000), len(vertices))
+    rename = dict(zip(vertices, names))
+    edges = [(rename[u], rename[v]) if rng.random() < 0.5 else (rename[v], rename[u]) for u, v in edges]
+    rng.shuffle(edges)
+    rng.shuffle(names)
+    return names, edges, rename
+
+
+def small_graph(rng, n, m):
+    return list(range(n)), [(rng.randrange(n), rng.randrange(n)) for _ in range(m)]
+
+
+@pytest.mark.parametrize("name", ["empty", "single", "pair", "disconnected", "cycle", "star", "tree",
+                                  "forest", "sparse", "multi"])
+def test_certificate_ignores_labels(name):
+    vertices, edges = GRAPHS[name]
+    graph = CompactSSG(vertices, edges)
+    for seed in range(3):
+        names, shuffled, rename = relabelled(vertices, edges, seed)
+        other = CompactSSG(names, shuffled)
+        assert certificate(other) == certificate(graph)
+        assert wl_hash(other) == wl_hash(graph)
+        if vertices:
+            root = vertices[-1]
+            assert certificate(other, other.index[rename[root]]) == certificate(graph, graph.index[root])
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_certificates_agree_with_networkx_isomorphism(seed):
+    rng = random.Random(seed)
+    n, m = rng.randint(1, 9), rng.randint(0, 12)
+    a, b = small_graph(rng, n, m), small_graph(rng, n, m)
+    ca, cb = certificate(CompactSSG(*a)), certificate(CompactSSG(*b))
+    if ca is not None and cb is not None:
+        isomorphic = nx.vf2pp_is_isomorphic(nx.MultiGraph(a[1]), nx.MultiGraph(b[1])) if m else True
+        assert (ca == cb) == isomorphic
+
+
+def test_rooted_certificate_tells_root_orbits_apart():
+    graph = CompactSSG(range(5), [(0, 1), (1, 2), (2, 3), (3, 4)])
+    ends = {certificate(graph, 0), certificate(graph, 4)}
+    assert len(ends) == 1
+    assert len({certificate(graph, v) for v in range(5)}) == 3
+
+
+@pytest.mark.parametrize("name", ["single", "pair", "disconnected", "cycle", "star", "forest", "multi"])
+def test_shape_cache_matches_analyze(name):
+    vertices, edges = GRAPHS[name]
+    cache = ShapeCache()
+    expected = analyze(CompactSSG(vertices, edges), vertices[0]).metrics
+    for seed in range(2):
+        names, shuffled, rename = relabelled(vertices, edges, seed)
+        metrics = cache.analyze(CompactSSG(names, shuffled), rename[vertices[0]]).metrics
+        assert set(metrics) == set(METRICS)
+        for metric in METRICS:
+            assert metrics[metric] == pytest.approx(expected[metric]), metric
+    assert cache.hits == 2
+
+
+def relabelled_paths(count, n=12):
+    # Isomorphic graphs under different labels, so every call hits one class.
+    rng = np.random.default_rng(0)
+    for _ in range(count):
+        labels = rng.permutation(1000)[:n]
+        yield CompactSSG(labels, np.column_stack([labels[:-1], labels[1:]])), int(labels[0])
+
+
+def test_shape_cache_is_thread_safe():
+    cache = ShapeCache(maxsize=2)
+    graphs = list(relabelled_paths(200))
+    errors = []
+
+    def work(items):
+        try:
+            for graph, root in items:
+                cache.analyze(graph, root, metrics=("beta_0", "sci"))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=work, args=(graphs[i::8],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    # Two lookups per call: the unrooted and the rooted class.
+    assert cache.hits + cache.misses == 2 * len(graphs)
@@ -0,0 +1,30 @@
+import json
+
+import numpy as np
+
+from graph_view import pack
+
+
+def test_pack_round_trips_through_typed_arrays():
+    vertices = [10, "b", 30, 40]
+    edges = [(10, "b"), ("b", 30), (30, 10), (40, 10)]
+    labels = {(10, "b"): "GCD", ("b", 30): "LCM", (30, 10): "GCD"}
+    positions = np.random.default_rng(0).random((4, 3))
+    packed = pack(vertices, edges, labels, positions)
+
+    xy = np.frombuffer(packed["positions"], dtype="<f4").reshape(-1, 2)
+    assert np.array_equal(xy, positions[:, :2].astype(np.float32))
+    ids = np.frombuffer(packed["edges"], dtype="<u4").reshape(-1, 2)
+    assert ids.tolist() == [[0, 1], [1, 2], [2, 0], [3, 0]]
+    codes = np.frombuffer(packed["edge_codes"], dtype="u1")
+    assert [packed["edge_names"][c] for c in codes] == ["GCD", "LCM", "GCD", ""]
+    assert json.loads(packed["labels"]) == ["10", "b", "30", "40"]
+
+
+def test_pack_drops_vertex_labels_above_the_limit():
+    vertices = list(range(5))
+    edges = [(i, i + 1) for i in range(4)]
+    packed = pack(vertices, edges, {}, np.zeros((5, 3)), label_limit=4)
+    assert packed["labels"] is None
+    assert len(packed["positions"]) == 5 * 2 * 4 and len(packed["edges"]) == 4 * 2 * 4
+    assert packed["edge_names"] == [""] and packed["edge_codes"] == bytes(4)
@@ -0,0 +1,68 @@
+import math
+import random
+
+import pytest
+
+import baseline
+from analysis import METRICS, analyze
+from baseline import GRAPHS
+from incremental import IncrementalSSG
+from ssg import CompactSSG, compute_gdi, compute_topology
+
+
+def assert_matches_rebuilt(inc):
+    graph = CompactSSG(inc.V, inc.E)
+    assert (inc.beta_0, inc.beta_1, inc.euler_char) == compute_topology(graph)
+    assert inc.gdi == pytest.approx(compute_gdi(graph))
+    if inc.root is not None:
+        assert inc.dist == baseline.bfs(baseline.SSG(inc.V, inc.E), inc.root)
+
+
+@pytest.mark.parametrize("name", [name for name in GRAPHS if GRAPHS[name][0]])
+def test_built_edge_by_edge_matches_rebuilt(name):
+    vertices, edges = GRAPHS[name]
+    inc = IncrementalSSG(vertices, edges, root=vertices[0])
+    assert_matches_rebuilt(inc)
+    expected = analyze(CompactSSG(vertices, edges), vertices[0]).metrics
+    for metric, value in inc.analyze().metrics.items():
+        assert value == pytest.approx(expected[metric]), metric
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_edits_match_rebuilt(seed):
+    rng = random.Random(seed)
+    n = rng.randint(5, 40)
+    inc = IncrementalSSG(range(n), root=0)
+    for step in range(300):
+        edges = inc.E
+        if edges and rng.random() < 0.45:
+            inc.remove_edge(*rng.choice(edges))
+        elif rng.random() < 0.05:
+            inc.add_vertex(n)
+            n += 1
+        else:
+            inc.add_edge(rng.randrange(n), rng.randrange(n))
+        if step % 10 == 0:
+            assert_matches_rebuilt(inc)
+    assert_matches_rebuilt(inc)
+
+
+def test_bridge_removal_splits_and_cuts_distances():
+    inc = IncrementalSSG(range(6), [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 3)], root=0)
+    assert inc.beta_0 == 1 and inc.beta_1 == 1
+    inc.remove_edge(2, 3)
+    assert inc.beta_0 == 2 and inc.beta_1 == 1
+    assert [inc.dist[v] for v in range(6)] == [0, 1, 2, math.inf, math.inf, math.inf]
+    inc.add_edge(0, 4)
+    assert [inc.dist[v] for v in range(6)] == [0, 1, 2, 2, 1, 2]
+    assert_matches_rebuilt(inc)
+
+
+def test_empty_and_missing_edges():
+    inc = IncrementalSSG()
+    assert (inc.beta_0, inc.beta_1, inc.gdi) == (0, 0, 0)
+    with pytest.raises(KeyError):
+        inc.remove_edge(1, 2)
+    inc.add_vertex(1)
+    assert (inc.beta_0, inc.beta_1, inc.gdi) == (1, 0, 0)
+    assert set(METRICS) <= set(IncrementalSSG([1, 2], [(1, 2)], root=1).analyze().metrics)
@@ -0,0 +1,82 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from baseline import GRAPHS, to_networkx
+from layout import component_sources, force_layout, hierarchy, layout, radial_layout
+from ssg import UNREACHED, CompactSSG
+
+NAMES = [name for name in GRAPHS if GRAPHS[name][0]]
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_hierarchy_levels_are_multi_source_distances(name):
+    vertices, edges = GRAPHS[name]
+    graph = CompactSSG(vertices, edges)
+    roots = component_sources(graph)
+    level, parent = hierarchy(graph, roots)
+    g = to_networkx(range(graph.n), zip(*(ids.tolist() for ids in graph.ids(edges))))
+    expected = nx.multi_source_dijkstra_path_length(g, set(roots.tolist()))
+    assert level.tolist() == [expected[v] for v in range(graph.n)]
+    assert (level != UNREACHED).all()
+    for v in range(graph.n):
+        if level[v]:
+            assert level[parent[v]] == level[v] - 1 and g.has_edge(v, parent[v])
+        else:
+            assert parent[v] == -1
+
+
+@pytest.mark.parametrize("name", ["tree", "forest", "star", "path"])
+def test_radial_layout_puts_levels_on_rings(name):
+    graph = CompactSSG(*GRAPHS[name])
+    roots = component_sources(graph)
+    xy, level = radial_layout(graph, roots)
+    radius = level + (1 if len(roots) > 1 else 0)
+    assert np.allclose(np.hypot(*xy.T), radius)
+
+
+def _edge_ratios(graph, dim):
+    # Particle-mesh positions against networkx's exact Fruchterman-Reingold
+    # from the same start. They are not equal, so compare the mean edge
+    # length relative to the mean distance of random pairs.
+    init = np.random.default_rng(0).random((graph.n, dim))
+    pm = force_layout(graph, dim, init=init)
+    g = nx.Graph(to_networkx(range(graph.n), zip(*(ids.tolist() for ids in graph.ids(graph.E)))))
+    exact = nx.drawing.layout._fruchterman_reingold(nx.to_numpy_array(g), k=graph.n ** (-1 / dim), pos=init,
+                                                    iterations=50, dim=dim, seed=0)
+    src, dst = (ids for ids in graph.ids(graph.E))
+
+    def edge_ratio(pos):
+        pos = (pos - pos.min(axis=0)) / np.ptp(pos, axis=0).max()
+        edge = np.linalg.norm(pos[src] - pos[dst], axis=1).mean()
+        pairs = np.random.default_rng(1).integers(0, graph.n, size=(2000, 2))
+        return edge / np.linalg.norm(pos[pairs[:, 0]] - pos[pairs[:, 1]], axis=1).mean()
+
+    return edge_ratio(pm), edge_ratio(exact)
+
+
+@pytest.mark.parametrize("name", ["sparse", "dense", "cycle", "tree"])
+@pytest.mark.parametrize("dim", [2, 3])
+def test_force_layout_matches_exact_repulsion(name, dim):
+    graph = CompactSSG(*GRAPHS[name])
+    ours, exact = _edge_ratios(graph, dim)
+    assert ours == pytest.approx(exact, abs=0.03)
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_layout_is_deterministic_and_separated(name):
+    vertices, edges = GRAPHS[name]
+    pos = layout(vertices, edges, root=vertices[0])
+    assert pos.shape == (len(dict.fromkeys(vertices)), 3)
+    assert np.isfinite(pos).all()
+    assert np.array_equal(pos, layout(vertices, edges, root=vertices[0]))
+    assert np.hypot(pos[:, 0], pos[:, 1]).max() <= 1 + 1e-9
+    assert ((pos[:, 2] >= -1) & (pos[:, 2] <= 0)).all()
+    if len(pos) > 1:
+        gaps = np.linalg.norm(pos[:, None, :2] - pos[None, :, :2], axis=2)
+        assert gaps[np.triu_indices(len(pos), 1)].min() > 1e-6
+
+
+def test_empty_layout():
+    assert layout([], []).shape == (0, 3)
+    assert force_layout(CompactSSG([5], []), 2).shape == (1, 2)
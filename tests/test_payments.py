@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from payments import OrderService
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_building_the_client_does_not_block_submit():
+    orders = OrderService("rzp_test_key", "test_secret", base_url="http://127.0.0.1:9", attempts=1)
+    # A worker building the client holds its lock for the razorpay import.
+    with orders._client_lock:
+        done = threading.Event()
+
+        def submit():
+            orders.order(orders.submit("a@example.com", 500))
+            done.set()
+
+        threading.Thread(target=submit, daemon=True).start()
+        assert done.wait(5)
+
+
+def test_finished_orders_leave_the_futures_map():
+    orders = OrderService("rzp_test_key", "test_secret", attempts=1, done_ttl=0.2)
+    created = []
+    orders._create = lambda key, *args: created.append(key) or {"id": f"order_{len(created)}"}
+    key = orders.submit("a@example.com", 500)
+    assert wait_for(lambda: orders.order(key) is not None)
+    assert orders._futures == {}
+    assert orders.order(key) == {"id": "order_1"}
+    # A finished order is joined, not created again, until it expires.
+    assert orders.submit("a@example.com", 500) == key and created == [key]
+    time.sleep(0.3)
+    with pytest.raises(KeyError):
+        orders.order(key)
+    orders.submit("a@example.com", 500)
+    assert wait_for(lambda: orders.order(key) == {"id": "order_2"})
+    assert orders._futures == {}
+
+
+def test_failed_order_is_kept_until_resubmitted():
+    orders = OrderService("rzp_test_key", "test_secret", attempts=1)
+    failures = [RuntimeError("upstream down")]
+
+    def create(key, *args):
+        if failures:
+            raise failures.pop()
+        return {"id": "order_ok"}
+
+    orders._create = create
+    key = orders.submit("b@example.com", 500)
+    assert wait_for(lambda: not orders._futures)
+    with pytest.raises(RuntimeError):
+        orders.order(key)
+    orders.submit("b@example.com", 500)
+    assert wait_for(lambda: not orders._futures)
+    assert orders.order(key) == {"id": "order_ok"}
@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from rates import FALLBACK_RATES, RateService
+
+
+class StubRates(BaseHTTPRequestHandler):
+    inr = 83.5
+    status = 200
+    requests_served = 0
+
+    def do_GET(self):
+        type(self).requests_served += 1
+        body = json.dumps({"base": "USD", "rates": {"USD": 1, "INR": self.inr, "EUR": 0.92}}).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    # A stub of the exchange-rate API; 404 is not retried, so a failing
+    # upstream fails at once.
+    handler = type("Handler", (StubRates,), {})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    handler.url = f"http://127.0.0.1:{server.server_port}/v4/latest/USD"
+    yield handler
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+def test_falls_back_to_inr_84_until_a_fetch_succeeds(tmp_path, upstream):
+    upstream.status = 404
+    service = RateService(url=upstream.url, cache_path=str(tmp_path / "rates.json"))
+    assert service.rates() == FALLBACK_RATES
+    assert service.convert(5, "INR") == 420
+    assert wait_for(lambda: upstream.requests_served)
+    assert service.convert(5, "INR") == 420
+    assert not (tmp_path / "rates.json").exists()
+
+
+def test_saved_rates_are_served_by_the_next_process(tmp_path, upstream):
+    path = str(tmp_path / "rates.json")
+    assert RateService(url=upstream.url, cache_path=path).refresh()
+    served = upstream.requests_served
+    service = RateService(url=upstream.url, cache_path=path)
+    assert service.rates()["INR"] == 83.5
+    assert service.convert(5, "INR") == 418
+    # Fresh from disk: nothing is fetched.
+    assert service._thread is None
+    assert upstream.requests_served == served
+
+
+def test_stale_rates_are_served_while_refreshing(tmp_path, upstream):
+    path = tmp_path / "rates.json"
+    path.write_text(json.dumps({"fetched": time.time() - 7200, "rates": {"USD": 1.0, "INR": 80.0}}))
+    service = RateService(url=upstream.url, cache_path=str(path), ttl=3600)
+    assert service.rates()["INR"] == 80.0
+    assert wait_for(lambda: service.rates()["INR"] == 83.5)
+    saved = json.loads(path.read_text())
+    assert saved["rates"]["INR"] == 83.5
+    assert time.time() - saved["fetched"] < 60
+
+
+def test_failed_fetch_keeps_the_last_good_rates(tmp_path, upstream):
+    path = tmp_path / "rates.json"
+    service = RateService(url=upstream.url, cache_path=str(path))
+    assert service.refresh()
+    saved = path.read_text()
+    upstream.inr, upstream.status = 90.0, 404
+    assert not service.refresh()
+    assert service.rates()["INR"] == 83.5
+    assert path.read_text() == saved
+    # A malformed body is a failed fetch too.
+    upstream.status = 200
+    upstream.do_GET = lambda self: (self.send_response(200), self.end_headers(), self.wfile.write(b"{"))
+    assert not service.refresh()
+    assert service.convert(5, "INR") == 418
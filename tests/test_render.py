@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pytest
+
+from render import (AGGREGATE_CELLS, LABEL_LIMIT_3D, POINT_LIMIT_3D, RenderCache, edge_segments,
+                    figure_3d, level_of_detail)
+from ssg import CompactSSG
+
+
+def image(i, size=1000):
+    return bytes([i]) * size
+
+
+def keys(count):
+    return [f"{i:02x}{'0' * 62}" for i in range(count)]
+
+
+def test_evicted_images_spill_and_reload(tmp_path):
+    cache = RenderCache(max_bytes=3000, spill_dir=str(tmp_path))
+    names = keys(5)
+    for i, key in enumerate(names):
+        assert cache.get_or_render(key, lambda i=i: image(i)) == image(i)
+    assert cache.renders == 5
+    spilled = sorted(os.path.basename(path) for path, _, _ in cache._spilled())
+    assert spilled and spilled == [key + ".png" for key in names[:len(spilled)]]
+    # A spilled image comes back from disk, not from render().
+    assert cache.get_or_render(names[0], lambda: b"rendered again") == image(0)
+    assert (cache.renders, cache.disk_hits) == (5, 1)
+    assert RenderCache(spill_dir=str(tmp_path)).get_or_render(names[0], lambda: b"") == image(0)
+
+
+def test_respilling_a_promoted_image_is_not_counted_twice(tmp_path):
+    cache = RenderCache(max_bytes=3000, spill_dir=str(tmp_path))
+    names = keys(2)
+    for _ in range(10):
+        # Each round evicts one key to disk and promotes the other back.
+        for i, key in enumerate(names):
+            cache.get_or_render(key, lambda i=i: image(i))
+            cache.memory.put("filler", image(9, 2000))
+    # Both images and the filler, each once.
+    assert cache._spill_bytes == sum(size for _, size, _ in cache._spilled()) == 4000
+
+
+def test_trim_removes_least_recently_used_spills(tmp_path):
+    cache = RenderCache(max_bytes=1500, spill_dir=str(tmp_path), max_spill_bytes=4000)
+    names = keys(8)
+    for i, key in enumerate(names):
+        cache.get_or_render(key, lambda i=i: image(i))
+        # Distinct mtimes, oldest first.
+        path = cache._path(key)
+        if os.path.exists(path):
+            os.utime(path, (i, i))
+    files = sorted(cache._spilled(), key=lambda item: item[2])
+    total = sum(size for _, size, _ in files)
+    assert cache._spill_bytes == total <= cache.max_spill_bytes
+    cache.trim(2000)
+    left = sorted(os.path.basename(path) for path, _, _ in cache._spilled())
+    assert left == [os.path.basename(path) for path, _, _ in files[-2:]]
+    assert cache._spill_bytes == 2000
+
+
+# 3D figure
+def path_graph(n):
+    return list(range(n)), [(i, i + 1) for i in range(n - 1)]
+
+
+def test_level_of_detail_keeps_every_vertex_up_to_the_point_limit():
+    positions = np.random.default_rng(0).random((50, 3))
+    points, counts, member = level_of_detail(positions, point_limit=50)
+    assert points is positions
+    assert counts.tolist() == [1] * 50 and member.tolist() == list(range(50))
+
+
+def test_level_of_detail_merges_far_vertices_into_cells():
+    positions = np.random.default_rng(1).random((400, 3))
+    points, counts, member = level_of_detail(positions, root=7, point_limit=40, cells=3)
+    # The 20 vertices nearest the root are drawn as themselves.
+    dist = ((positions - positions[7]) ** 2).sum(axis=1)
+    near = np.argsort(dist, kind="stable")[:20]
+    assert member[near].tolist() == list(range(20))
+    assert np.array_equal(points[:20], positions[near])
+    # Every other vertex is in one of at most 3^3 cells, drawn at its centroid.
+    assert counts.sum() == 400 and len(points) <= 20 + 27
+    for marker in range(20, len(points)):
+        assert counts[marker] == (member == marker).sum()
+        assert np.allclose(points[marker], positions[member == marker].mean(axis=0))
+
+
+def test_edge_segments_are_nan_separated_and_drawn_once():
+    vertices, edges = [0, 1, 2, 3], [(0, 1), (1, 2), (2, 0), (2, 3), (1, 0)]
+    graph = CompactSSG(vertices, edges)
+    points = np.arange(12, dtype=np.float32).reshape(4, 3)
+    lines = edge_segments(graph, np.arange(4), points)
+    assert lines.dtype == np.float32 and lines.shape == (12, 3)
+    assert np.isnan(lines[2::3]).all() and not np.isnan(lines[0::3]).any()
+    drawn = {tuple(sorted((int(a[0]) // 3, int(b[0]) // 3))) for a, b in zip(lines[0::3], lines[1::3])}
+    assert drawn == {(0, 1), (1, 2), (0, 2), (2, 3)}
+    # Merging 0 and 1 into one marker drops their edge and dedupes the rest.
+    lines = edge_segments(graph, np.array([0, 0, 1, 2]), points[:3])
+    assert lines.shape == (6, 3)
+
+
+@pytest.mark.parametrize("n, labelled", [(LABEL_LIMIT_3D, True), (LABEL_LIMIT_3D + 1, False)])
+def test_figure_labels_small_graphs_only(n, labelled):
+    vertices, edges = path_graph(n)
+    positions = np.random.default_rng(2).random((n, 3))
+    fig = figure_3d(vertices, edges, positions, root=0)
+    assert len(fig.data) == 2
+    lines, markers = fig.data
+    assert lines.mode == "lines" and len(lines.x) == 3 * (n - 1)
+    assert np.isnan(np.asarray(lines.x, dtype=float)[2::3]).all()
+    assert markers.mode == ("markers+text" if labelled else "markers")
+    assert (markers.text is not None) == labelled
+    assert len(markers.x) == n
+
+
+def test_figure_aggregates_above_the_point_limit():
+    n = POINT_LIMIT_3D + 1
+    vertices, edges = path_graph(n)
+    positions = np.random.default_rng(3).random((n, 3))
+    fig = figure_3d(vertices, edges, positions, root=0)
+    assert len(fig.data) == 2
+    lines, markers = fig.data
+    assert len(markers.x) <= POINT_LIMIT_3D // 2 + AGGREGATE_CELLS ** 3
+    assert markers.mode == "markers" and markers.text is None
+    # Merged markers are sized by how many vertices they stand for.
+    assert np.asarray(markers.marker.size).max() > 4
+    assert len(lines.x) % 3 == 0 and len(lines.x) < 3 * (n - 1)
@@ -0,0 +1,64 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+import baseline
+import ssc
+from ssc import compile_ops, gcd, generate_ssc, generate_ssc_batch, lcm
+
+OPS = [["GCD", "LCM"], ["GCD"], ["LCM", "GCD", "LCM:7", "LCM:3"], ["GCD", "GCD", "LCM"]]
+
+
+@pytest.fixture
+def small_hgcd(monkeypatch):
+    # Half-GCD from a few hundred bits, so the recursion runs on test-sized numbers.
+    monkeypatch.setattr(ssc, "HGCD_THRESHOLD_BITS", 256)
+    monkeypatch.setattr(ssc, "_HGCD_BASE_BITS", 64)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_half_gcd_matches_math_gcd(small_hgcd, seed):
+    rng = random.Random(seed)
+    common = rng.getrandbits(rng.choice([1, 64, 2000]))
+    a = rng.getrandbits(rng.randint(300, 6000)) * common
+    b = rng.getrandbits(rng.randint(300, 6000)) * common
+    assert gcd(a, b) == math.gcd(a, b)
+    assert gcd(-a, b) == gcd(a, -b) == math.gcd(a, b)
+    assert lcm(a, b) == math.lcm(a, b)
+
+
+@pytest.mark.parametrize("a, b", [(0, 0), (0, 5), (5, 0), (-12, 18), (1, 1), (2**4000, 2**3999),
+                                  (3**2000, 3**2000), (2**4000 + 1, 2**4000), (2**5000, 3)])
+def test_half_gcd_edge_cases(small_hgcd, a, b):
+    assert gcd(a, b) == math.gcd(a, b)
+    assert lcm(a, b) == math.lcm(a, b)
+
+
+def test_fibonacci_operands(small_hgcd):
+    # Consecutive Fibonacci numbers: the longest Euclid run for their size.
+    a, b = 1, 1
+    for _ in range(3000):
+        a, b = b, a + b
+    assert gcd(b, a) == 1
+    assert gcd(b * 12345, a * 12345) == 12345
+
+
+@pytest.mark.parametrize("ops", OPS[:2])
+@pytest.mark.parametrize("x, y", [(7, 6_000_000), (0, 9), (12, 12), (-4, 6), (2**70, 6**30)])
+def test_generate_ssc_matches_original(ops, x, y):
+    assert generate_ssc(x, y, ops) == baseline.generate_ssc(x, y, ops)
+
+
+@pytest.mark.parametrize("ops", OPS)
+def test_batch_matches_scalar(ops):
+    rng = np.random.default_rng(0)
+    xs, ys = rng.integers(-10**6, 10**6, size=(2, 500))
+    ssc_result, gcd_result = generate_ssc_batch(xs, ys, ops)
+    chain = compile_ops(ops)
+    assert [chain(int(x), int(y)) for x, y in zip(xs, ys)] == list(zip(ssc_result.tolist(), gcd_result.tolist()))
+    # Past int64 the batch falls back to Python ints.
+    big = np.array([2**70, 3**50, 0], dtype=object)
+    ssc_result, gcd_result = generate_ssc_batch(big, big[::-1], ops)
+    assert [chain(x, y) for x, y in zip(big, big[::-1])] == list(zip(ssc_result, gcd_result))
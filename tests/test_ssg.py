@@ -0,0 +1,141 @@
+import math
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import baseline
+import ssg
+from baseline import GRAPHS, to_networkx
+from ssg import (SSG, UNREACHED, CompactSSG, average_distance, bfs, closeness, component_roots,
+                 compute_betti_numbers, compute_euler_characteristic, compute_gdi, compute_sci,
+                 compute_sfd, count_components, diameter, diameter_bounds, eccentricities)
+
+NAMES = list(GRAPHS)
+NONEMPTY = [name for name in NAMES if GRAPHS[name][0]]
+
+
+def compact(name):
+    return CompactSSG(*GRAPHS[name])
+
+
+def nx_components(name):
+    return list(nx.connected_components(to_networkx(*GRAPHS[name])))
+
+
+# CSR BFS
+@pytest.mark.parametrize("name", NONEMPTY)
+def test_bfs_matches_dict_bfs(name):
+    vertices, edges = GRAPHS[name]
+    graph, reference = CompactSSG(vertices, edges), baseline.SSG(vertices, edges)
+    for start in vertices[::max(1, len(vertices) // 7)]:
+        expected = baseline.bfs(reference, start)
+        dist = bfs(graph, start)
+        assert dist.tolist() == [UNREACHED if d == math.inf else d for d in expected.values()]
+        assert bfs(SSG(vertices, edges), start) == expected
+
+
+@pytest.mark.parametrize("frontier", [1, 4, 64, 10_000])
+def test_bfs_is_the_same_either_side_of_the_scalar_threshold(monkeypatch, frontier):
+    # Deep and wide graphs from one source, whichever way the levels go.
+    monkeypatch.setattr(ssg, "SCALAR_FRONTIER", frontier)
+    for name in ("path", "star", "tree", "dense", "disconnected"):
+        vertices, edges = GRAPHS[name]
+        expected = baseline.bfs(baseline.SSG(vertices, edges), vertices[0])
+        assert bfs(SSG(vertices, edges), vertices[0]) == expected
+
+
+def test_sweep_returns_levels_in_order():
+    graph = compact("tree")
+    dist = np.full(graph.n, UNREACHED, dtype=graph.dtype)
+    order = ssg._sweep(graph, [0, 5], dist)
+    assert sorted(order.tolist()) == list(range(graph.n))
+    assert (np.diff(dist[order]) >= 0).all()
+    assert dist[[0, 5]].tolist() == [0, 0]
+
+
+# Diameter (iFUB)
+@pytest.mark.parametrize("name", NAMES)
+def test_diameter_matches_all_pairs(name):
+    vertices, edges = GRAPHS[name]
+    assert diameter(CompactSSG(vertices, edges)) == baseline.diameter(baseline.SSG(vertices, edges))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_diameter_of_random_graphs(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(2, 200))
+    edges = [tuple(e) for e in rng.integers(0, n, size=(int(rng.integers(n // 2, 2 * n)), 2)).tolist()]
+    g = nx.Graph(edges)
+    expected = max(nx.diameter(g.subgraph(c)) for c in nx.connected_components(g))
+    assert diameter(CompactSSG(range(n), edges)) == expected
+    for budget in (0, 1, 3):
+        lower, upper = diameter_bounds(CompactSSG(range(n), edges), budget)
+        assert lower <= expected <= upper
+
+
+# Bit-parallel multi-source BFS
+@pytest.mark.parametrize("name", NONEMPTY)
+@pytest.mark.parametrize("words", [1, 16])
+def test_all_sources_match_networkx(monkeypatch, name, words):
+    # One word per batch splits every graph above 64 vertices into batches.
+    monkeypatch.setattr(ssg, "MULTI_BFS_WORDS", words)
+    vertices, edges = GRAPHS[name]
+    g = nx.Graph(to_networkx(vertices, edges))
+    ecc = {}
+    for component in nx.connected_components(g):
+        ecc.update(nx.eccentricity(g.subgraph(component)))
+    assert eccentricities(SSG(vertices, edges)) == ecc
+    expected = closeness(SSG(vertices, edges))
+    for v, value in nx.closeness_centrality(g).items():
+        assert expected[v] == pytest.approx(value)
+    lengths = dict(nx.all_pairs_shortest_path_length(g))
+    pairs = [d for source in lengths.values() for d in source.values() if d]
+    expected = sum(pairs) / len(pairs) if pairs else 0
+    assert average_distance(CompactSSG(vertices, edges)) == pytest.approx(expected)
+
+
+# Union-find
+@pytest.mark.parametrize("name", NAMES)
+@pytest.mark.parametrize("chunk", [1, 7, 1 << 20])
+def test_components_match_networkx(monkeypatch, name, chunk):
+    monkeypatch.setattr(ssg, "UNION_CHUNK", chunk)
+    vertices, edges = GRAPHS[name]
+    components = nx_components(name)
+    for graph in (CompactSSG(vertices, edges), SSG(vertices, edges)):
+        assert count_components(graph) == len(components)
+        roots = component_roots(graph)
+        index = {v: i for i, v in enumerate(dict.fromkeys(vertices))}
+        for component in components:
+            ids = [index[v] for v in component]
+            assert set(roots[ids].tolist()) == {min(ids)}
+
+
+# Metrics against the dict implementations
+@pytest.mark.parametrize("name", NONEMPTY)
+def test_metrics_match_dict_implementations(name):
+    vertices, edges = GRAPHS[name]
+    graph, reference = CompactSSG(vertices, edges), baseline.SSG(vertices, edges)
+    beta_0, beta_1 = baseline.compute_betti_numbers(reference)
+    assert compute_betti_numbers(graph) == (beta_0, beta_1)
+    assert compute_euler_characteristic(graph) == beta_0 - beta_1
+    assert compute_gdi(graph) == pytest.approx(baseline.compute_gdi(reference))
+    root = vertices[0]
+    assert compute_sci(graph, root) == pytest.approx(baseline.compute_sci(reference, root))
+    assert compute_sfd(graph, root, scales=2) == pytest.approx(baseline.compute_sfd(reference, root))
+
+
+def test_sfd_with_extra_roots_averages_single_root_estimates():
+    graph = compact("tree")
+    roots = list(range(1, 150))
+    single = [compute_sfd(graph, r) for r in [0] + roots]
+    assert compute_sfd(graph, 0, roots=roots) == pytest.approx(sum(single) / len(single))
+
+
+def test_empty_graph():
+    graph = CompactSSG([], [])
+    assert count_components(graph) == 0
+    assert diameter(graph) == 0
+    assert eccentricities(graph).size == 0
+    assert average_distance(graph) == 0.0
+    assert compute_gdi(graph) == 0
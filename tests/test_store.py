@@ -0,0 +1,30 @@
+from store import ResultStore
+
+
+def test_running_total_tracks_puts_and_compaction(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path / "results.db"), max_bytes=20_000)
+    sums = []
+    size = store.size
+    monkeypatch.setattr(store, "size", lambda: sums.append(1) or size())
+    for i in range(300):
+        store.put(i % 120, list(range(i % 50 * 10)))
+    # Only compaction recounts the table.
+    assert 0 < len(sums) < 30
+    total = size()
+    assert store._bytes == total <= store.max_bytes
+    store.close()
+    # Summed when a new store first opens the file.
+    reopened = ResultStore(store.path)
+    assert reopened.get("absent") is None
+    assert reopened._bytes == total
+    reopened.close()
+
+
+def test_unopenable_store_falls_back_to_computing(tmp_path):
+    store = ResultStore(str(tmp_path / "missing" / "results.db"))
+    calls = []
+    assert store.get_or_compute("key", lambda: calls.append(1) or 42) == 42
+    assert store.get_or_compute("key", lambda: calls.append(1) or 42) == 42
+    assert len(calls) == 2
+    store.warm({})
+    store.close()
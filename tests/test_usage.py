@@ -0,0 +1,138 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from usage import TrialRecorder, UsageStore
+
+MONTH = time.strftime("%Y-%m")
+
+
+def test_count_is_served_from_memory(tmp_path):
+    store = UsageStore(str(tmp_path / "usage.db"))
+    recorder = TrialRecorder(store, str(tmp_path / "journal"), flush_interval=0.01)
+    try:
+        assert recorder.count("a") == 0
+        # Only the first count() reads the store from the caller's thread.
+        readers = []
+        count, counts = store.count, store.counts
+        store.count = lambda *args: readers.append(threading.get_ident()) or count(*args)
+        store.counts = lambda *args: readers.append(threading.get_ident()) or counts(*args)
+        for event in range(5):
+            recorder.record("a", event)
+            time.sleep(0.02)
+            assert recorder.count("a") == event + 1
+        recorder.flush()
+        assert recorder.count("a") == 5
+        assert readers and threading.get_ident() not in readers
+    finally:
+        recorder.close()
+        store.close()
+
+
+def test_flusher_picks_up_other_replicas(tmp_path):
+    store = UsageStore(str(tmp_path / "usage.db"))
+    other = UsageStore(store.path)
+    recorder = TrialRecorder(store, str(tmp_path / "journal"), flush_interval=0.05)
+    try:
+        recorder.record("a", "first")
+        assert recorder.count("a") == 1
+        other.add({(MONTH, "a"): 10})
+        deadline = time.monotonic() + 5
+        while recorder.count("a") != 11 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert recorder.count("a") == 11
+    finally:
+        recorder.close()
+        other.close()
+        store.close()
+
+
+def test_migrate_log_imports_once_and_never_lowers(tmp_path):
+    log = tmp_path / "usage.log"
+    log.write_text(f"{MONTH}:a@example.com:3\n{MONTH}:b:7\n{MONTH}:b:2\n"
+                   f"2000-01:old:9\nnot a line\n{MONTH}:c:x\n")
+    store = UsageStore(str(tmp_path / "usage.db"))
+    try:
+        for _ in range(4):
+            store.increment("b")
+        # Only this month's rows are kept; the highest count per user wins.
+        assert store.migrate_log(str(log)) == 2
+        assert store.count("a@example.com") == 3
+        assert store.count("b") == 7
+        assert store.months() == [MONTH]
+        store.increment("a@example.com")
+        log.write_text(f"{MONTH}:a@example.com:50\n")
+        assert store.migrate_log(str(log)) == 0
+        # Another process sees the migration marker in the store.
+        assert UsageStore(store.path).migrate_log(str(log)) == 0
+        assert store.count("a@example.com") == 4
+    finally:
+        store.close()
+
+
+def test_migrate_log_keeps_higher_stored_counts(tmp_path):
+    log = tmp_path / "usage.log"
+    log.write_text(f"{MONTH}:a:2\n")
+    store = UsageStore(str(tmp_path / "usage.db"))
+    try:
+        store.add({(MONTH, "a"): 5})
+        assert store.migrate_log(str(log)) == 1
+        assert store.count("a") == 5
+    finally:
+        store.close()
+
+
+def test_rollover_drops_old_month_tables(tmp_path):
+    store = UsageStore(str(tmp_path / "usage.db"), keep_months=3)
+    try:
+        store.add({("2025-10", "a"): 1, ("2025-11", "a"): 2, ("2025-12", "a"): 3})
+        assert store.months() == ["2025-10", "2025-11", "2025-12"]
+        store.rollover("2026-02")
+        assert store.months() == ["2025-12"]
+        # A new month's first use rolls over on its own.
+        assert store.increment("a", "2026-04") == 1
+        assert store.months() == ["2026-04"]
+        assert store.count("a", "2025-12") == 0
+    finally:
+        store.close()
+
+
+def test_unopenable_store_fails_calls_not_construction(tmp_path):
+    store = UsageStore(str(tmp_path / "missing" / "usage.db"))
+    with pytest.raises(sqlite3.Error):
+        store.count("a")
+    store.close()
+
+
+def test_refresh_reads_the_month_once_and_drops_earlier_months(tmp_path):
+    store = UsageStore(str(tmp_path / "usage.db"), keep_months=1200)
+    recorder = TrialRecorder(store, str(tmp_path / "journal"), flush_interval=3600)
+    try:
+        store.add({(MONTH, "a"): 1, (MONTH, "b"): 2, ("2000-01", "a"): 3})
+        assert [recorder.count(user) for user in "abc"] == [1, 2, 0]
+        assert recorder.count("a", "2000-01") == 3
+        store.add({(MONTH, "a"): 10, (MONTH, "c"): 5})
+        reads = []
+        store.count = lambda *args: reads.append(args)
+        recorder._refresh()
+        assert not reads
+        assert sorted(recorder._stored) == [(MONTH, "a"), (MONTH, "b"), (MONTH, "c")]
+        assert [recorder.count(user) for user in "abc"] == [11, 2, 5]
+    finally:
+        recorder.close()
+        store.close()
+
+
+def test_recorder_over_an_unopenable_store_keeps_its_journal(tmp_path):
+    store = UsageStore(str(tmp_path / "missing" / "usage.db"))
+    recorder = TrialRecorder(store, str(tmp_path / "journal"), flush_interval=0.01)
+    recorder.start()
+    recorder.close()
+    assert not list((tmp_path / "journal").iterdir())
+    recorder = TrialRecorder(store, str(tmp_path / "journal"), flush_interval=0.01)
+    assert recorder.record("a", "event")
+    recorder.close()
+    # Not stored, so left for the next recorder on the host to replay.
+    assert sorted(path.suffix for path in (tmp_path / "journal").iterdir()) == [".lock", ".log"]
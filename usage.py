@@ -0,0 +1,464 @@
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+_MONTH = re.compile(r"^\d{4}-\d{2}$")
+
+
+def current_month():
+    return datetime.now().strftime("%Y-%m")
+
+
+def _table(month):
+    # Months become table names, so only YYYY-MM is accepted.
+    if not _MONTH.match(month):
+        raise ValueError(f"month must be YYYY-MM, got {month!r}")
+    return "usage_" + month.replace("-", "_")
+
+
+def _months_before(month, keep):
+    # First month of the keep-month window ending at month.
+    year, mon = map(int, month.split("-"))
+    index = year * 12 + mon - 1 - (keep - 1)
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+# Usage Store
+class UsageStore:
+    """Per-user monthly trial counts shared by every process on the host.
+
+    SQLite in WAL mode with one table per month, keyed by user: an
+    increment is a single indexed upsert, atomic across threads and
+    processes, and rolling over a month drops whole tables instead of
+    rewriting rows. Only the last keep_months months are retained.
+
+    One connection serves every thread (Streamlit runs each rerun on a
+    new one), used under _db_lock, which also spans whole transactions.
+    It is opened on first use, so a store that cannot be opened fails
+    the calls that need it rather than the import.
+    """
+
+    def __init__(self, path, keep_months=1, busy_timeout=5.0):
+        self.path = path
+        self.keep_months = keep_months
+        self.busy_timeout = busy_timeout
+        self._tables = set()
+        self._migrated = set()
+        self._lock = threading.Lock()
+        self._db_lock = threading.RLock()
+        self._conn = None
+
+    @property
+    def _db(self):
+        with self._db_lock:
+            if self._conn is None:
+                db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                     check_same_thread=False)
+                try:
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("PRAGMA synchronous=NORMAL")
+                    db.execute("CREATE TABLE IF NOT EXISTS usage_meta (key TEXT PRIMARY KEY, value TEXT)")
+                except BaseException:
+                    db.close()
+                    raise
+                self._conn = db
+            return self._conn
+
+    def _query(self, sql, params=()):
+        with self._db_lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _month_table(self, month):
+        # Table for month, created on first use; a new month rolls over.
+        table = _table(month)
+        with self._lock:
+            if table in self._tables:
+                return table
+        self._query(f"CREATE TABLE IF NOT EXISTS {table} "
+                    "(user TEXT PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID")
+        self.rollover(month)
+        with self._lock:
+            self._tables.add(table)
+        return table
+
+    def _execute(self, month, sql, params):
+        # Another process may have dropped the table since it was cached.
+        for attempt in (0, 1):
+            table = self._month_table(month)
+            try:
+                return self._query(sql.format(table=table), params)
+            except sqlite3.OperationalError:
+                if attempt:
+                    raise
+                with self._lock:
+                    self._tables.discard(table)
+
+    def increment(self, user, month=None):
+        """Add one trial for user in month (default: this month); the new count."""
+        rows = self._execute(month or current_month(),
+                             "INSERT INTO {table} (user, count) VALUES (?, 1) "
+                             "ON CONFLICT (user) DO UPDATE SET count = count + 1 RETURNING count",
+                             (user,))
+        return rows[0][0]
+
+    def add(self, counts, marker=None):
+        """Add {(month, user): n} in one transaction; the new counts.
+
+        marker, a (key, value) pair, is written to usage_meta in the same
+        transaction, so a caller can tell afterwards whether it landed.
+        """
+        tables = {month: self._month_table(month) for month, _ in counts}
+        with self._db_lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                stored = {}
+                for (month, user), n in counts.items():
+                    stored[month, user] = db.execute(
+                        f"INSERT INTO {tables[month]} (user, count) VALUES (?, ?) "
+                        "ON CONFLICT (user) DO UPDATE SET count = count + excluded.count RETURNING count",
+                        (user, n)).fetchall()[0][0]
+                if marker is not None:
+                    db.execute("INSERT OR REPLACE INTO usage_meta (key, value) VALUES (?, ?)", marker)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                with self._lock:
+                    self._tables.clear()
+                raise
+        return stored
+
+    def marker(self, key):
+        rows = self._query("SELECT value FROM usage_meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def forget(self, key):
+        self._query("DELETE FROM usage_meta WHERE key = ?", (key,))
+
+    def reset(self, user, month=None):
+        self._execute(month or current_month(),
+                      "INSERT INTO {table} (user, count) VALUES (?, 0) "
+                      "ON CONFLICT (user) DO UPDATE SET count = 0", (user,))
+
+    def count(self, user, month=None):
+        rows = self._execute(month or current_month(), "SELECT count FROM {table} WHERE user = ?",
+                             (user,))
+        return rows[0][0] if rows else 0
+
+    def counts(self, month=None):
+        """{user: count} for every user with trials in month (default: this month)."""
+        return dict(self._execute(month or current_month(), "SELECT user, count FROM {table}", ()))
+
+    def months(self):
+        rows = self._query("SELECT name FROM sqlite_master WHERE type = 'table' "
+                           "AND name GLOB 'usage_[0-9][0-9][0-9][0-9]_[0-9][0-9]'")
+        return sorted(name[6:].replace("_", "-") for name, in rows)
+
+    def rollover(self, month=None):
+        """Drop the tables of months before the keep_months window ending at month."""
+        oldest = _months_before(month or current_month(), self.keep_months)
+        for old in self.months():
+            if old < oldest:
+                self._query(f"DROP TABLE IF EXISTS {_table(old)}")
+                with self._lock:
+                    self._tables.discard(_table(old))
+
+    def migrate_log(self, path):
+        """Import a month:user:count text log, once per log path; rows imported.
+
+        Counts already in the store win over lower ones in the log, so a
+        migration racing live increments never lowers a count.
+        """
+        key = "migrated:" + os.path.abspath(path)
+        if key in self._migrated:
+            return 0
+        self._migrated.add(key)
+        if self._query("SELECT 1 FROM usage_meta WHERE key = ?", (key,)):
+            return 0
+        try:
+            with open(path) as f:
+                lines = f.readlines()
+        except OSError:
+            return 0
+        counts = {}
+        for line in lines:
+            month, _, rest = line.strip().partition(":")
+            user, _, count = rest.rpartition(":")
+            if _MONTH.match(month) and user and count.isdigit():
+                counts[month, user] = max(counts.get((month, user), 0), int(count))
+        oldest = _months_before(current_month(), self.keep_months)
+        rows = [(month, user, count) for (month, user), count in counts.items() if month >= oldest]
+        tables = {month: self._month_table(month) for month, _, _ in rows}
+        with self._db_lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                if db.execute("SELECT 1 FROM usage_meta WHERE key = ?", (key,)).fetchone():
+                    db.execute("ROLLBACK")
+                    return 0
+                for month, user, count in rows:
+                    db.execute(f"INSERT INTO {tables[month]} (user, count) VALUES (?, ?) "
+                               "ON CONFLICT (user) DO UPDATE SET count = MAX(count, excluded.count)",
+                               (user, count))
+                db.execute("INSERT INTO usage_meta (key, value) VALUES (?, ?)",
+                           (key, datetime.now().isoformat(timespec="seconds")))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def close(self):
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Trial Recorder
+_FLUSH, _STOP = object(), object()
+
+
+class TrialRecorder:
+    """Write-behind trial counting on top of a UsageStore.
+
+    record() only touches memory: the event is counted in a pending
+    buffer and handed to a daemon thread, which appends it to this
+    process's journal and moves the pending counts into the store in one
+    transaction once flush_every events or flush_interval seconds have
+    gone by. count() answers from memory: the stored count plus what is
+    still pending. A user's stored count is read once, when first asked
+    for, and from then on the same thread rereads this month's counts in
+    one query every flush_interval seconds so other replicas' trials
+    show up; earlier months' counts are dropped.
+
+    The journal is a sequence of segment files, one per batch. A batch's
+    transaction also records its segment number, so after a crash the
+    next recorder on the host replays exactly the segments that never
+    reached the store. A lock file held for the recorder's lifetime tells
+    live journals from orphaned ones.
+    """
+
+    def __init__(self, store, journal_dir, flush_every=64, flush_interval=2.0, dedupe=4096):
+        self.store = store
+        self.journal_dir = journal_dir
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.dedupe = dedupe
+        self.instance = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._events = queue.SimpleQueue()
+        self._pending = Counter()
+        self._stored = {}
+        self._refreshed = time.monotonic()
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        # Held while a batch moves from pending to stored, so a stored
+        # count is never read from the store between the two.
+        self._apply_lock = threading.Lock()
+        self._thread = None
+        self._lock_file = None
+        self._drained = False
+
+    def _path(self, instance, suffix):
+        return os.path.join(self.journal_dir, f"{instance}.{suffix}")
+
+    def record(self, user, event_id, month=None):
+        """Count one trial for user, once per event_id; False for a repeat."""
+        key = (month or current_month(), user)
+        with self._lock:
+            if event_id in self._seen:
+                return False
+            self._seen[event_id] = None
+            if len(self._seen) > self.dedupe:
+                self._seen.popitem(last=False)
+            self._pending[key] += 1
+        if self._thread is None:
+            self.start()
+        self._events.put(key)
+        return True
+
+    def count(self, user, month=None):
+        key = (month or current_month(), user)
+        with self._lock:
+            stored, pending = self._stored.get(key), self._pending[key]
+        if stored is None:
+            if self._thread is None:
+                self.start()
+            with self._apply_lock:
+                stored = self.store.count(user, key[0])
+                with self._lock:
+                    stored = self._stored.setdefault(key, stored)
+                    pending = self._pending[key]
+        return stored + pending
+
+    def reset(self, user, month=None):
+        self.flush()
+        with self._apply_lock:
+            self.store.reset(user, month)
+            with self._lock:
+                self._stored[month or current_month(), user] = 0
+
+    def flush(self):
+        """Block until every event recorded so far is in the store."""
+        if self._thread is not None and self._thread.is_alive():
+            done = threading.Event()
+            self._events.put((_FLUSH, done))
+            done.wait()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            os.makedirs(self.journal_dir, exist_ok=True)
+            # Locked before it gets the name recover() looks for.
+            locking = self._path(self.instance, "locking")
+            self._lock_file = open(locking, "w")
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            os.rename(locking, self._path(self.instance, "lock"))
+            self.recover()
+            self._thread = threading.Thread(target=self._run, name="trial-recorder", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def close(self):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._events.put(_STOP)
+        self._thread.join()
+        if self._drained:
+            try:
+                self.store.forget("journal:" + self.instance)
+            except sqlite3.Error as e:
+                # Only a marker of segments that are all in the store.
+                logger.warning("journal marker not cleared: %s", e)
+            os.remove(self._path(self.instance, "lock"))
+        # Otherwise the unlocked journal is replayed by the next recorder.
+        self._lock_file.close()
+
+    def recover(self):
+        """Replay the journals of recorders that died; segments replayed."""
+        replayed = 0
+        for lock_path in glob.glob(os.path.join(self.journal_dir, "*.lock")):
+            instance = os.path.basename(lock_path)[:-len(".lock")]
+            if instance == self.instance:
+                continue
+            with open(lock_path, "a") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # its recorder is alive
+                key = "journal:" + instance
+                applied = int(self.store.marker(key) or -1)
+                segments = sorted((int(path.rsplit(".", 2)[1]), path)
+                                  for path in glob.glob(self._path(instance, "*.log")))
+                for seq, path in segments:
+                    if seq > applied:
+                        self.store.add(_read_segment(path), marker=(key, seq))
+                        replayed += 1
+                    os.remove(path)
+                self.store.forget(key)
+                os.remove(lock_path)
+        return replayed
+
+    def _run(self):
+        seq, journal, batch, started = 0, None, Counter(), time.monotonic()
+        while True:
+            try:
+                items = [self._events.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                items = []
+            while True:
+                try:
+                    items.append(self._events.get_nowait())
+                except queue.Empty:
+                    break
+            waiters, stop = [], False
+            lines = []
+            for item in items:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, tuple) and item[0] is _FLUSH:
+                    waiters.append(item[1])
+                else:
+                    batch[item] += 1
+                    lines.append(json.dumps(item) + "\n")
+            if lines:
+                if journal is None:
+                    journal = open(self._path(self.instance, f"{seq}.log"), "a")
+                journal.writelines(lines)
+                journal.flush()
+                os.fsync(journal.fileno())
+            due = waiters or stop or sum(batch.values()) >= self.flush_every \
+                or time.monotonic() - started >= self.flush_interval
+            if batch and due:
+                try:
+                    self._apply(batch, seq)
+                except sqlite3.Error as e:
+                    # Keep journalling into this segment and retry later.
+                    logger.warning("trial batch not stored, will retry: %s", e)
+                else:
+                    journal.close()
+                    os.remove(journal.name)
+                    seq, journal, batch = seq + 1, None, Counter()
+            if not batch:
+                started = time.monotonic()
+            if time.monotonic() - self._refreshed >= self.flush_interval:
+                try:
+                    self._refresh()
+                except sqlite3.Error as e:
+                    logger.warning("trial counts not refreshed: %s", e)
+            for done in waiters:
+                done.set()
+            if stop:
+                self._drained = not batch
+                return
+
+    def _apply(self, batch, seq):
+        with self._apply_lock:
+            stored = self.store.add(batch, marker=("journal:" + self.instance, seq))
+            with self._lock:
+                self._pending -= batch
+                self._stored.update(stored)
+
+    def _refresh(self):
+        # Reread the stored counts other replicas may have changed, in one
+        # query. Only this month's gate anything, so earlier months' counts
+        # are dropped; count() reads one again if it is ever asked for.
+        self._refreshed = time.monotonic()
+        month = current_month()
+        with self._apply_lock:
+            counts = self.store.counts(month)
+            with self._lock:
+                self._stored = {key: counts.get(key[1], 0) for key in self._stored if key[0] == month}
+
+
+def _read_segment(path):
+    counts = Counter()
+    with open(path) as f:
+        for line in f:
+            try:
+                month, user = json.loads(line)
+            except ValueError:
+                break  # torn last line from the crash
+            counts[month, user] += 1
+    return counts
+
+
+# Store shared by every replica on the host; the path can be overridden
+# with ADSG_USAGE_STORE.
+USAGE_STORE = UsageStore(os.environ.get("ADSG_USAGE_STORE", "usage.db"))
+# Trials are recorded through it; the journal lives next to the store.
+TRIALS = TrialRecorder(USAGE_STORE, os.environ.get("ADSG_USAGE_JOURNAL", "usage-journal"))
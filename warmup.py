@@ -0,0 +1,49 @@
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Imported where they are first needed, not at startup: together they
+# cost more than the first page itself. Streamlit imports pandas the first
+# time a custom component (the 2D view) is drawn.
+HEAVY_MODULES = ("pandas", "plotly.graph_objects", "matplotlib.pyplot", "networkx", "razorpay", "requests")
+
+_started = False
+_lock = threading.Lock()
+
+
+def load_pyplot():
+    """matplotlib.pyplot on the headless Agg backend."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def warm_imports(modules=HEAVY_MODULES):
+    """Import modules on the calling thread, once per process.
+
+    Called at the end of the first script run, after the page is out, so
+    the first Generate or checkout does not pay for the imports either.
+    They are not moved to a background thread: some reach ast.parse
+    (through inspect.signature), and CPython's AST construction is not
+    thread-safe (gh-106905), so they would race Streamlit parsing a page
+    script. On the script thread they run strictly after this session's
+    parse.
+    """
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    start = time.perf_counter()
+    for name in modules:
+        try:
+            load_pyplot() if name == "matplotlib.pyplot" else importlib.import_module(name)
+        except ImportError as e:
+            logger.warning("could not preload %s: %s", name, e)
+    logger.info("preloaded %s in %.2f s", ", ".join(modules), time.perf_counter() - start)